@@ -1,16 +1,32 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+import csv
+import io
 import json
-import random
-from src.services.analyzer import LotteryAnalyzer
+from itertools import chain
+from src.services.analyzer import LotteryAnalyzer, find_played_games
 from src.services.advanced_analyzer import AdvancedAnalyzer
-from src.services.probability_optimizer import ProbabilityOptimizer
+from src.services import incremental_stats
+from src.services.window_stats import window_stats
+from src.services.cooccurrence import cooccurrence_analysis
+from src.services.gap_analysis import get_gap_analysis
+from src.services.portfolio import build_portfolio
+from src.services.prize_odds import calculate_probability
+from src.services.candidate_scoring import ideal_parameters, score_candidates
+from src.services.draw_matrix import get_draw_matrix
+from src.services.backtest import run_backtest, STRATEGIES
+from src.services.ev_simulator import simulate
+from src.services.bulk_checker import check_tickets
+from src.services.result_importer import iter_csv_tickets
+from src.services.game_generator import generate_batch, iter_games
+from src.services.combination_index import query_combinations, supports_index
+from src.services.combinadic import drawn_contests, ticket_rank
+from src.services.stats_cache import cached_by_contest, stats_cache
 
 api_bp = Blueprint('api', __name__, url_prefix='/api')
 
 # Instanciar analisadores
 analyzer = LotteryAnalyzer()
 advanced_analyzer = AdvancedAnalyzer()
-probability_optimizer = ProbabilityOptimizer()
 
 # Configurações das loterias
 LOTTERY_CONFIG = {
@@ -21,6 +37,27 @@ LOTTERY_CONFIG = {
     'maismilionaria': {'numbers': 6, 'range': (1, 50), 'trevos': 2, 'trevos_range': (1, 6)}
 }
 
+# Limite de sorteios simulados por requisição em /simulate
+SIMULATION_MAX_DRAWS = 5000000
+
+# Limites do modo carteira (bolão)
+PORTFOLIO_MAX_GAMES = 1000
+PORTFOLIO_MAX_SEEDS = 50
+
+# Limite de jogos por requisição na estratégia com restrições (amostragem em lote)
+CONSTRAINED_MAX_GAMES = 5000
+
+# Limites da geração em fluxo contínuo (/generate-games/stream)
+STREAM_MAX_GAMES = 100000
+STREAM_MAX_CHUNK = 5000
+
+# Limites da conferência em lote (/check-games/bulk)
+BULK_CHECK_MAX_TICKETS = 50000
+BULK_CHECK_MAX_CONTESTS = 1000
+
+# Limite de combinações retornadas por consulta em /combinations
+COMBINATIONS_MAX_LIMIT = 1000
+
 @api_bp.route('/latest-results', methods=['GET'])
 def get_latest_results():
     """Retorna os resultados mais recentes das loterias."""
@@ -35,25 +72,28 @@ def get_lottery_stats():
     """Retorna estatísticas detalhadas para uma loteria específica."""
     data = request.json
     lottery = data.get('lottery', 'megasena')
+    # Janela opcional: últimos N concursos e/ou intervalo de concursos
+    window = data.get('window')
+    from_contest = data.get('from_contest')
+    to_contest = data.get('to_contest')
     
+    # Inteiros (ou None): os argumentos fazem parte da chave do cache
     try:
-        # Estatísticas básicas
-        frequency = analyzer.get_number_frequency(lottery)
-        delay = analyzer.get_number_delay(lottery)
-        
-        # Estatísticas avançadas
-        advanced_stats = advanced_analyzer.get_advanced_stats(lottery)
-        
-        return jsonify({
-            'basic': {
-                'frequency': frequency,
-                'delay': delay
-            },
-            'advanced': advanced_stats
-        })
+        window = int(window) if window not in (None, '') else None
+        from_contest = int(from_contest) if from_contest not in (None, '') else None
+        to_contest = int(to_contest) if to_contest not in (None, '') else None
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Janela e concursos devem ser números inteiros'}), 400
+    try:
+        return jsonify(build_lottery_stats(lottery, window, from_contest, to_contest))
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/cache-stats', methods=['GET'])
+def get_cache_stats():
+    """Retorna os contadores do cache de estatísticas."""
+    return jsonify(stats_cache.stats())
+
 @api_bp.route('/preview-game', methods=['POST'])
 def preview_game():
     """Gera uma visualização prévia de um jogo com base na estratégia selecionada."""
@@ -70,8 +110,9 @@ def preview_game():
         # Gerar jogo com base na estratégia
         game = generate_game_by_strategy(lottery, strategy, data)
         
-        # Calcular probabilidade relativa
-        probability = probability_optimizer.calculate_probability(lottery, game['numbers'])
+        # Calcular probabilidades exatas e pontuação relativa
+        probability = calculate_probability(lottery, game['numbers'], game.get('trevos'), game.get('time_coracao'))
+        probability['relative_score'] = ticket_relative_score(lottery, game['numbers'])
         game['probability'] = probability
         
         return jsonify({'preview_game': game})
@@ -86,32 +127,121 @@ def generate_games():
     strategy = data.get('strategy', 'random')
     num_games = data.get('num_games', 1)
     save_to_history = data.get('save_to_history', True)
+    # Modo carteira: jogos gerados em conjunto, maximizando a cobertura de pares/triplas
+    portfolio = data.get('portfolio', False)
     
     try:
         # Validar número de jogos
-        if num_games < 1 or num_games > 15:
-            return jsonify({'error': 'Número de jogos deve estar entre 1 e 15'}), 400
+        if portfolio:
+            max_games = PORTFOLIO_MAX_GAMES
+        elif strategy == 'constrained':
+            max_games = CONSTRAINED_MAX_GAMES
+        else:
+            max_games = 15
+        if num_games < 1 or num_games > max_games:
+            return jsonify({'error': f'Número de jogos deve estar entre 1 e {max_games}'}), 400
         
-        # Gerar jogos
-        games = []
-        for _ in range(num_games):
-            game = generate_game_by_strategy(lottery, strategy, data)
-            
-            # Calcular probabilidade relativa
-            probability = probability_optimizer.calculate_probability(lottery, game['numbers'])
-            game['optimization_score'] = probability.get('relative_score', 50)
-            
-            games.append(game)
+        coverage = None
+        if portfolio:
+            # As estratégias existentes fornecem as sementes da carteira
+            seeds = generate_batch(lottery, strategy, min(num_games, PORTFOLIO_MAX_SEEDS), data.get('seed'), data)
+            result = build_portfolio(
+                lottery,
+                seeds,
+                num_games,
+                coverage_weight=data.get('coverage_weight', 0.7),
+                track_triples=data.get('triples', True),
+                seed=data.get('seed')
+            )
+            if 'error' in result:
+                return jsonify(result), 400
+            games = result['games']
+            coverage = result['coverage']
+        else:
+            # Todos os jogos em uma única passada vetorizada
+            games = generate_batch(lottery, strategy, num_games, data.get('seed'), data)
+        
+        # Calcular probabilidades exatas e pontuação relativa
+        scores = ticket_relative_scores(lottery, [game['numbers'] for game in games])
+        for game, score in zip(games, scores):
+            game['probability'] = calculate_probability(lottery, game['numbers'], game.get('trevos'), game.get('time_coracao'))
+            game['optimization_score'] = score
         
         # Salvar no histórico se solicitado
         if save_to_history:
             for game in games:
                 analyzer.save_game_to_history(lottery, game)
         
+        if coverage is not None:
+            return jsonify({'games': games, 'coverage': coverage})
         return jsonify({'games': games})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/generate-games/stream', methods=['POST'])
+def generate_games_stream():
+    """Gera milhares de jogos em fluxo contínuo (NDJSON ou CSV), lote a lote."""
+    data = request.json or {}
+    lottery = data.get('lottery', 'megasena')
+    strategy = data.get('strategy', 'random')
+    num_games = data.get('num_games', 1000)
+    chunk_size = data.get('chunk_size', 500)
+    output_format = data.get('format', 'ndjson')
+    
+    if lottery not in LOTTERY_CONFIG:
+        return jsonify({'error': f'Loteria não suportada: {lottery}'}), 400
+    try:
+        num_games = int(num_games)
+        chunk_size = int(chunk_size)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Número de jogos e tamanho do lote devem ser números inteiros'}), 400
+    if num_games < 1 or num_games > STREAM_MAX_GAMES:
+        return jsonify({'error': f'Número de jogos deve estar entre 1 e {STREAM_MAX_GAMES}'}), 400
+    if chunk_size < 1 or chunk_size > STREAM_MAX_CHUNK:
+        return jsonify({'error': f'O tamanho do lote deve estar entre 1 e {STREAM_MAX_CHUNK}'}), 400
+    if output_format not in ('ndjson', 'csv'):
+        return jsonify({'error': 'Formato deve ser ndjson ou csv'}), 400
+    
+    chunks = iter_games(lottery, strategy, num_games, data.get('seed'), data, chunk_size, data.get('dedup', False))
+    try:
+        # O primeiro lote é gerado antes da resposta para que erros de parâmetros virem 400
+        first = next(chunks, [])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+    
+    if output_format == 'csv':
+        body = chain([format_games_csv_header()], (format_games_csv(chunk) for chunk in chain([first], chunks)))
+        return Response(
+            stream_with_context(body),
+            mimetype='text/csv',
+            headers={'Content-Disposition': f'attachment; filename={lottery}_{strategy}.csv'}
+        )
+    
+    body = (format_games_ndjson(chunk) for chunk in chain([first], chunks))
+    return Response(stream_with_context(body), mimetype='application/x-ndjson')
+
+def format_games_ndjson(games):
+    """Um lote de jogos como JSON delimitado por linhas (um jogo por linha)."""
+    return ''.join(json.dumps(game, ensure_ascii=False) + '\n' for game in games)
+
+def format_games_csv_header():
+    """Cabeçalho do CSV de jogos."""
+    return 'dezenas,trevos,time_coracao\r\n'
+
+def format_games_csv(games):
+    """Um lote de jogos como linhas CSV (números separados por espaço)."""
+    output = io.StringIO()
+    writer = csv.writer(output)
+    for game in games:
+        writer.writerow([
+            ' '.join(f'{n:02d}' for n in game['numbers']),
+            ' '.join(f'{n:02d}' for n in game.get('trevos', [])),
+            game.get('time_coracao', '')
+        ])
+    return output.getvalue()
+
 @api_bp.route('/check-game', methods=['POST'])
 def check_game():
     """Verifica um jogo contra o resultado oficial."""
@@ -126,6 +256,70 @@ def check_game():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@api_bp.route('/check-games/bulk', methods=['POST'])
+def check_games_bulk():
+    """Confere muitos jogos (JSON ou CSV enviado) contra um intervalo de concursos do arquivo local."""
+    if 'file' in request.files:
+        # Formulário com o CSV dos jogos e os demais parâmetros como campos
+        data = request.form
+        try:
+            stream = io.TextIOWrapper(request.files['file'].stream, encoding='utf-8-sig', newline='')
+            tickets = list(iter_csv_tickets(stream))
+        except ValueError as e:
+            return jsonify({'error': f'CSV inválido: {e}'}), 400
+    else:
+        data = request.json or {}
+        tickets = data.get('tickets', [])
+    
+    lottery = data.get('lottery', 'megasena')
+    from_contest = data.get('from_contest')
+    to_contest = data.get('to_contest')
+    
+    if lottery not in LOTTERY_CONFIG:
+        return jsonify({'error': f'Loteria não suportada: {lottery}'}), 400
+    if len(tickets) > BULK_CHECK_MAX_TICKETS:
+        return jsonify({'error': f'Envie no máximo {BULK_CHECK_MAX_TICKETS} jogos'}), 400
+    
+    try:
+        from_contest = int(from_contest) if from_contest not in (None, '') else None
+        to_contest = int(to_contest) if to_contest not in (None, '') else None
+    except ValueError:
+        return jsonify({'error': 'Concursos devem ser números inteiros'}), 400
+    try:
+        result = check_tickets(lottery, tickets, from_contest, to_contest, BULK_CHECK_MAX_CONTESTS)
+        if 'error' in result:
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/ticket-status', methods=['POST'])
+def ticket_status():
+    """Informa se uma combinação já foi sorteada ou já foi jogada."""
+    data = request.json
+    lottery = data.get('lottery', 'megasena')
+    numbers = data.get('numbers', [])
+    
+    if lottery not in LOTTERY_CONFIG:
+        return jsonify({'error': f'Loteria não suportada: {lottery}'}), 400
+    
+    try:
+        contests = drawn_contests(lottery, numbers)
+        played = find_played_games(lottery, numbers)
+        return jsonify({
+            'lottery': lottery,
+            'numbers': sorted(int(n) for n in numbers),
+            'rank': ticket_rank(lottery, numbers),
+            'drawn': bool(contests),
+            'drawn_contests': contests,
+            'played': bool(played),
+            'played_games': played
+        })
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @api_bp.route('/game-history', methods=['GET'])
 def get_game_history():
     """Retorna o histórico de jogos."""
@@ -137,107 +331,193 @@ def get_game_history():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
-def generate_game_by_strategy(lottery, strategy, params=None):
-    """Gera um jogo com base na estratégia selecionada."""
-    if params is None:
-        params = {}
+@api_bp.route('/cooccurrence/<lottery>', methods=['GET'])
+def get_cooccurrence(lottery):
+    """Retorna os pares (e triplas) de números que mais saem juntos."""
+    if lottery not in LOTTERY_CONFIG:
+        return jsonify({'error': f'Loteria não suportada: {lottery}'}), 400
     
-    config = LOTTERY_CONFIG.get(lottery)
-    if not config:
-        raise ValueError(f'Loteria não suportada: {lottery}')
+    window = request.args.get('window', type=int)
+    top_k = request.args.get('k', 20, type=int)
+    include_triplets = request.args.get('triplets', 'false').lower() in ('1', 'true')
+    include_matrix = request.args.get('matrix', 'false').lower() in ('1', 'true')
     
-    numbers_count = config['numbers']
-    min_num, max_num = config['range']
+    try:
+        analysis = cooccurrence_analysis(lottery, window, top_k, include_triplets, include_matrix)
+        return jsonify(analysis)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/gaps/<lottery>', methods=['GET'])
+def get_gaps(lottery):
+    """Retorna os intervalos entre ocorrências de cada número (histograma, média, máximo e percentil do atraso)."""
+    if lottery not in LOTTERY_CONFIG:
+        return jsonify({'error': f'Loteria não suportada: {lottery}'}), 400
     
-    # Estratégia aleatória
-    if strategy == 'random':
-        numbers = random.sample(range(min_num, max_num + 1), numbers_count)
+    window = request.args.get('window', type=int)
+    include_histogram = request.args.get('histogram', 'false').lower() in ('1', 'true')
     
-    # Estratégia de números quentes (mais frequentes)
-    elif strategy == 'hot_numbers':
-        frequency = analyzer.get_number_frequency(lottery)
-        if not frequency:
-            # Fallback para aleatório se não houver dados de frequência
-            numbers = random.sample(range(min_num, max_num + 1), numbers_count)
-        else:
-            # Ordenar números por frequência (decrescente)
-            sorted_numbers = sorted(frequency.items(), key=lambda x: x[1], reverse=True)
-            # Pegar os números mais frequentes com alguma aleatoriedade
-            top_numbers = [int(num) for num, _ in sorted_numbers[:int(numbers_count * 1.5)]]
-            numbers = random.sample(top_numbers, min(numbers_count, len(top_numbers)))
-            # Completar com números aleatórios se necessário
-            if len(numbers) < numbers_count:
-                remaining = numbers_count - len(numbers)
-                available = [n for n in range(min_num, max_num + 1) if n not in numbers]
-                numbers.extend(random.sample(available, remaining))
-    
-    # Estratégia de números frios (menos frequentes)
-    elif strategy == 'cold_numbers':
-        delay = analyzer.get_number_delay(lottery)
-        if not delay:
-            # Fallback para aleatório se não houver dados de atraso
-            numbers = random.sample(range(min_num, max_num + 1), numbers_count)
-        else:
-            # Ordenar números por atraso (decrescente)
-            sorted_numbers = sorted(delay.items(), key=lambda x: x[1], reverse=True)
-            # Pegar os números mais atrasados com alguma aleatoriedade
-            top_numbers = [int(num) for num, _ in sorted_numbers[:int(numbers_count * 1.5)]]
-            numbers = random.sample(top_numbers, min(numbers_count, len(top_numbers)))
-            # Completar com números aleatórios se necessário
-            if len(numbers) < numbers_count:
-                remaining = numbers_count - len(numbers)
-                available = [n for n in range(min_num, max_num + 1) if n not in numbers]
-                numbers.extend(random.sample(available, remaining))
-    
-    # Estratégia baseada na média dos últimos 5 jogos
-    elif strategy == 'last_5_avg':
-        numbers = advanced_analyzer.generate_game_based_on_last_5(lottery, numbers_count)
-    
-    # Estratégia personalizada (pares/ímpares)
-    elif strategy == 'custom_even_odd':
-        even_count = params.get('even_count', numbers_count // 2)
-        odd_count = params.get('odd_count', numbers_count - even_count)
-        
-        if even_count + odd_count != numbers_count:
-            raise ValueError(f'A soma de números pares e ímpares deve ser igual a {numbers_count}')
-        
-        # Gerar números pares
-        even_numbers = [n for n in range(min_num, max_num + 1) if n % 2 == 0]
-        selected_even = random.sample(even_numbers, even_count)
-        
-        # Gerar números ímpares
-        odd_numbers = [n for n in range(min_num, max_num + 1) if n % 2 != 0]
-        selected_odd = random.sample(odd_numbers, odd_count)
-        
-        # Combinar e ordenar
-        numbers = selected_even + selected_odd
+    try:
+        return jsonify(get_gap_analysis(lottery, window, include_histogram))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/backtest/<lottery>', methods=['GET'])
+def get_backtest(lottery):
+    """Retorna o desempenho histórico das estratégias de geração de jogos."""
+    if lottery not in LOTTERY_CONFIG:
+        return jsonify({'error': f'Loteria não suportada: {lottery}'}), 400
+    
+    strategies = request.args.get('strategies', ','.join(STRATEGIES))
+    tickets = request.args.get('tickets', 100, type=int)
+    seed = request.args.get('seed', 0, type=int)
+    min_history = request.args.get('min_history', 100, type=int)
+    
+    if tickets < 1 or tickets > 1000:
+        return jsonify({'error': 'Número de jogos por concurso deve estar entre 1 e 1000'}), 400
+    
+    try:
+        result = build_backtest(lottery, tuple(s for s in strategies.split(',') if s), tickets, seed, min_history)
+        if 'error' in result:
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/simulate', methods=['POST'])
+def simulate_games():
+    """Simula sorteios e retorna a distribuição de prêmios de um conjunto de jogos."""
+    data = request.json
+    lottery = data.get('lottery', 'megasena')
+    games = data.get('games', [])
+    num_draws = data.get('num_draws', 1000000)
     
-    # Estratégia otimizada por IA
-    elif strategy == 'optimized':
-        numbers = probability_optimizer.generate_optimized_game(lottery)
+    if lottery not in LOTTERY_CONFIG:
+        return jsonify({'error': f'Loteria não suportada: {lottery}'}), 400
     
+    try:
+        num_draws = int(num_draws)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'Número de sorteios deve ser um número inteiro'}), 400
+    if num_draws < 1 or num_draws > SIMULATION_MAX_DRAWS:
+        return jsonify({'error': f'Número de sorteios deve estar entre 1 e {SIMULATION_MAX_DRAWS}'}), 400
+    
+    try:
+        result = simulate(
+            lottery,
+            games,
+            num_draws,
+            seed=data.get('seed'),
+            prize_values=data.get('prize_values'),
+            ticket_cost=data.get('ticket_cost'),
+            confidence=data.get('confidence', 0.95)
+        )
+        if 'error' in result:
+            return jsonify(result), 400
+        return jsonify(result)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@api_bp.route('/combinations/<lottery>', methods=['GET'])
+def get_combinations(lottery):
+    """Consulta o índice de todas as combinações (ex.: soma 180-200, 7 pares, nunca sorteadas)."""
+    if not supports_index(lottery):
+        return jsonify({'error': f'Índice de combinações indisponível para {lottery}'}), 400
+    
+    ranges = {}
+    for column in ('sum', 'even', 'sequences', 'zone_spread', 'near_hits'):
+        exact = request.args.get(column, type=int)
+        low = request.args.get(f'{column}_min', exact, type=int)
+        high = request.args.get(f'{column}_max', exact, type=int)
+        if low is not None or high is not None:
+            ranges[column] = (low, high)
+    
+    ever_drawn = None
+    if request.args.get('never_drawn', 'false').lower() == 'true':
+        ever_drawn = False
+    elif request.args.get('ever_drawn', 'false').lower() == 'true':
+        ever_drawn = True
+    
+    limit = request.args.get('limit', 50, type=int)
+    if limit < 0 or limit > COMBINATIONS_MAX_LIMIT:
+        return jsonify({'error': f'O limite deve estar entre 0 e {COMBINATIONS_MAX_LIMIT}'}), 400
+    
+    try:
+        result = query_combinations(
+            lottery,
+            ranges,
+            ever_drawn,
+            limit=limit,
+            offset=max(0, request.args.get('offset', 0, type=int)),
+            sample=request.args.get('sample', 'false').lower() == 'true',
+            seed=request.args.get('seed', type=int)
+        )
+        return jsonify(result)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@cached_by_contest('backtest')
+def build_backtest(lottery, strategies, tickets, seed, min_history):
+    """Executa o backtest (memorizado até a chegada de um novo concurso)."""
+    return run_backtest(lottery, strategies, tickets, seed, min_history)
+
+@cached_by_contest('lottery_stats')
+def build_lottery_stats(lottery, window=None, from_contest=None, to_contest=None):
+    """Monta a resposta de /lottery-stats (memorizada até a chegada de um novo concurso)."""
+    # Estatísticas básicas
+    if window or from_contest or to_contest:
+        windowed = window_stats(lottery, from_contest, to_contest, window)
+        frequency = windowed['frequency']
+        delay = windowed['delay']
     else:
-        raise ValueError(f'Estratégia não suportada: {strategy}')
+        windowed = None
+        frequency = incremental_stats.get_frequency(lottery)
+        delay = incremental_stats.get_delay(lottery)
     
-    # Ordenar números
-    numbers.sort()
+    # Estatísticas avançadas
+    advanced_stats = advanced_analyzer.get_advanced_stats(lottery)
     
-    # Criar objeto do jogo
-    game = {
-        'numbers': numbers,
-        'strategy': strategy
+    basic = {
+        'frequency': frequency,
+        'delay': delay
     }
+    if windowed:
+        basic['window'] = {
+            'from_contest': windowed['from_contest'],
+            'to_contest': windowed['to_contest'],
+            'num_draws': windowed['num_draws']
+        }
     
-    # Adicionar trevos para +Milionária
-    if lottery == 'maismilionaria' and 'trevos' in config:
-        min_trevo, max_trevo = config['trevos_range']
-        trevos_count = config['trevos']
-        game['trevos'] = random.sample(range(min_trevo, max_trevo + 1), trevos_count)
+    return {
+        'basic': basic,
+        'advanced': advanced_stats
+    }
+
+def ticket_relative_score(lottery, numbers):
+    """
+    Pontuação relativa (0 a 100) de um jogo: proximidade do padrão dos últimos 100 concursos
+    (pares/ímpares, soma, sequências e dezenas). As chances de prêmio são iguais para todos
+    os jogos do mesmo tamanho, então é essa pontuação que diferencia um jogo do outro.
+    """
+    return ticket_relative_scores(lottery, [numbers])[0]
+
+def ticket_relative_scores(lottery, games):
+    """Pontuação relativa de vários jogos do mesmo tamanho em uma única passada vetorizada."""
+    config = LOTTERY_CONFIG[lottery]
+    ideal_even, ideal_sum, ideal_sequences = ideal_parameters(
+        get_draw_matrix(lottery).last(100), config['numbers'], config['range']
+    )
+    scores, _ = score_candidates(games, config['range'], ideal_even, ideal_sum, ideal_sequences)
+    return [round(float(score), 2) for score in scores]
+
+def generate_game_by_strategy(lottery, strategy, params=None):
+    """Gera um jogo com base na estratégia selecionada."""
+    if params is None:
+        params = {}
     
-    # Adicionar Time do Coração para Timemania
-    if lottery == 'timemania' and config.get('has_team', False):
-        teams = analyzer.get_available_teams()
-        if teams:
-            game['time_coracao'] = random.choice(teams)
+    if lottery not in LOTTERY_CONFIG:
+        raise ValueError(f'Loteria não suportada: {lottery}')
     
-    return game
+    return generate_batch(lottery, strategy, 1, params.get('seed'), params)[0]
@@ -5,9 +5,12 @@ Implementa algoritmos de análise baseados nos últimos 5 jogos
 
 import numpy as np
 import random
-from collections import Counter
+from src.services import bitmask
 from src.services.analyzer import fetch_last_n_results, SUPPORTED_GAMES
+from src.services.draw_matrix import DrawMatrix
+from src.services.stats_cache import cached_by_contest
 
+@cached_by_contest("analyze_last_5_games", window=5)
 def analyze_last_5_games(lottery_type):
     """
     Analisa os últimos 5 jogos de uma loteria específica e retorna estatísticas avançadas
@@ -60,9 +63,7 @@ def calculate_frequency_map(drawn_numbers):
     Returns:
         dict: Mapa de frequência de cada número
     """
-    all_numbers = [num for game in drawn_numbers for num in game]
-    frequency = Counter(all_numbers)
-    return {str(num): count for num, count in frequency.items()}
+    return DrawMatrix.from_numbers(drawn_numbers).frequency_map()
 
 def analyze_patterns(drawn_numbers):
     """
@@ -74,23 +75,14 @@ def analyze_patterns(drawn_numbers):
     Returns:
         dict: Análise de padrões
     """
+    matrix = DrawMatrix.from_numbers(drawn_numbers)
+    
     # Verificar sequências
-    sequences = []
-    for game in drawn_numbers:
-        sorted_game = sorted(game)
-        seq_count = 0
-        for i in range(len(sorted_game) - 1):
-            if sorted_game[i + 1] - sorted_game[i] == 1:
-                seq_count += 1
-        sequences.append(seq_count)
+    sequences = matrix.sequences().tolist()
     
-    # Verificar repetições entre jogos
-    repeated_between_games = []
-    for i in range(len(drawn_numbers) - 1):
-        current = set(drawn_numbers[i])
-        next_game = set(drawn_numbers[i + 1])
-        repeated = current.intersection(next_game)
-        repeated_between_games.append(len(repeated))
+    # Verificar repetições entre jogos (popcount da interseção das máscaras consecutivas)
+    masks = bitmask.encode_incidence(matrix.incidence, matrix.min_num)
+    repeated_between_games = bitmask.hits(masks[:-1], masks[1:]).tolist()
     
     return {
         "sequences_per_game": sequences,
@@ -155,13 +147,11 @@ def generate_suggested_numbers_pool(drawn_numbers, lottery_type):
     sequence_numbers = list(set(sequence_numbers))
     
     # Números que se repetem entre jogos
-    repeated_numbers = []
-    for i in range(len(drawn_numbers) - 1):
-        current = set(drawn_numbers[i])
-        next_game = set(drawn_numbers[i + 1])
-        repeated = current.intersection(next_game)
-        repeated_numbers.extend(list(repeated))
-    repeated_numbers = list(set(repeated_numbers))
+    repeated_mask = 0
+    game_masks = [bitmask.encode(game) for game in drawn_numbers]
+    for current, next_game in zip(game_masks, game_masks[1:]):
+        repeated_mask |= current & next_game
+    repeated_numbers = bitmask.decode(repeated_mask)
     
     return {
         "hot_numbers": hot_numbers,
@@ -185,37 +175,22 @@ def identify_hot_zones(drawn_numbers, lottery_type):
     if lottery_type not in SUPPORTED_GAMES:
         return {}
     
-    min_num, max_num = SUPPORTED_GAMES[lottery_type]['range']
-    range_size = max_num - min_num + 1
+    matrix = DrawMatrix.from_numbers(drawn_numbers, SUPPORTED_GAMES[lottery_type]['range'])
     
-    # Dividir o volante em zonas
+    # Dividir o volante em zonas e contar ocorrências em cada uma
     num_zones = 4
-    zone_size = range_size // num_zones
+    zone_totals = matrix.zone_counts(num_zones).sum(axis=0)
+    total_numbers = int(zone_totals.sum())
     zones = {}
     
-    for i in range(num_zones):
-        start = min_num + i * zone_size
-        end = start + zone_size - 1
-        if i == num_zones - 1:  # Última zona
-            end = max_num
-        
+    for i, bounds in enumerate(matrix.zone_bounds(num_zones)):
+        count = int(zone_totals[i])
         zones[f"zone_{i+1}"] = {
-            "range": [start, end],
-            "count": 0
+            "range": bounds,
+            "count": count,
+            "percentage": round((count / total_numbers) * 100, 2)
         }
     
-    # Contar ocorrências em cada zona
-    for game in drawn_numbers:
-        for num in game:
-            for zone_name, zone_info in zones.items():
-                if zone_info["range"][0] <= num <= zone_info["range"][1]:
-                    zones[zone_name]["count"] += 1
-    
-    # Calcular percentuais
-    total_numbers = sum(len(game) for game in drawn_numbers)
-    for zone_name, zone_info in zones.items():
-        zone_info["percentage"] = round((zone_info["count"] / total_numbers) * 100, 2)
-    
     # Identificar zona mais quente
     hottest_zone = max(zones.items(), key=lambda x: x[1]["count"])
     zones["hottest_zone"] = hottest_zone[0]
@@ -232,7 +207,7 @@ def calculate_sum_statistics(drawn_numbers):
     Returns:
         dict: Estatísticas de soma
     """
-    sums = [sum(game) for game in drawn_numbers]
+    sums = DrawMatrix.from_numbers(drawn_numbers).sums().tolist()
     
     return {
         "sums": sums,
@@ -251,16 +226,16 @@ def calculate_even_odd_ratio(drawn_numbers):
     Returns:
         dict: Proporção de pares e ímpares
     """
-    even_odd_counts = []
-    
-    for game in drawn_numbers:
-        even_count = sum(1 for num in game if num % 2 == 0)
-        odd_count = len(game) - even_count
-        even_odd_counts.append({
-            "even": even_count,
-            "odd": odd_count,
-            "ratio": even_count / len(game) if len(game) > 0 else 0
-        })
+    matrix = DrawMatrix.from_numbers(drawn_numbers)
+    even_counts = matrix.even_counts()
+    odd_counts = matrix.odd_counts()
+    totals = even_counts + odd_counts
+    ratios = np.divide(even_counts, totals, out=np.zeros(len(totals)), where=totals > 0)
+    
+    even_odd_counts = [
+        {"even": int(even), "odd": int(odd), "ratio": float(ratio)}
+        for even, odd, ratio in zip(even_counts, odd_counts, ratios)
+    ]
     
     # Calcular médias
     avg_even = sum(item["even"] for item in even_odd_counts) / len(even_odd_counts) if even_odd_counts else 0
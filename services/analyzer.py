@@ -4,81 +4,189 @@ import random
 from collections import Counter
 import sqlite3
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from src.services import bitmask
+from src.services.resilience import CircuitBreaker, SingleFlight
+from src.services.result_cache import NOT_MODIFIED, StaleWhileRevalidateCache, schedule_ttl
 
 # Configurações
 DB_NAME = "lottery_history.db"
 API_BASE_URL = "https://loteriascaixa-api.herokuapp.com/api"
+FETCH_MAX_WORKERS = 16
 
+# Chamadas à API protegidas pelo circuit breaker: tempo limite (conexão, leitura) e novas tentativas.
+# As tentativas são feitas em _api_get (não no adaptador HTTP) para que cada falha conte no breaker.
+API_TIMEOUT = (3.05, 5)
+API_RETRIES = 1
+API_BACKOFF = 0.3
+API_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# draw_days: dias da semana com sorteio (segunda = 0)
 SUPPORTED_GAMES = {
-    "megasena": {"name": "Mega-Sena", "numbers": 6, "range": (1, 60)},
-    "quina": {"name": "Quina", "numbers": 5, "range": (1, 80)},
-    "lotofacil": {"name": "Lotofácil", "numbers": 15, "range": (1, 25)},
-    "maismilionaria": {"name": "Mais Milionária", "numbers": 6, "range": (1, 50), "trevos": 2, "trevos_range": (1, 6)},
-    "timemania": {"name": "Timemania", "numbers": 10, "range": (1, 80), "time_coracao": True},
+    "megasena": {"name": "Mega-Sena", "numbers": 6, "range": (1, 60), "draw_days": (1, 3, 5)},
+    "quina": {"name": "Quina", "numbers": 5, "range": (1, 80), "draw_days": (0, 1, 2, 3, 4, 5)},
+    "lotofacil": {"name": "Lotofácil", "numbers": 15, "range": (1, 25), "draw_days": (0, 1, 2, 3, 4, 5)},
+    "maismilionaria": {"name": "Mais Milionária", "numbers": 6, "range": (1, 50), "trevos": 2, "trevos_range": (1, 6), "draw_days": (2, 5)},
+    "timemania": {"name": "Timemania", "numbers": 10, "range": (1, 80), "time_coracao": True, "draw_days": (1, 3, 5)},
 }
 
+def _create_session():
+    """Cria uma sessão HTTP com pool de conexões, sem novas tentativas no transporte (ver _api_get)."""
+    adapter = HTTPAdapter(pool_connections=FETCH_MAX_WORKERS, pool_maxsize=FETCH_MAX_WORKERS, max_retries=0)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+# Sessão compartilhada: reaproveita conexões TCP/TLS entre as requisições
+http_session = _create_session()
+
+# Uma única busca em andamento por (loteria, concurso); falha rápida enquanto a API estiver fora
+inflight_fetches = SingleFlight()
+api_circuit_breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30)
+
+def _api_get(url, headers=None):
+    """
+    Faz um GET na API de resultados respeitando o circuit breaker
+
+    Cada tentativa (inclusive as novas tentativas com backoff) é registrada no breaker, que
+    interrompe as tentativas assim que abre: uma API fora do ar falha em segundos.
+    """
+    for attempt in range(API_RETRIES + 1):
+        if not api_circuit_breaker.allow():
+            raise requests.exceptions.ConnectionError(f"API de resultados indisponível (circuit breaker aberto): {url}")
+        if attempt:
+            time.sleep(API_BACKOFF * 2 ** (attempt - 1))
+
+        try:
+            response = http_session.get(url, timeout=API_TIMEOUT, headers=headers)
+        except requests.exceptions.RequestException:
+            api_circuit_breaker.record_failure()
+            if attempt == API_RETRIES:
+                raise
+            continue
+
+        # Erros 4xx (ex.: concurso inexistente) não indicam indisponibilidade da API
+        if response.status_code >= 500:
+            api_circuit_breaker.record_failure()
+        else:
+            api_circuit_breaker.record_success()
+        if response.status_code not in API_RETRY_STATUSES or attempt == API_RETRIES:
+            return response
+
+def _latest_ttl(lottery_name):
+    """TTL do último resultado, curto nas noites de sorteio e longo no restante do tempo."""
+    draw_days = SUPPORTED_GAMES.get(lottery_name, {}).get("draw_days", range(7))
+    return schedule_ttl(draw_days)
+
+# Cache do último resultado: uma chamada à API por loteria a cada intervalo
+latest_results_cache = StaleWhileRevalidateCache(ttl=_latest_ttl)
+
+def _fetch_latest(lottery_name, validators):
+    """
+    Busca o último resultado usando requisição condicional quando possível
+
+    Args:
+        lottery_name (str): Tipo de loteria
+        validators (dict): ETag/Last-Modified da resposta anterior
+
+    Returns:
+        tuple: (resultado, validadores), NOT_MODIFIED ou None em caso de erro
+    """
+    url = f"{API_BASE_URL}/{lottery_name}/latest"
+    headers = {}
+    if validators.get("etag"):
+        headers["If-None-Match"] = validators["etag"]
+    if validators.get("last_modified"):
+        headers["If-Modified-Since"] = validators["last_modified"]
+
+    try:
+        response = _api_get(url, headers=headers)
+        if response.status_code == 304:
+            return NOT_MODIFIED
+        response.raise_for_status()
+        new_validators = {
+            "etag": response.headers.get("ETag"),
+            "last_modified": response.headers.get("Last-Modified")
+        }
+        return response.json(), new_validators
+    except requests.exceptions.RequestException as e:
+        print(f"Erro ao buscar o último resultado para {lottery_name}: {e}")
+        return None
+
 def fetch_results(lottery_name, contest_number=None):
     """Busca resultados de um concurso específico ou o último resultado."""
-    if contest_number:
-        url = f"{API_BASE_URL}/{lottery_name}/{contest_number}"
-    else:
-        url = f"{API_BASE_URL}/{lottery_name}/latest"
+    if not contest_number:
+        return latest_results_cache.get(
+            lottery_name,
+            lambda validators: inflight_fetches.do(
+                (lottery_name, "latest"), lambda: _fetch_latest(lottery_name, validators)
+            )
+        )
+
+    return inflight_fetches.do((lottery_name, contest_number), lambda: _fetch_contest(lottery_name, contest_number))
+
+# Concursos que a API respondeu com 404 (inexistentes): a sincronização não os busca novamente
+not_found_contests = set()
+
+def _fetch_contest(lottery_name, contest_number):
+    """Busca o resultado de um concurso específico na API."""
+    url = f"{API_BASE_URL}/{lottery_name}/{contest_number}"
     
     try:
-        response = requests.get(url, timeout=10)
+        response = _api_get(url)
+        if response.status_code == 404:
+            not_found_contests.add((lottery_name, int(contest_number)))
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
         print(f"Erro ao buscar resultados para {lottery_name} (concurso {contest_number}): {e}")
         return None
 
-def fetch_last_n_results(lottery_name, n=10):
-    """Busca os últimos N resultados de uma loteria."""
-    latest_data = fetch_results(lottery_name)
-    if not latest_data or 'concurso' not in latest_data:
+def fetch_contest_range(lottery_name, start, end, max_workers=FETCH_MAX_WORKERS):
+    """
+    Busca um intervalo de concursos em paralelo, reaproveitando o pool de conexões
+
+    Args:
+        lottery_name (str): Tipo de loteria
+        start (int): Concurso inicial (inclusive)
+        end (int): Concurso final (inclusive)
+        max_workers (int): Número máximo de requisições simultâneas
+
+    Returns:
+        list: Resultados encontrados, em ordem crescente de concurso
+    """
+    contests = range(max(1, start), end + 1)
+    if not contests:
         return []
-    
-    last_contest = latest_data['concurso']
-    all_results = []
-    for i in range(max(1, last_contest - n + 1), last_contest + 1):
-        result = fetch_results(lottery_name, i)
-        if result:
-            all_results.append(result)
-    return all_results
+
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(contests))) as executor:
+        # executor.map preserva a ordem dos concursos
+        results = executor.map(lambda contest: fetch_results(lottery_name, contest), contests)
+        return [result for result in results if result]
+
+def fetch_last_n_results(lottery_name, n=10):
+    """Busca os últimos N resultados de uma loteria a partir do arquivo local de sorteios."""
+    # Importação local: draw_archive depende deste módulo
+    from src.services.draw_archive import get_last_n_results
+    return get_last_n_results(lottery_name, n)
 
 def calculate_statistics(results):
     """Calcula estatísticas básicas (frequência, atraso) a partir dos resultados."""
     if not results:
         return {"frequency": Counter(), "delay": {}}
 
-    all_numbers = [] 
-    last_occurrence = {}
-    latest_contest = results[-1]['concurso']
-
-    # Determina o range máximo baseado nos dados
-    max_num = 0
-    for result in results:
-        if 'dezenas' in result:
-            all_numbers.extend([int(n) for n in result['dezenas']])
-            current_max = max([int(n) for n in result['dezenas']])
-            if current_max > max_num:
-                max_num = current_max
-            
-            contest = result['concurso']
-            for num in result['dezenas']:
-                num_int = int(num)
-                last_occurrence[num_int] = contest
+    # Importação local: draw_matrix depende deste módulo
+    from src.services.draw_matrix import DrawMatrix
+    matrix = DrawMatrix.from_results(results)
+    if not len(matrix):
+        return {"frequency": Counter(), "delay": {}}
 
-    frequency = Counter(all_numbers)
-    
-    # Calcula o atraso (delay)
-    delay = {}
-    if max_num > 0:
-        for i in range(1, max_num + 1):
-            if i in last_occurrence:
-                delay[i] = latest_contest - last_occurrence[i]
-            else:
-                delay[i] = len(results)
+    numbers = matrix.numbers.tolist()
+    frequency = Counter({num: int(count) for num, count in zip(numbers, matrix.frequency()) if count})
+    delay = dict(zip(numbers, matrix.delay().tolist()))
 
     return {"frequency": frequency, "delay": delay}
 
@@ -159,10 +267,10 @@ def check_hits(played_game, official_result):
     if 'numbers' not in played_game:
         return None
 
-    played_numbers = set(played_game['numbers'])
+    played_numbers = set(int(n) for n in played_game['numbers'])
     official_numbers = set([int(n) for n in official_result['dezenas']])
     
-    hits = len(played_numbers.intersection(official_numbers))
+    hits = bitmask.count_hits(bitmask.encode(played_numbers), bitmask.encode(official_numbers))
     
     result_info = {
         "hits": hits,
@@ -172,9 +280,9 @@ def check_hits(played_game, official_result):
 
     # Tratamento específico para +Milionária (trevos)
     if 'trevos' in played_game and 'trevos' in official_result and official_result['trevos']:
-        played_trevos = set(played_game['trevos'])
+        played_trevos = set(int(t) for t in played_game['trevos'])
         official_trevos = set([int(t) for t in official_result['trevos']])
-        trevo_hits = len(played_trevos.intersection(official_trevos))
+        trevo_hits = bitmask.count_hits(bitmask.encode(played_trevos), bitmask.encode(official_trevos))
         result_info["trevo_hits"] = trevo_hits
         result_info["played_trevos"] = sorted(list(played_trevos))
         result_info["official_trevos"] = sorted(list(official_trevos))
@@ -213,14 +321,29 @@ def init_db():
             hits INTEGER,
             trevo_hits INTEGER,
             time_hit BOOLEAN,
-            prize_info TEXT
+            prize_info TEXT,
+            played_rank INTEGER
         )
     """)
+
+    # Bancos antigos: adiciona o posto combinatório (preenchido por combinadic.backfill_played_ranks)
+    columns = [row[1] for row in cursor.execute("PRAGMA table_info(game_history)")]
+    if "played_rank" not in columns:
+        cursor.execute("ALTER TABLE game_history ADD COLUMN played_rank INTEGER")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_game_history_rank ON game_history (lottery_type, played_rank)")
     conn.commit()
     conn.close()
 
 def save_game(lottery_type, contest_number, played_game):
-    """Salva um jogo realizado no histórico."""
+    """
+    Salva um jogo realizado no histórico
+
+    Um jogo idêntico (mesmos números, trevos e time) já salvo para o mesmo concurso não é
+    duplicado: o id existente é retornado.
+    """
+    # Importação local: combinadic depende deste módulo
+    from src.services.combinadic import ticket_rank
+
     db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DB_NAME)
     conn = sqlite3.connect(db_path)
     cursor = conn.cursor()
@@ -228,12 +351,24 @@ def save_game(lottery_type, contest_number, played_game):
     played_numbers_str = json.dumps(sorted(played_game.get("numbers", [])))
     played_trevos_str = json.dumps(sorted(played_game.get("trevos", []))) if "trevos" in played_game else None
     played_time = played_game.get("time_coracao")
+    played_rank = ticket_rank(lottery_type, played_game.get("numbers", []))
+
+    cursor.execute("""
+        SELECT id FROM game_history
+        WHERE lottery_type = ? AND played_rank = ? AND contest_number IS ?
+            AND played_trevos IS ? AND played_time IS ?
+        LIMIT 1
+    """, (lottery_type, played_rank, contest_number, played_trevos_str, played_time))
+    existing = cursor.fetchone()
+    if existing:
+        conn.close()
+        return existing[0]
 
     cursor.execute("""
         INSERT INTO game_history 
-            (lottery_type, contest_number, played_numbers, played_trevos, played_time)
-        VALUES (?, ?, ?, ?, ?)
-    """, (lottery_type, contest_number, played_numbers_str, played_trevos_str, played_time))
+            (lottery_type, contest_number, played_numbers, played_trevos, played_time, played_rank)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, (lottery_type, contest_number, played_numbers_str, played_trevos_str, played_time, played_rank))
     
     game_id = cursor.lastrowid
     conn.commit()
@@ -293,5 +428,32 @@ def get_history(lottery_type=None, limit=50):
     # Converte as linhas do DB para dicionários
     return [dict(row) for row in history]
 
+def find_played_games(lottery_type, numbers):
+    """
+    Busca os jogos já salvos com exatamente os mesmos números (consulta pelo índice do posto)
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        numbers (list): Números da aposta
+
+    Returns:
+        list: Jogos encontrados (id, concurso e data)
+    """
+    # Importação local: combinadic depende deste módulo
+    from src.services.combinadic import ticket_rank
+
+    db_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DB_NAME)
+    conn = sqlite3.connect(db_path)
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT id, contest_number, date_played FROM game_history
+        WHERE lottery_type = ? AND played_rank = ?
+        ORDER BY date_played DESC
+    """, (lottery_type, ticket_rank(lottery_type, numbers)))
+    games = [dict(row) for row in cursor.fetchall()]
+    conn.close()
+    return games
+
 # Inicializar o DB ao carregar o módulo
 init_db()
@@ -0,0 +1,260 @@
+"""
+Módulo de backtest das estratégias de geração de jogos
+Reproduz cada estratégia ao longo de todo o histórico armazenado usando, para cada concurso,
+apenas os sorteios anteriores a ele; gera M jogos por concurso e conta os acertos por faixa
+de forma vetorizada sobre a matriz de incidência
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.candidate_scoring import ideal_parameters, sample_group_games, sample_weighted_games
+from src.services.draw_matrix import get_draw_matrix
+from src.services.gap_analysis import compute_gaps
+from src.services.prize_odds import PRIZE_RULES, prize_table
+from src.services.ticket_search import TicketObjective
+
+STRATEGIES = ("random", "hot_numbers", "cold_numbers", "last_5_avg", "custom_even_odd", "optimized")
+
+# Candidatos sorteados por concurso na estratégia otimizada (os M melhores viram jogos)
+OPTIMIZED_CANDIDATES = 1000
+
+def _top_mask(order, count, size):
+    """Máscara com os 'count' primeiros números de uma ordenação."""
+    mask = np.zeros(size, dtype=bool)
+    mask[order[:count]] = True
+    return mask
+
+class _OverdueTracker:
+    """
+    Percentil do atraso de cada número em relação aos próprios intervalos anteriores,
+    atualizado concurso a concurso (mesmo critério de gap_analysis.overdue_ranking)
+    """
+
+    def __init__(self, incidence):
+        size = incidence.shape[1]
+        # Nenhum intervalo do histórico parcial excede o maior intervalo do histórico completo
+        self.width = int(compute_gaps(incidence)["max_gap"].max(initial=0)) + 2
+        self.histogram = np.zeros((size, self.width), dtype=np.int32)
+        self.last_row = np.full(size, -1, dtype=np.int64)
+        self.columns = np.arange(size)
+
+    def ranking(self, num_draws):
+        """Números ordenados do mais para o menos vencido, considerando os num_draws primeiros sorteios."""
+        delay = np.where(self.last_row >= 0, num_draws - 1 - self.last_row, num_draws)
+        gap_count = self.histogram.sum(axis=1)
+        exceeded = self.histogram.cumsum(axis=1)[self.columns, np.minimum(delay, self.width - 1)]
+        percentile = np.divide(exceeded, gap_count, out=np.zeros(len(delay)), where=gap_count > 0)
+        return np.lexsort((-delay, -percentile))
+
+    def add_draw(self, row_index, row):
+        """Registra o sorteio da linha row_index."""
+        drawn = np.nonzero(row)[0]
+        seen = drawn[self.last_row[drawn] >= 0]
+        self.histogram[seen, row_index - self.last_row[seen]] += 1
+        self.last_row[drawn] = row_index
+
+def _generate_tickets(strategy, matrix, t, num_tickets, k, state, rng):
+    """
+    Gera os jogos de uma estratégia para a linha t usando apenas as linhas anteriores
+
+    Args:
+        strategy (str): Estratégia
+        matrix (DrawMatrix): Histórico completo
+        t (int): Linha do concurso a ser previsto
+        num_tickets (int): Jogos por concurso
+        k (int): Números por jogo
+        state (dict): Estado incremental da estratégia
+        rng (np.random.Generator): Gerador aleatório
+
+    Returns:
+        np.ndarray: Jogos como índices (M × k)
+    """
+    size = len(matrix.numbers)
+    everything = np.ones(size, dtype=bool)
+
+    if strategy == "random":
+        return sample_group_games([everything], [k], num_tickets, rng)
+
+    if strategy == "hot_numbers":
+        # Os k × 1,5 números mais frequentes até aqui
+        order = np.argsort(-matrix.prefix_counts[t], kind="stable")
+        return sample_group_games([_top_mask(order, int(k * 1.5), size)], [k], num_tickets, rng)
+
+    if strategy == "cold_numbers":
+        order = state["overdue"].ranking(t)
+        return sample_group_games([_top_mask(order, int(k * 1.5), size)], [k], num_tickets, rng)
+
+    if strategy == "last_5_avg":
+        # Frequência ponderada dos últimos 5 sorteios (peso 5 para o mais recente)
+        recent = matrix.incidence[max(0, t - 5):t][::-1]
+        weighted = (np.arange(5, 5 - len(recent), -1)[:, None] * recent).sum(axis=0)
+        appeared = int((weighted > 0).sum())
+        order = np.argsort(-weighted, kind="stable")
+        hot = _top_mask(order, int(appeared * 0.4), size)
+        warm = _top_mask(order, int(appeared * 0.7), size) & ~hot
+        hot_count = max(1, int(k * 0.5))
+        warm_count = max(1, int(k * 0.3))
+        return sample_group_games([hot, warm, weighted == 0], [hot_count, warm_count, k - hot_count - warm_count], num_tickets, rng)
+
+    if strategy == "custom_even_odd":
+        even = matrix.numbers % 2 == 0
+        return sample_group_games([even, ~even], [k // 2, k - k // 2], num_tickets, rng)
+
+    if strategy == "optimized":
+        # Mesma pontuação do otimizador (frequência × 0,6 + atraso × 0,4 nos últimos 100 concursos)
+        start = max(0, t - 100)
+        frequency = matrix.window_frequency(start, t)
+        delay = matrix.window_delay(start, t)
+        weights = (frequency / max(frequency.max(), 1)) * 0.6 + (delay / max(delay.max(), 1)) * 0.4
+        ideal_even, ideal_sum, ideal_sequences = ideal_parameters(matrix.slice(start, t), k, (matrix.min_num, matrix.max_num))
+
+        objective = TicketObjective((matrix.min_num, matrix.max_num), k, ideal_even, ideal_sum, ideal_sequences, weights)
+        candidates = sample_weighted_games(weights, k, OPTIMIZED_CANDIDATES, rng)
+        # Melhores candidatos distintos (a deduplicação só olha o topo da ordenação)
+        best = candidates[np.argsort(-objective(candidates), kind="stable")[:2 * num_tickets]]
+        _, first = np.unique(best, axis=0, return_index=True)
+        tickets = best[np.sort(first)[:num_tickets]]
+        if len(tickets) < num_tickets:
+            extra = sample_group_games([everything], [k], num_tickets - len(tickets), rng)
+            tickets = np.vstack([tickets, extra])
+        return tickets
+
+    raise ValueError(f"Estratégia não suportada: {strategy}")
+
+def backtest_strategy(args):
+    """
+    Executa o backtest de uma estratégia (função de nível de módulo para o pool de processos)
+
+    Args:
+        args (tuple): (lottery_type, strategy, matrix, num_tickets, start_row, seed)
+
+    Returns:
+        dict: Distribuição de acertos e prêmios por faixa da estratégia
+    """
+    lottery_type, strategy, matrix, num_tickets, start_row, seed = args
+    started = time.perf_counter()
+    rng = np.random.default_rng(seed)
+
+    game_info = SUPPORTED_GAMES[lottery_type]
+    rules = PRIZE_RULES[lottery_type]
+    k = game_info["numbers"]
+    drawn = rules["drawn"]
+    has_trevos = "trevos_drawn" in rules and matrix.trevos is not None
+
+    hit_counts = np.zeros(drawn + 1, dtype=np.int64)
+    tier_wins = np.zeros(len(rules["tiers"]), dtype=np.int64)
+    tier_hits = np.array([tier["hits"] for tier in rules["tiers"]])
+
+    state = {}
+    if strategy == "cold_numbers":
+        state["overdue"] = _OverdueTracker(matrix.incidence)
+        for row_index in range(start_row):
+            state["overdue"].add_draw(row_index, matrix.incidence[row_index])
+
+    for t in range(start_row, len(matrix)):
+        tickets = _generate_tickets(strategy, matrix, t, num_tickets, k, state, rng)
+        hits = matrix.incidence[t][tickets].sum(axis=1)
+        hit_counts += np.bincount(hits, minlength=drawn + 1)[:drawn + 1]
+
+        won = hits[:, None] == tier_hits[None, :]
+        if has_trevos:
+            # Trevos aleatórios em cada jogo
+            trevo_tickets = np.argsort(rng.random((num_tickets, matrix.trevos.shape[1])), axis=1)[:, :game_info["trevos"]]
+            trevo_hits = matrix.trevos[t][trevo_tickets].sum(axis=1)
+            accepted = np.array([[h in tier["trevos"] for tier in rules["tiers"]] for h in range(rules["trevos_drawn"] + 1)])
+            won &= accepted[trevo_hits]
+        tier_wins += won.sum(axis=0)
+
+        if strategy == "cold_numbers":
+            state["overdue"].add_draw(t, matrix.incidence[t])
+
+    total_tickets = int(hit_counts.sum())
+    _, tiers = prize_table(lottery_type)
+
+    return {
+        "strategy": strategy,
+        "tickets": total_tickets,
+        "mean_hits": round(float((np.arange(drawn + 1) * hit_counts).sum() / total_tickets), 4) if total_tickets else 0,
+        "hit_distribution": hit_counts.tolist(),
+        "tiers": [
+            {"name": name, "wins": int(wins), "expected": round(float(probability) * total_tickets, 4)}
+            for (name, _, probability), wins in zip(tiers, tier_wins)
+        ],
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
+
+def run_backtest(lottery_type, strategies=None, num_tickets=100, seed=0, min_history=100, processes=None):
+    """
+    Executa o backtest das estratégias sobre o histórico armazenado
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        strategies (list): Estratégias (padrão: todas)
+        num_tickets (int): Jogos gerados por concurso
+        seed (int): Semente (cada estratégia recebe uma semente derivada)
+        min_history (int): Concursos iniciais usados apenas como histórico
+        processes (int): Processos do pool (padrão: um por estratégia, limitado às CPUs)
+
+    Returns:
+        dict: Resultado de cada estratégia e o intervalo de concursos avaliado
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        return {"error": f"Loteria {lottery_type} não suportada"}
+
+    strategies = list(strategies or STRATEGIES)
+    invalid = [strategy for strategy in strategies if strategy not in STRATEGIES]
+    if invalid:
+        return {"error": f"Estratégias não suportadas: {', '.join(invalid)}"}
+
+    matrix = get_draw_matrix(lottery_type)
+    start_row = min(max(min_history, 5), len(matrix))
+    if start_row >= len(matrix):
+        return {"error": "Histórico insuficiente para o backtest"}
+
+    seeds = np.random.SeedSequence(seed).spawn(len(strategies))
+    tasks = [(lottery_type, strategy, matrix, num_tickets, start_row, s) for strategy, s in zip(strategies, seeds)]
+
+    processes = processes or min(len(tasks), os.cpu_count() or 1)
+    if processes > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(backtest_strategy, tasks))
+    else:
+        results = [backtest_strategy(task) for task in tasks]
+
+    return {
+        "lottery_type": lottery_type,
+        "from_contest": int(matrix.contests[start_row]),
+        "to_contest": matrix.last_contest,
+        "num_contests": len(matrix) - start_row,
+        "tickets_per_contest": num_tickets,
+        "seed": seed,
+        "strategies": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Backtest das estratégias de geração de jogos sobre o histórico local")
+    parser.add_argument("lottery", choices=sorted(SUPPORTED_GAMES))
+    parser.add_argument("--strategies", default=",".join(STRATEGIES))
+    parser.add_argument("--tickets", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--min-history", type=int, default=100)
+    parser.add_argument("--processes", type=int, default=None)
+    args = parser.parse_args()
+
+    result = run_backtest(
+        args.lottery,
+        [strategy for strategy in args.strategies.split(",") if strategy],
+        args.tickets,
+        args.seed,
+        args.min_history,
+        args.processes
+    )
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+
+if __name__ == "__main__":
+    main()
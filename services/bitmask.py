@@ -0,0 +1,125 @@
+"""
+Módulo de codificação de jogos e sorteios em máscaras de bits
+Cada jogo vira um inteiro (bit n ligado para o número n); em NumPy, um vetor de palavras uint64
+(2 palavras cobrem a faixa 1–80 da Quina e da Timemania). Acertos são contados com popcount.
+"""
+
+import numpy as np
+
+WORD_BITS = 64
+
+def num_words(max_num):
+    """Quantidade de palavras uint64 necessárias para representar números de 0 a max_num."""
+    return max_num // WORD_BITS + 1
+
+def encode(numbers):
+    """
+    Codifica um jogo como inteiro Python
+
+    Args:
+        numbers (iterable): Números do jogo
+
+    Returns:
+        int: Máscara com o bit n ligado para cada número n
+    """
+    mask = 0
+    for num in numbers:
+        mask |= 1 << int(num)
+    return mask
+
+def decode(mask):
+    """Converte uma máscara inteira de volta para a lista ordenada de números."""
+    numbers = []
+    num = 0
+    while mask:
+        if mask & 1:
+            numbers.append(num)
+        mask >>= 1
+        num += 1
+    return numbers
+
+def popcount_int(mask):
+    """Quantidade de bits ligados em um inteiro Python."""
+    return bin(mask).count("1")
+
+def count_hits(played_mask, official_mask):
+    """Quantidade de números em comum entre duas máscaras inteiras."""
+    return popcount_int(played_mask & official_mask)
+
+def encode_many(games, max_num):
+    """
+    Codifica vários jogos em um array (N × palavras) de uint64
+
+    Args:
+        games (list): Lista de listas de números
+        max_num (int): Maior número possível na loteria
+
+    Returns:
+        np.ndarray: Máscaras dos jogos
+    """
+    words = num_words(max_num)
+    bits = np.zeros((len(games), words * WORD_BITS), dtype=bool)
+    rows = [i for i, game in enumerate(games) for _ in game]
+    cols = [int(num) for game in games for num in game]
+    bits[rows, cols] = True
+    return pack_bits(bits)
+
+def encode_incidence(incidence, min_num):
+    """
+    Codifica uma matriz de incidência (N × números, coluna 0 = min_num) em máscaras uint64
+
+    Args:
+        incidence (np.ndarray): Matriz de incidência (ex.: DrawMatrix.incidence)
+        min_num (int): Número correspondente à primeira coluna
+
+    Returns:
+        np.ndarray: Máscaras (N × palavras)
+    """
+    max_num = min_num + incidence.shape[1] - 1
+    words = num_words(max_num)
+    bits = np.zeros((incidence.shape[0], words * WORD_BITS), dtype=bool)
+    bits[:, min_num:max_num + 1] = incidence.astype(bool)
+    return pack_bits(bits)
+
+def pack_bits(bits):
+    """Empacota uma matriz booleana (N × palavras*64) em palavras uint64 (bit menos significativo primeiro)."""
+    n = bits.shape[0]
+    packed = np.packbits(bits.reshape(n, -1, 8), axis=-1, bitorder="little").reshape(n, -1)
+    # 8 bytes little-endian formam cada palavra uint64
+    return np.ascontiguousarray(packed).view("<u8").astype(np.uint64)
+
+def popcount(words):
+    """Popcount elemento a elemento de um array uint64."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(words)
+
+    # NumPy < 2.0: soma dos bits de cada byte via tabela
+    table = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+    as_bytes = np.ascontiguousarray(words).view(np.uint8).reshape(words.shape + (8,))
+    return table[as_bytes].sum(axis=-1, dtype=np.uint8)
+
+def hits(ticket_masks, draw_masks):
+    """
+    Conta acertos entre máscaras de jogos e de sorteios (com broadcasting)
+
+    Args:
+        ticket_masks (np.ndarray): Máscaras (..., palavras) dos jogos
+        draw_masks (np.ndarray): Máscaras (..., palavras) dos sorteios
+
+    Returns:
+        np.ndarray: Quantidade de acertos (a última dimensão, das palavras, é reduzida)
+    """
+    return popcount(ticket_masks & draw_masks).sum(axis=-1, dtype=np.int64)
+
+def hit_matrix(ticket_masks, draw_masks):
+    """
+    Acertos de todos os jogos contra todos os sorteios
+
+    Args:
+        ticket_masks (np.ndarray): Máscaras (T × palavras)
+        draw_masks (np.ndarray): Máscaras (D × palavras)
+
+    Returns:
+        np.ndarray: Matriz (T × D) de acertos
+    """
+    return hits(ticket_masks[:, None, :], draw_masks[None, :, :])
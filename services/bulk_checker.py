@@ -0,0 +1,148 @@
+"""
+Módulo de conferência de jogos em lote
+Confere milhares de jogos contra um intervalo de concursos do arquivo local de sorteios,
+calculando acertos de números, trevos e Time do Coração de todos os pares (jogo, concurso)
+em uma única passada vetorizada sobre máscaras de bits
+"""
+
+import time
+import numpy as np
+from src.services import bitmask
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_matrix import get_draw_matrix
+from src.services.prize_odds import PRIZE_RULES, tier_lookup, validate_ticket
+
+# Limite de pares (jogo, concurso) conferidos de uma vez, para limitar a memória de cada bloco
+MAX_PAIRS_PER_CHUNK = 1 << 21
+
+def _validate_tickets(lottery_type, tickets):
+    """
+    Confere números e trevos de cada jogo
+
+    Returns:
+        tuple: (mensagem de erro ou None, jogos com números e trevos convertidos para inteiros)
+    """
+    normalized = []
+    for index, ticket in enumerate(tickets):
+        try:
+            numbers, trevos = validate_ticket(lottery_type, ticket)
+        except ValueError as e:
+            return f"Jogo {index + 1}: {e}", None
+        normalized.append(dict(ticket, numbers=numbers, trevos=trevos))
+    return None, normalized
+
+def check_tickets(lottery_type, tickets, from_contest=None, to_contest=None, max_contests=None):
+    """
+    Confere jogos contra todos os concursos de um intervalo
+
+    Na +Milionária os trevos são obrigatórios (validate_ticket); o Time do Coração segue a mesma
+    regra de check_hits e só é conferido nos jogos que o informam. Cada par (jogo, concurso) conta uma única faixa, pela quantidade de acertos.
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        tickets (list): Jogos (dicionários com 'numbers', 'trevos' na +Milionária e, opcionalmente, 'time_coracao')
+        from_contest (int): Primeiro concurso (padrão: o último armazenado)
+        to_contest (int): Último concurso (padrão: o último armazenado)
+        max_contests (int): Limite de concursos no intervalo
+
+    Returns:
+        dict: Resumo de cada jogo (melhor resultado, prêmios por faixa e concursos premiados)
+            e o total de prêmios por faixa
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        return {"error": f"Loteria {lottery_type} não suportada"}
+    if not tickets:
+        return {"error": "Nenhum jogo informado"}
+
+    rules = PRIZE_RULES[lottery_type]
+    error, tickets = _validate_tickets(lottery_type, tickets)
+    if error:
+        return {"error": error}
+
+    started = time.perf_counter()
+    matrix = get_draw_matrix(lottery_type)
+    if not len(matrix):
+        return {"error": "Nenhum concurso armazenado para a loteria"}
+
+    to_contest = to_contest or matrix.last_contest
+    from_contest = from_contest or to_contest
+    if from_contest > to_contest:
+        return {"error": "O concurso inicial deve ser menor ou igual ao final"}
+
+    start = int(np.searchsorted(matrix.contests, from_contest, side="left"))
+    stop = int(np.searchsorted(matrix.contests, to_contest, side="right"))
+    draws = matrix.slice(start, stop)
+    if not len(draws):
+        return {"error": f"Nenhum concurso armazenado entre {from_contest} e {to_contest}"}
+    if max_contests and len(draws) > max_contests:
+        return {"error": f"O intervalo deve ter no máximo {max_contests} concursos"}
+
+    min_num, max_num = game_info["range"]
+    ticket_masks = bitmask.encode_many([ticket["numbers"] for ticket in tickets], max_num)
+    draw_masks = bitmask.encode_incidence(draws.incidence, min_num)
+
+    has_trevos = "trevos_drawn" in rules and draws.trevos is not None
+    if has_trevos:
+        min_trevo, max_trevo = game_info["trevos_range"]
+        trevo_masks = bitmask.encode_many([ticket["trevos"] for ticket in tickets], max_trevo)
+        trevo_draws = bitmask.encode_incidence(draws.trevos, min_trevo)
+
+    # Acertos de todos os pares (jogo × concurso), em blocos de jogos
+    num_tickets = len(tickets)
+    hits = np.empty((num_tickets, len(draws)), dtype=np.int64)
+    trevo_hits = np.zeros((num_tickets, len(draws)), dtype=np.int64)
+    chunk = max(1, MAX_PAIRS_PER_CHUNK // len(draws))
+    for first in range(0, num_tickets, chunk):
+        block = slice(first, first + chunk)
+        hits[block] = bitmask.hit_matrix(ticket_masks[block], draw_masks)
+        if has_trevos:
+            trevo_hits[block] = bitmask.hit_matrix(trevo_masks[block], trevo_draws)
+
+    tiers = tier_lookup(rules)[hits, trevo_hits]
+    tier_names = [tier["name"] for tier in rules["tiers"]]
+    tier_wins = np.stack([(tiers == index).sum(axis=1) for index in range(len(tier_names))], axis=1)
+    won = tiers >= 0
+
+    # Time do Coração: comparação direta com o time sorteado em cada concurso
+    time_hits = None
+    if game_info.get("time_coracao") and draws.times is not None:
+        teams = np.array([(ticket.get("time_coracao") or "").strip() for ticket in tickets])
+        time_hits = (teams[:, None] == draws.times[None, :]) & (teams[:, None] != "")
+        tier_names.append("Time do Coração")
+        tier_wins = np.column_stack([tier_wins, time_hits.sum(axis=1)])
+        won |= time_hits
+
+    best = hits.argmax(axis=1)
+    contests = draws.contests
+    summaries = []
+    for index, ticket in enumerate(tickets):
+        summary = {
+            "index": index,
+            "numbers": sorted(ticket["numbers"]),
+            "best_hits": int(hits[index, best[index]]),
+            "best_contest": int(contests[best[index]]),
+            "tier_wins": tier_wins[index].tolist(),
+            "winning_contests": contests[won[index]].tolist()
+        }
+        if has_trevos:
+            summary["trevos"] = sorted(ticket["trevos"])
+            summary["max_trevo_hits"] = int(trevo_hits[index].max())
+        if time_hits is not None:
+            summary["time_coracao"] = ticket.get("time_coracao")
+            summary["time_hits"] = int(time_hits[index].sum())
+        summaries.append(summary)
+
+    drawn = rules["drawn"]
+    return {
+        "lottery_type": lottery_type,
+        "from_contest": int(contests[0]),
+        "to_contest": int(contests[-1]),
+        "num_contests": len(draws),
+        "num_tickets": num_tickets,
+        "hit_distribution": np.bincount(hits.ravel(), minlength=drawn + 1)[:drawn + 1].tolist(),
+        "tiers": [{"name": name, "wins": int(wins)} for name, wins in zip(tier_names, tier_wins.sum(axis=0))],
+        "winning_tickets": int(won.any(axis=1).sum()),
+        "tickets": summaries,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 1)
+    }
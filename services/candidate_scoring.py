@@ -0,0 +1,136 @@
+"""
+Módulo de pontuação vetorizada de jogos candidatos
+Recebe um array (N × k) de jogos e calcula pares/ímpares, soma, sequências,
+dezenas utilizadas e a pontuação final do otimizador em lote
+"""
+
+import numpy as np
+from src.services import bitmask
+
+def sample_weighted_games(weights, k, n, rng=None):
+    """
+    Sorteia N jogos de k números sem repetição, com probabilidade proporcional aos pesos
+    (truque Gumbel top-k: os k maiores log(peso) + ruído de Gumbel de cada linha, calculado
+    na forma equivalente peso / Exp(1), que dispensa logaritmos)
+
+    Args:
+        weights (np.ndarray): Peso de cada número (índice 0 = menor número)
+        k (int): Números por jogo
+        n (int): Quantidade de jogos
+        rng (np.random.Generator): Gerador aleatório
+
+    Returns:
+        np.ndarray: Índices (N × k) dos números escolhidos, ordenados em cada linha
+    """
+    rng = rng or np.random.default_rng()
+    weights = np.maximum(np.asarray(weights, dtype=np.float64), 1e-12)
+    keys = weights / rng.standard_exponential(size=(n, len(weights)))
+    chosen = np.argpartition(-keys, k - 1, axis=1)[:, :k]
+    chosen.sort(axis=1)
+    return chosen
+
+def sample_group_games(groups, counts, num_tickets, rng):
+    """
+    Sorteia jogos escolhendo, em cada grupo de números, a quantidade pedida (sem repetição)
+
+    Se um grupo não tiver números suficientes, a diferença é completada com números aleatórios.
+
+    Args:
+        groups (list): Máscaras booleanas (tamanho do volante) de cada grupo
+        counts (list): Quantidade de números de cada grupo
+        num_tickets (int): Quantidade de jogos
+        rng (np.random.Generator): Gerador aleatório
+
+    Returns:
+        np.ndarray: Jogos como índices (M × soma de counts)
+    """
+    size = len(groups[0])
+    chosen = np.zeros((num_tickets, size), dtype=bool)
+    picks = []
+    for group, count in zip(groups, counts):
+        if count <= 0:
+            continue
+        # Chaves aleatórias: números do grupo primeiro, depois os demais livres, nunca os já escolhidos
+        keys = rng.random((num_tickets, size)) + np.where(group, 1.0, 0.0)
+        keys[chosen] = -1.0
+        pick = np.argpartition(-keys, count - 1, axis=1)[:, :count]
+        chosen[np.arange(num_tickets)[:, None], pick] = True
+        picks.append(pick)
+    return np.hstack(picks)
+
+def ideal_parameters(matrix, numbers_per_game, number_range):
+    """
+    Quantidade de pares, soma e sequências ideais (medianas dos concursos da matriz)
+
+    Args:
+        matrix (DrawMatrix): Concursos de referência
+        numbers_per_game (int): Números por jogo
+        number_range (tuple): Faixa de números da loteria
+
+    Returns:
+        tuple: (ideal_even, ideal_sum, ideal_sequences)
+    """
+    if not len(matrix):
+        min_num, max_num = number_range
+        return numbers_per_game // 2, numbers_per_game * (min_num + max_num) // 2, 0
+    return (
+        int(np.median(matrix.even_counts())),
+        int(np.median(matrix.sums())),
+        int(np.median(matrix.sequences()))
+    )
+
+def candidate_features(candidates, number_range):
+    """
+    Calcula as características de cada jogo candidato
+
+    Args:
+        candidates (np.ndarray): Jogos (N × k)
+        number_range (tuple): Faixa de números da loteria
+
+    Returns:
+        dict: Arrays de tamanho N com even, odd, sum, sequences e decades_used,
+            e num_decades (total de dezenas do volante)
+    """
+    games = np.sort(np.asarray(candidates, dtype=np.int64), axis=1)
+    min_num, max_num = number_range
+
+    even = (games % 2 == 0).sum(axis=1)
+    decade_bits = np.left_shift(np.uint64(1), ((games - min_num) // 10).astype(np.uint64))
+
+    return {
+        "even": even,
+        "odd": games.shape[1] - even,
+        "sum": games.sum(axis=1),
+        "sequences": (np.diff(games, axis=1) == 1).sum(axis=1),
+        "decades_used": bitmask.popcount(np.bitwise_or.reduce(decade_bits, axis=1)).astype(np.int64),
+        "num_decades": (max_num - min_num) // 10 + 1
+    }
+
+def score_candidates(candidates, number_range, ideal_even, ideal_sum, ideal_sequences):
+    """
+    Pontua jogos candidatos em lote (quanto mais próximo do ideal, maior a pontuação)
+
+    Args:
+        candidates (np.ndarray): Jogos (N × k)
+        number_range (tuple): Faixa de números da loteria
+        ideal_even (int): Quantidade ideal de números pares
+        ideal_sum (int): Soma ideal dos números
+        ideal_sequences (int): Quantidade ideal de sequências
+
+    Returns:
+        tuple: (pontuações de tamanho N, características de candidate_features)
+    """
+    features = candidate_features(candidates, number_range)
+
+    even_diff = np.abs(features["even"] - ideal_even)
+    sum_diff = np.abs(features["sum"] - ideal_sum)
+    seq_diff = np.abs(features["sequences"] - ideal_sequences)
+
+    scores = (
+        (1 / (even_diff + 1)) * 25 +  # 25% para distribuição par/ímpar
+        (1 / (sum_diff + 1)) * 25 +   # 25% para soma
+        (1 / (seq_diff + 1)) * 25 +   # 25% para sequências
+        (features["decades_used"] / features["num_decades"]) * 25  # 25% para distribuição por dezenas
+    )
+
+    return scores, features
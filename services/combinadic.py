@@ -0,0 +1,173 @@
+"""
+Módulo de numeração combinatória (combinadic)
+Converte qualquer aposta ordenada em um único inteiro (posto) e de volta, permitindo guardar
+jogos em 8 bytes e consultar em O(1) se uma combinação já foi sorteada ou jogada
+"""
+
+import json
+import sqlite3
+import threading
+from math import comb
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_archive import get_db_path
+from src.services.draw_matrix import get_draw_matrix
+from src.services.prize_odds import PRIZE_RULES
+
+# Maior aposta numerada (Mega-Sena com 20 números); C(80, 20) ainda cabe em int64
+MAX_BET_SIZE = 20
+MAX_POPULATION = 80
+
+# BINOMIAL_INT64[n, j] = C(n, j), para as conversões vetorizadas
+BINOMIAL_INT64 = np.array(
+    [[comb(n, j) for j in range(MAX_BET_SIZE + 1)] for n in range(MAX_POPULATION + 1)],
+    dtype=np.int64
+)
+
+def _population(number_range):
+    min_num, max_num = number_range
+    return max_num - min_num + 1
+
+def size_offset(size, number_range):
+    """Quantidade de apostas com menos de 'size' números (posto da primeira aposta desse tamanho)."""
+    n = _population(number_range)
+    return sum(comb(n, j) for j in range(size))
+
+def rank(numbers, number_range):
+    """
+    Posto de uma aposta entre todas as apostas da loteria
+
+    As apostas são ordenadas por tamanho e, dentro do mesmo tamanho, em ordem colexicográfica
+    (a mesma ordem das máscaras do índice de combinações); assim apostas de tamanhos
+    diferentes nunca recebem o mesmo posto.
+
+    Args:
+        numbers (list): Números da aposta
+        number_range (tuple): Faixa de números da loteria
+
+    Returns:
+        int: Posto da aposta
+    """
+    min_num, max_num = number_range
+    positions = sorted(int(num) - min_num for num in numbers)
+    if len(set(positions)) != len(positions) or any(not 0 <= p <= max_num - min_num for p in positions):
+        raise ValueError(f"Os números devem ser distintos e estar entre {min_num} e {max_num}")
+    return size_offset(len(positions), number_range) + sum(comb(p, i + 1) for i, p in enumerate(positions))
+
+def unrank(value, number_range):
+    """
+    Aposta correspondente a um posto (inverso de rank)
+
+    Args:
+        value (int): Posto da aposta
+        number_range (tuple): Faixa de números da loteria
+
+    Returns:
+        list: Números da aposta, em ordem crescente
+    """
+    min_num, max_num = number_range
+    n = _population(number_range)
+    if value < 0 or value >= 2 ** n:
+        raise ValueError(f"Posto fora do intervalo: {value}")
+
+    size = 0
+    while value >= comb(n, size):
+        value -= comb(n, size)
+        size += 1
+
+    # Do maior para o menor: o maior p com C(p, i) <= posto restante
+    numbers = []
+    p = n
+    for i in range(size, 0, -1):
+        p -= 1
+        while comb(p, i) > value:
+            p -= 1
+        value -= comb(p, i)
+        numbers.append(p + min_num)
+    return numbers[::-1]
+
+def rank_many(positions, number_range):
+    """
+    Postos de várias apostas do mesmo tamanho de uma vez
+
+    Args:
+        positions (np.ndarray): Índices (0 = primeiro número) ordenados em cada linha, shape N × k
+        number_range (tuple): Faixa de números da loteria
+
+    Returns:
+        np.ndarray: Postos int64
+    """
+    positions = np.asarray(positions, dtype=np.int64)
+    k = positions.shape[1]
+    colex = BINOMIAL_INT64[positions, np.arange(1, k + 1)].sum(axis=1)
+    return colex + np.int64(size_offset(k, number_range))
+
+def ticket_rank(lottery_type, numbers):
+    """Posto de uma aposta da loteria (o tamanho da aposta deve ser um dos permitidos)."""
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        raise ValueError(f"Loteria {lottery_type} não suportada")
+    min_bet, max_bet = PRIZE_RULES[lottery_type]["bet_sizes"]
+    if not min_bet <= len(numbers) <= max_bet:
+        raise ValueError(f"A aposta deve ter entre {min_bet} e {max_bet} números")
+    return rank(numbers, game_info["range"])
+
+_drawn_cache = {}
+_drawn_lock = threading.Lock()
+
+def get_drawn_ranks(lottery_type):
+    """
+    Postos de todos os sorteios da loteria (recalculados sempre que a matriz é reconstruída)
+
+    Args:
+        lottery_type (str): Tipo de loteria
+
+    Returns:
+        dict: Posto → concursos em que a combinação foi sorteada
+    """
+    matrix = get_draw_matrix(lottery_type)
+    with _drawn_lock:
+        cached = _drawn_cache.get(lottery_type)
+        if cached is not None and cached[0] is matrix:
+            return cached[1]
+
+        drawn = {}
+        if len(matrix):
+            # Todos os sorteios têm a mesma quantidade de números
+            positions = np.nonzero(matrix.incidence)[1].reshape(len(matrix), -1)
+            for value, contest in zip(rank_many(positions, (matrix.min_num, matrix.max_num)).tolist(), matrix.contests.tolist()):
+                drawn.setdefault(value, []).append(contest)
+        _drawn_cache[lottery_type] = (matrix, drawn)
+        return drawn
+
+def drawn_contests(lottery_type, numbers):
+    """Concursos em que a combinação exata foi sorteada (lista vazia se nunca saiu)."""
+    return list(get_drawn_ranks(lottery_type).get(ticket_rank(lottery_type, numbers), []))
+
+def backfill_played_ranks():
+    """
+    Preenche o posto dos jogos salvos antes da existência da coluna played_rank
+
+    Jogos com aposta inválida ficam sem posto (não são encontrados como repetidos).
+
+    Returns:
+        int: Quantidade de jogos atualizados
+    """
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    rows = cursor.execute(
+        "SELECT id, lottery_type, played_numbers FROM game_history WHERE played_rank IS NULL"
+    ).fetchall()
+    updates = []
+    for game_id, lottery_type, played_numbers in rows:
+        try:
+            updates.append((ticket_rank(lottery_type, json.loads(played_numbers)), game_id))
+        except (ValueError, TypeError):
+            continue
+    cursor.executemany("UPDATE game_history SET played_rank = ? WHERE id = ?", updates)
+    conn.commit()
+    conn.close()
+    return len(updates)
+
+# Preencher os postos pendentes ao carregar o módulo (a tabela é criada por analyzer.init_db)
+backfill_played_ranks()
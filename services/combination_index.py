@@ -0,0 +1,288 @@
+"""
+Módulo de índice de todas as combinações de um volante pequeno
+Enumera as C(n, k) combinações como máscaras de bits (uint32 até 32 números), em ordem
+crescente (colexicográfica), com colunas de características gravadas em disco e abertas
+com memory-map; consultas viram máscaras booleanas vetorizadas sobre as colunas
+"""
+
+import json
+import os
+import threading
+from math import comb
+import numpy as np
+from src.services import bitmask
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_archive import get_db_path
+from src.services.draw_matrix import get_draw_matrix
+
+# Maior índice construído para uma loteria (a Lotofácil tem 3.268.760 combinações)
+MAX_COMBINATIONS = 5_000_000
+
+# Colunas fixas, gravadas em disco (ever_drawn e near_hits dependem do histórico e ficam em memória)
+STATIC_COLUMNS = ("sum", "even", "sequences", "zone_spread")
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_index_dir(lottery_type):
+    """Diretório dos arquivos do índice (ao lado do banco de dados)."""
+    return os.path.join(os.path.dirname(get_db_path()), "combination_index", lottery_type)
+
+def enumerate_masks(n, k):
+    """
+    Todas as combinações de k entre n números como máscaras (bit i = i-ésimo número), em ordem crescente
+
+    Constrói as combinações número a número: as que não usam o número i vêm antes das que o usam,
+    o que é exatamente a ordem colexicográfica (e numérica das máscaras).
+
+    Args:
+        n (int): Quantidade de números do volante (até 64)
+        k (int): Números por combinação
+
+    Returns:
+        np.ndarray: Máscaras uint32 (n <= 32) ou uint64, ordenadas
+    """
+    dtype = np.uint32 if n <= 32 else np.uint64
+    # by_size[j]: combinações de j números entre os i primeiros
+    by_size = [np.zeros(1, dtype=dtype)] + [np.zeros(0, dtype=dtype) for _ in range(k)]
+    for i in range(n):
+        bit = dtype(1) << dtype(i)
+        for j in range(min(i + 1, k), 0, -1):
+            by_size[j] = np.concatenate([by_size[j], by_size[j - 1] | bit])
+    return by_size[k]
+
+def compute_features(masks, number_range, num_zones=5):
+    """
+    Calcula as colunas fixas de cada combinação
+
+    Args:
+        masks (np.ndarray): Máscaras das combinações (bit i = número min_num + i)
+        number_range (tuple): Faixa de números
+        num_zones (int): Quantidade de zonas do volante (mesma divisão de DrawMatrix.zone_counts)
+
+    Returns:
+        dict: Arrays sum, even, sequences (números consecutivos) e zone_spread
+            (diferença entre a zona mais cheia e a mais vazia)
+    """
+    min_num, max_num = number_range
+    n = max_num - min_num + 1
+    dtype = masks.dtype.type
+    numbers = np.arange(min_num, max_num + 1)
+
+    total = np.zeros(len(masks), dtype=np.uint16)
+    zone_size = n // num_zones
+    zone_of = np.minimum(np.arange(n) // zone_size, num_zones - 1)
+    zones = np.zeros((num_zones, len(masks)), dtype=np.uint8)
+    for i in range(n):
+        present = ((masks >> dtype(i)) & dtype(1)).astype(np.uint8)
+        total += present * np.uint16(numbers[i])
+        zones[zone_of[i]] += present
+
+    even_mask = dtype(sum(1 << i for i in range(n) if numbers[i] % 2 == 0))
+    return {
+        "sum": total,
+        "even": bitmask.popcount((masks & even_mask).astype(np.uint64)).astype(np.uint8),
+        "sequences": bitmask.popcount((masks & (masks >> dtype(1))).astype(np.uint64)).astype(np.uint8),
+        "zone_spread": (zones.max(axis=0) - zones.min(axis=0)).astype(np.uint8)
+    }
+
+def build_index(number_range, k, directory, num_zones=5):
+    """
+    Enumera as combinações e grava as máscaras e colunas fixas em arquivos .npy
+
+    Args:
+        number_range (tuple): Faixa de números
+        k (int): Números por combinação
+        directory (str): Diretório de destino
+        num_zones (int): Quantidade de zonas do volante
+
+    Returns:
+        int: Quantidade de combinações
+    """
+    min_num, max_num = number_range
+    masks = enumerate_masks(max_num - min_num + 1, k)
+    features = compute_features(masks, number_range, num_zones)
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "masks.npy"), masks)
+    for name in STATIC_COLUMNS:
+        np.save(os.path.join(directory, f"{name}.npy"), features[name])
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump({"range": list(number_range), "k": k, "num_zones": num_zones, "size": len(masks)}, f)
+    return len(masks)
+
+class CombinationIndex:
+    """
+    Índice de combinações aberto com memory-map, com as colunas do histórico anexadas
+    """
+
+    def __init__(self, directory):
+        """
+        Abre um índice gravado por build_index
+
+        Args:
+            directory (str): Diretório do índice
+        """
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self.min_num, self.max_num = meta["range"]
+        self.k = meta["k"]
+        self.masks = np.load(os.path.join(directory, "masks.npy"), mmap_mode="r")
+        self.columns = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r") for name in STATIC_COLUMNS}
+        self.last_contest = None
+        self.matrix = None
+
+    def __len__(self):
+        return len(self.masks)
+
+    def locate(self, masks):
+        """Posição de cada máscara no índice (as máscaras estão em ordem crescente)."""
+        return np.searchsorted(self.masks, np.asarray(masks, dtype=self.masks.dtype))
+
+    def attach_history(self, matrix):
+        """
+        Calcula as colunas do histórico: se a combinação já foi sorteada e quantas vezes
+        ficou a um número do sorteio (k - 1 acertos ou mais)
+
+        Args:
+            matrix (DrawMatrix): Histórico da loteria
+        """
+        dtype = self.masks.dtype.type
+        ever_drawn = np.zeros(len(self), dtype=bool)
+        near_hits = np.zeros(len(self), dtype=np.uint16)
+
+        if len(matrix):
+            bits = dtype(1) << np.arange(self.max_num - self.min_num + 1, dtype=dtype)
+            draw_masks = (matrix.incidence.astype(dtype) * bits).sum(axis=1, dtype=dtype)
+            ever_drawn[self.locate(draw_masks)] = True
+
+            # Vizinhos com k - 1 acertos: troca de um número sorteado por um não sorteado
+            inside = matrix.incidence.astype(bool)
+            in_bits = bits[np.nonzero(inside)[1].reshape(len(matrix), -1)]
+            out_bits = bits[np.nonzero(~inside)[1].reshape(len(matrix), -1)]
+            neighbors = (draw_masks[:, None, None] ^ in_bits[:, :, None]) | out_bits[:, None, :]
+            neighbors = np.concatenate([draw_masks, neighbors.ravel()])
+            near_hits += np.bincount(self.locate(neighbors), minlength=len(self)).astype(np.uint16)
+
+        self.columns["ever_drawn"] = ever_drawn
+        self.columns["near_hits"] = near_hits
+        self.last_contest = matrix.last_contest
+        self.matrix = matrix
+
+    def decode(self, positions):
+        """Converte posições do índice em listas de números."""
+        masks = np.asarray(self.masks[positions])
+        dtype = masks.dtype.type
+        present = (masks[:, None] >> np.arange(self.max_num - self.min_num + 1, dtype=dtype)) & dtype(1)
+        rows, cols = np.nonzero(present)
+        return (cols.reshape(len(masks), self.k) + self.min_num).tolist()
+
+    def filter(self, ranges=None, ever_drawn=None, max_near_hits=None):
+        """
+        Combinações que atendem a todos os filtros
+
+        Args:
+            ranges (dict): Faixas [mínimo, máximo] por coluna (sum, even, sequences, zone_spread, near_hits)
+            ever_drawn (bool): Exigir combinações já sorteadas (True) ou nunca sorteadas (False)
+            max_near_hits (int): Limite de vezes que a combinação ficou a um número do sorteio
+
+        Returns:
+            np.ndarray: Posições das combinações selecionadas
+        """
+        selected = np.ones(len(self), dtype=bool)
+        for name, (low, high) in (ranges or {}).items():
+            if name not in self.columns:
+                raise ValueError(f"Coluna desconhecida: {name}")
+            column = self.columns[name]
+            if low is not None:
+                selected &= column >= low
+            if high is not None:
+                selected &= column <= high
+        if ever_drawn is not None:
+            selected &= self.columns["ever_drawn"] == bool(ever_drawn)
+        if max_near_hits is not None:
+            selected &= self.columns["near_hits"] <= max_near_hits
+        return np.flatnonzero(selected)
+
+def index_size(lottery_type):
+    """Quantidade de combinações da loteria (C(n, k))."""
+    game_info = SUPPORTED_GAMES[lottery_type]
+    min_num, max_num = game_info["range"]
+    return comb(max_num - min_num + 1, game_info["numbers"])
+
+def supports_index(lottery_type):
+    """Se a loteria é pequena o suficiente para ter o índice completo."""
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        return False
+    min_num, max_num = game_info["range"]
+    return max_num - min_num + 1 <= 64 and index_size(lottery_type) <= MAX_COMBINATIONS
+
+def get_combination_index(lottery_type):
+    """
+    Retorna o índice da loteria, construindo os arquivos na primeira vez e atualizando
+    as colunas do histórico quando o arquivo de sorteios muda
+
+    Args:
+        lottery_type (str): Tipo de loteria
+
+    Returns:
+        CombinationIndex: Índice aberto
+    """
+    if not supports_index(lottery_type):
+        raise ValueError(f"Índice de combinações indisponível para {lottery_type}")
+
+    matrix = get_draw_matrix(lottery_type)
+    with _indexes_lock:
+        index = _indexes.get(lottery_type)
+        if index is None:
+            directory = get_index_dir(lottery_type)
+            if not os.path.exists(os.path.join(directory, "meta.json")):
+                build_index(SUPPORTED_GAMES[lottery_type]["range"], SUPPORTED_GAMES[lottery_type]["numbers"], directory)
+            index = CombinationIndex(directory)
+            _indexes[lottery_type] = index
+        # A matriz é reconstruída sempre que o arquivo muda (inclusive concursos antigos ou corrigidos)
+        if index.matrix is not matrix:
+            index.attach_history(matrix)
+        return index
+
+def query_combinations(lottery_type, ranges=None, ever_drawn=None, max_near_hits=None,
+                       limit=50, offset=0, sample=False, seed=None):
+    """
+    Consulta o índice de combinações da loteria
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        ranges (dict): Faixas [mínimo, máximo] por coluna
+        ever_drawn (bool): Filtrar combinações já sorteadas (True) ou nunca sorteadas (False)
+        max_near_hits (int): Limite de vezes que a combinação ficou a um número do sorteio
+        limit (int): Quantidade de combinações retornadas
+        offset (int): Deslocamento na lista (quando sample é False)
+        sample (bool): Sortear as combinações retornadas entre as selecionadas
+        seed (int): Semente do sorteio
+
+    Returns:
+        dict: Total de combinações selecionadas e as combinações retornadas com suas colunas
+    """
+    index = get_combination_index(lottery_type)
+    positions = index.filter(ranges, ever_drawn, max_near_hits)
+    total = len(positions)
+
+    if sample:
+        rng = np.random.default_rng(seed)
+        chosen = np.sort(rng.choice(positions, size=min(limit, total), replace=False)) if total else positions
+    else:
+        chosen = positions[offset:offset + limit]
+
+    games = index.decode(chosen)
+    columns = {name: np.asarray(column[chosen]).tolist() for name, column in index.columns.items()}
+    return {
+        "lottery_type": lottery_type,
+        "index_size": len(index),
+        "last_contest": index.last_contest,
+        "total": total,
+        "combinations": [
+            dict({"numbers": numbers}, **{name: values[i] for name, values in columns.items()})
+            for i, numbers in enumerate(games)
+        ]
+    }
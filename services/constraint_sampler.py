@@ -0,0 +1,223 @@
+"""
+Módulo de amostragem uniforme com restrições
+Conta, por programação dinâmica, quantos jogos completam cada estado parcial (quantidade de
+números, soma, pares, sequência atual e números na zona atual) e sorteia os números um a um
+com probabilidade proporcional a essas contagens: cada jogo viável tem a mesma chance e não há
+rejeição, por mais apertadas que sejam as restrições
+"""
+
+from functools import lru_cache
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+
+# Limite de células da tabela de contagens (int64), para limitar a memória de cada amostrador
+MAX_DP_CELLS = 30_000_000
+
+class ConstraintSampler:
+    """
+    Amostrador uniforme dos jogos que atendem a um conjunto de restrições
+
+    As zonas são faixas contíguas do volante (mesma divisão de DrawMatrix.zone_counts); como
+    são percorridas em ordem, basta guardar a quantidade de números na zona atual.
+    """
+
+    def __init__(self, number_range, numbers_per_game, sum_range=None, even_range=None,
+                 num_zones=None, zone_quotas=None, include=(), exclude=(), max_run=None):
+        """
+        Monta a tabela de contagens
+
+        Args:
+            number_range (tuple): Faixa de números
+            numbers_per_game (int): Números por jogo
+            sum_range (tuple): Soma mínima e máxima (None = sem limite)
+            even_range (tuple): Quantidade mínima e máxima de números pares
+            num_zones (int): Quantidade de zonas do volante
+            zone_quotas (list): Quantidade [mínima, máxima] de números em cada zona
+            include (iterable): Números obrigatórios
+            exclude (iterable): Números proibidos
+            max_run (int): Maior sequência de números consecutivos permitida
+        """
+        self.min_num, self.max_num = number_range
+        n = self.max_num - self.min_num + 1
+        k = numbers_per_game
+        self.k = k
+        self.numbers = np.arange(self.min_num, self.max_num + 1)
+
+        include = {int(num) for num in include}
+        exclude = {int(num) for num in exclude}
+        if include & exclude:
+            raise ValueError("Um número não pode ser obrigatório e proibido ao mesmo tempo")
+        if any(not self.min_num <= num <= self.max_num for num in include | exclude):
+            raise ValueError(f"Os números devem estar entre {self.min_num} e {self.max_num}")
+        self.required = np.isin(self.numbers, list(include))
+        self.allowed = ~np.isin(self.numbers, list(exclude))
+
+        # Dimensões desligadas (tamanho 1) quando a restrição não é usada
+        self.track_sum = sum_range is not None
+        self.track_even = even_range is not None
+        self.track_run = max_run is not None and max_run < k
+        self.track_zone = bool(zone_quotas)
+
+        max_sum = int(self.numbers[-k:].sum())
+        sum_low, sum_high = sum_range if self.track_sum else (0, max_sum)
+        sum_low = 0 if sum_low is None else sum_low
+        sum_high = max_sum if sum_high is None else min(sum_high, max_sum)
+        even_low, even_high = even_range if self.track_even else (0, k)
+        even_low = 0 if even_low is None else even_low
+        even_high = k if even_high is None else min(even_high, k)
+
+        if self.track_zone:
+            num_zones = num_zones or len(zone_quotas)
+            if len(zone_quotas) != num_zones:
+                raise ValueError(f"Informe a quantidade mínima e máxima de números para cada uma das {num_zones} zonas")
+            zone_size = n // num_zones
+            self.zone_of = np.minimum(np.arange(n) // zone_size, num_zones - 1)
+            quotas = [(low or 0, k if high is None else high) for low, high in zone_quotas]
+            zone_cap = min(k, max(high for _, high in quotas)) + 1
+        else:
+            self.zone_of = np.zeros(n, dtype=np.int64)
+            quotas = [(0, k)]
+            zone_cap = 1
+
+        self.shape = (
+            k + 1,
+            sum_high + 1 if self.track_sum else 1,
+            even_high + 1 if self.track_even else 1,
+            max_run + 1 if self.track_run else 1,
+            zone_cap
+        )
+        if int(np.prod(self.shape)) * (n + 1) > MAX_DP_CELLS:
+            raise ValueError("Restrições abrangentes demais para a amostragem exata; informe limites mais estreitos")
+
+        # Estado final: k números, soma e pares dentro dos limites
+        final = np.zeros(self.shape, dtype=np.int64)
+        sums = np.arange(self.shape[1])
+        evens = np.arange(self.shape[2])
+        valid_sum = (sums >= sum_low) & (sums <= sum_high) if self.track_sum else np.ones(1, dtype=bool)
+        valid_even = (evens >= even_low) & (evens <= even_high) if self.track_even else np.ones(1, dtype=bool)
+        final[k] = (valid_sum[:, None] & valid_even[None, :]).astype(np.int64)[:, :, None, None]
+
+        # after[i]: contagens a partir do estado depois de decidir o número i
+        # (no fim de cada zona a cota é conferida e o contador da zona é zerado)
+        self.after = [None] * n
+        counts = final
+        zone_counts = np.arange(zone_cap)
+        for i in range(n - 1, -1, -1):
+            if self.track_zone and (i == n - 1 or self.zone_of[i + 1] != self.zone_of[i]):
+                low, high = quotas[self.zone_of[i]]
+                valid_zone = (zone_counts >= low) & (zone_counts <= high)
+                counts = np.broadcast_to(counts[..., :1], self.shape) * valid_zone
+            self.after[i] = counts
+            counts = self._before(i, counts)
+        self.total = int(counts[0, 0, 0, 0, 0])
+
+    def _shifts(self, i):
+        """Deslocamento de cada dimensão do estado ao marcar o número i."""
+        number = int(self.numbers[i])
+        return (
+            1,
+            number if self.track_sum else 0,
+            int(number % 2 == 0) if self.track_even else 0,
+            1 if self.track_run else 0,
+            1 if self.track_zone else 0
+        )
+
+    def _before(self, i, after):
+        """Contagens a partir do estado antes de decidir o número i."""
+        counts = np.zeros(self.shape, dtype=np.int64)
+        if self.allowed[i]:
+            shifts = self._shifts(i)
+            target = tuple(slice(0, size - shift) for size, shift in zip(self.shape, shifts))
+            source = tuple(slice(shift, None) for shift in shifts)
+            counts[target] += after[source]
+        if not self.required[i]:
+            # Pular o número encerra a sequência atual
+            counts += after[:, :, :, :1, :]
+        return counts
+
+    def sample(self, n, rng):
+        """
+        Sorteia n jogos uniformes entre os viáveis (independentes, podendo repetir)
+
+        Args:
+            n (int): Quantidade de jogos
+            rng (np.random.Generator): Gerador aleatório
+
+        Returns:
+            np.ndarray: Jogos como índices (n × k), em ordem crescente
+        """
+        if not self.total:
+            raise ValueError("Nenhum jogo atende às restrições informadas")
+
+        state = np.zeros((5, n), dtype=np.int64)
+        remaining = np.full(n, self.total, dtype=np.int64)
+        chosen = np.zeros((n, len(self.numbers)), dtype=bool)
+        for i in range(len(self.numbers)):
+            after = self.after[i]
+            skip = np.zeros(n, dtype=np.int64)
+            if not self.required[i]:
+                skip = after[state[0], state[1], state[2], 0, state[4]]
+
+            take = np.zeros(n, dtype=np.int64)
+            if self.allowed[i]:
+                target = state + np.array(self._shifts(i))[:, None]
+                inside = np.all(target < np.array(self.shape)[:, None], axis=0)
+                clipped = np.minimum(target, np.array(self.shape)[:, None] - 1)
+                take = np.where(inside, after[tuple(clipped)], 0)
+
+            # Marca o número com probabilidade take / (take + skip), de forma exata
+            picked = rng.integers(0, np.maximum(remaining, 1)) < take
+            chosen[:, i] = picked
+            if self.allowed[i]:
+                state = np.where(picked, target, state)
+            if self.track_run:
+                state[3] = np.where(picked, state[3], 0)
+            remaining = np.where(picked, take, skip)
+            if self.track_zone and (i == len(self.numbers) - 1 or self.zone_of[i + 1] != self.zone_of[i]):
+                state[4] = 0
+
+        return np.nonzero(chosen)[1].reshape(n, self.k)
+
+@lru_cache(maxsize=8)
+def _cached_sampler(lottery_type, sum_range, even_range, num_zones, zone_quotas, include, exclude, max_run):
+    game_info = SUPPORTED_GAMES[lottery_type]
+    return ConstraintSampler(
+        game_info["range"], game_info["numbers"], sum_range, even_range,
+        num_zones, zone_quotas, include, exclude, max_run
+    )
+
+def _optional_int(params, key):
+    value = params.get(key)
+    return None if value is None or value == "" else int(value)
+
+def get_constraint_sampler(lottery_type, params):
+    """
+    Amostrador das restrições informadas nos parâmetros da requisição (memorizado)
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        params (dict): sum_min, sum_max, even_count (ou even_min e even_max), zone_quotas
+            (lista de [mínimo, máximo] por zona), num_zones, include, exclude e max_run
+
+    Returns:
+        ConstraintSampler: Amostrador com a tabela de contagens pronta
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        raise ValueError(f"Loteria não suportada: {lottery_type}")
+
+    sum_min, sum_max = _optional_int(params, "sum_min"), _optional_int(params, "sum_max")
+    even_count = _optional_int(params, "even_count")
+    even_min = even_count if even_count is not None else _optional_int(params, "even_min")
+    even_max = even_count if even_count is not None else _optional_int(params, "even_max")
+    zone_quotas = params.get("zone_quotas")
+
+    return _cached_sampler(
+        lottery_type,
+        (sum_min, sum_max) if sum_min is not None or sum_max is not None else None,
+        (even_min, even_max) if even_min is not None or even_max is not None else None,
+        _optional_int(params, "num_zones"),
+        tuple(tuple(quota) for quota in zone_quotas) if zone_quotas else None,
+        tuple(sorted(int(num) for num in params.get("include", []))),
+        tuple(sorted(int(num) for num in params.get("exclude", []))),
+        _optional_int(params, "max_run")
+    )
@@ -0,0 +1,163 @@
+"""
+Módulo de análise de coocorrência de números
+Calcula a matriz de pares (números × números) como produto matricial sobre a matriz de
+incidência e as triplas mais frequentes, com cache por (loteria, janela) válido enquanto a
+matriz de sorteios não for reconstruída
+"""
+
+import threading
+from collections import OrderedDict
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_matrix import get_draw_matrix
+
+CACHE_SIZE = 32
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def pair_matrix(incidence):
+    """
+    Matriz de coocorrência de pares: posição (a, b) = sorteios em que a e b saíram juntos
+
+    Args:
+        incidence (np.ndarray): Matriz de incidência (concursos × números)
+
+    Returns:
+        np.ndarray: Matriz simétrica (números × números); a diagonal é a frequência de cada número
+    """
+    x = incidence.astype(np.float32)
+    return np.rint(x.T @ x).astype(np.int64)
+
+def triplet_counts(incidence):
+    """
+    Contagem de triplas: posição (a, b, c) = sorteios com a, b e c juntos
+
+    Para cada número a, multiplica apenas as linhas em que a saiu, o que mantém o custo
+    proporcional a (sorteios × números por sorteio) em vez de sorteios × números³.
+
+    Args:
+        incidence (np.ndarray): Matriz de incidência (concursos × números)
+
+    Returns:
+        np.ndarray: Tensor (números × números × números) de contagens
+    """
+    x = incidence.astype(np.float32)
+    size = x.shape[1]
+    counts = np.zeros((size, size, size), dtype=np.int64)
+    for a in range(size):
+        rows = x[x[:, a] > 0]
+        if len(rows):
+            counts[a] = np.rint(rows.T @ rows)
+    return counts
+
+def _top_k(values, index_arrays, k):
+    """Seleciona os K maiores valores (ordem decrescente) e os índices correspondentes."""
+    k = min(k, len(values))
+    if k <= 0:
+        return []
+    top = np.argpartition(-values, k - 1)[:k]
+    top = top[np.lexsort((top, -values[top]))]
+    return [(tuple(int(idx[i]) for idx in index_arrays), int(values[i])) for i in top]
+
+def _compute(matrix, window):
+    """Calcula os pares para a janela pedida (sem cache)."""
+    start, stop = matrix.window_bounds(last_n=window)
+    incidence = matrix.incidence[start:stop]
+    min_num = matrix.min_num
+
+    pairs = pair_matrix(incidence)
+    a_idx, b_idx = np.triu_indices(len(matrix.numbers), k=1)
+    pair_values = pairs[a_idx, b_idx]
+
+    return {
+        "matrix": matrix,
+        "num_draws": stop - start,
+        "pairs": pairs,
+        "pair_index": (a_idx + min_num, b_idx + min_num),
+        "pair_values": pair_values,
+        "incidence": incidence
+    }
+
+def _get_entry(lottery_type, window):
+    """
+    Retorna o cálculo da janela, reutilizando o cache enquanto a matriz de sorteios for a mesma
+
+    A matriz é reconstruída sempre que o arquivo muda (inclusive concursos antigos ou corrigidos,
+    que não alteram o último concurso), então a entrada guarda a matriz usada no cálculo.
+    """
+    matrix = get_draw_matrix(lottery_type)
+    key = (lottery_type, window)
+
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is not None and entry["matrix"] is matrix:
+            _cache.move_to_end(key)
+            return entry
+
+    entry = _compute(matrix, window)
+    with _cache_lock:
+        _cache[key] = entry
+        _cache.move_to_end(key)
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+    return entry
+
+def _top_triplets(entry, k):
+    """Triplas mais frequentes (calculadas sob demanda e guardadas na entrada do cache)."""
+    with _cache_lock:
+        triplets = entry.get("triplets")
+    if triplets is None:
+        counts = triplet_counts(entry["incidence"])
+        size = counts.shape[0]
+        a_idx, b_idx, c_idx = np.nonzero(
+            (np.arange(size)[:, None, None] < np.arange(size)[None, :, None])
+            & (np.arange(size)[None, :, None] < np.arange(size)[None, None, :])
+        )
+        min_num = entry["matrix"].min_num
+        computed = (counts[a_idx, b_idx, c_idx], (a_idx + min_num, b_idx + min_num, c_idx + min_num))
+        with _cache_lock:
+            triplets = entry.setdefault("triplets", computed)
+    return _top_k(triplets[0], triplets[1], k)
+
+def cooccurrence_analysis(lottery_type, window=None, k=20, include_triplets=False, include_matrix=False):
+    """
+    Analisa coocorrência de pares (e opcionalmente triplas) em uma janela de concursos
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        window (int): Últimos N concursos (None para todo o histórico)
+        k (int): Quantidade de pares/triplas mais frequentes a retornar
+        include_triplets (bool): Incluir as K triplas mais frequentes
+        include_matrix (bool): Incluir a matriz de pares completa
+
+    Returns:
+        dict: Pares (e triplas) mais frequentes da janela
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        return {"error": f"Loteria {lottery_type} não suportada"}
+
+    entry = _get_entry(lottery_type, window)
+
+    analysis = {
+        "lottery_type": lottery_type,
+        "last_contest": entry["matrix"].last_contest,
+        "window": window,
+        "num_draws": entry["num_draws"],
+        "top_pairs": [
+            {"numbers": list(numbers), "count": count}
+            for numbers, count in _top_k(entry["pair_values"], entry["pair_index"], k)
+        ]
+    }
+
+    if include_triplets:
+        analysis["top_triplets"] = [
+            {"numbers": list(numbers), "count": count}
+            for numbers, count in _top_triplets(entry, k)
+        ]
+
+    if include_matrix:
+        analysis["numbers"] = entry["matrix"].numbers.tolist()
+        analysis["pair_matrix"] = entry["pairs"].tolist()
+
+    return analysis
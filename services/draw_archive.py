@@ -0,0 +1,278 @@
+"""
+Módulo de arquivo local de sorteios
+Mantém todos os resultados oficiais em SQLite e sincroniza apenas os concursos novos
+"""
+
+import json
+import os
+import sqlite3
+from src.services.analyzer import DB_NAME, SUPPORTED_GAMES, fetch_contest_range, fetch_results, not_found_contests
+
+def get_db_path():
+    """Retorna o caminho do banco de dados compartilhado com o histórico de jogos."""
+    return os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), DB_NAME)
+
+def init_draws_table():
+    """Cria a tabela de sorteios oficiais se não existir."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS draws (
+            lottery_type TEXT NOT NULL,
+            concurso INTEGER NOT NULL,
+            data TEXT,
+            dezenas TEXT NOT NULL,
+            trevos TEXT,
+            time_coracao TEXT,
+            payload TEXT,
+            PRIMARY KEY (lottery_type, concurso)
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+def normalize_result(result):
+    """
+    Converte um resultado da API para a linha armazenada na tabela draws
+
+    Args:
+        result (dict): Resultado no formato da API (concurso, dezenas, trevos, timeCoracao)
+
+    Returns:
+        tuple: (concurso, data, dezenas, trevos, time_coracao) ou None se inválido
+    """
+    if not result or 'concurso' not in result or not result.get('dezenas'):
+        return None
+
+    dezenas = sorted(int(n) for n in result['dezenas'])
+    trevos = sorted(int(t) for t in result['trevos']) if result.get('trevos') else None
+    time_coracao = result.get('timeCoracao') or None
+
+    return (
+        int(result['concurso']),
+        result.get('data'),
+        json.dumps(dezenas),
+        json.dumps(trevos) if trevos else None,
+        time_coracao
+    )
+
+# Funções chamadas sempre que o arquivo recebe concursos: listener(lottery_type, results)
+# (results é None quando a alteração veio de uma importação em lote)
+_draws_listeners = []
+
+def add_draws_listener(listener):
+    """Registra uma função a ser chamada quando novos concursos forem gravados."""
+    if listener not in _draws_listeners:
+        _draws_listeners.append(listener)
+
+def notify_draws_changed(lottery_type, results=None):
+    """Avisa os listeners registrados de que o arquivo da loteria foi alterado."""
+    for listener in _draws_listeners:
+        try:
+            listener(lottery_type, results)
+        except Exception as e:
+            print(f"Erro ao processar novos concursos de {lottery_type}: {e}")
+
+INSERT_DRAW_SQL = """
+    INSERT OR REPLACE INTO draws
+        (lottery_type, concurso, data, dezenas, trevos, time_coracao, payload)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+"""
+
+def build_draw_rows(lottery_type, results):
+    """Converte resultados no formato da API em linhas para INSERT_DRAW_SQL, ignorando os inválidos."""
+    rows = []
+    for result in results:
+        normalized = normalize_result(result)
+        if normalized:
+            rows.append((lottery_type,) + normalized + (json.dumps(result),))
+    return rows
+
+def store_draws(lottery_type, results):
+    """
+    Grava resultados oficiais no arquivo local (substituindo concursos já existentes)
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        results (list): Lista de resultados no formato da API
+
+    Returns:
+        int: Quantidade de concursos gravados
+    """
+    rows = build_draw_rows(lottery_type, results)
+    if not rows:
+        return 0
+
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.executemany(INSERT_DRAW_SQL, rows)
+    conn.commit()
+    conn.close()
+
+    notify_draws_changed(lottery_type, results)
+    return len(rows)
+
+def get_max_contest(lottery_type):
+    """Retorna o maior concurso armazenado para a loteria (0 se o arquivo estiver vazio)."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute("SELECT MAX(concurso) FROM draws WHERE lottery_type = ?", (lottery_type,))
+    row = cursor.fetchone()
+    conn.close()
+    return row[0] or 0
+
+def get_min_contest(lottery_type):
+    """Retorna o menor concurso armazenado para a loteria (0 se o arquivo estiver vazio)."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute("SELECT MIN(concurso) FROM draws WHERE lottery_type = ?", (lottery_type,))
+    row = cursor.fetchone()
+    conn.close()
+    return row[0] or 0
+
+def get_stored_contests(lottery_type, from_contest, to_contest):
+    """Conjunto dos concursos armazenados no intervalo [from_contest, to_contest]."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT concurso FROM draws WHERE lottery_type = ? AND concurso BETWEEN ? AND ?",
+        (lottery_type, from_contest, to_contest)
+    )
+    contests = {row[0] for row in cursor.fetchall()}
+    conn.close()
+    return contests
+
+def _contiguous_ranges(contests):
+    """Agrupa concursos ordenados em intervalos contínuos [início, fim]."""
+    ranges = []
+    for contest in contests:
+        if ranges and contest == ranges[-1][1] + 1:
+            ranges[-1][1] = contest
+        else:
+            ranges.append([contest, contest])
+    return ranges
+
+def sync_draws(lottery_type, since=None):
+    """
+    Sincroniza o arquivo local buscando apenas os concursos que faltam entre 'since' e o último
+
+    Concursos cuja busca falhou em uma sincronização anterior continuam faltando no arquivo e
+    são buscados novamente na próxima, exceto os que a API informou não existir (404).
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        since (int): Primeiro concurso que deve estar no arquivo (por padrão, o menor concurso
+            já armazenado, ou todo o histórico a partir do concurso 1 se o arquivo estiver vazio)
+
+    Returns:
+        int: Quantidade de concursos novos gravados
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        return 0
+
+    latest_data = fetch_results(lottery_type)
+    if not latest_data or 'concurso' not in latest_data:
+        return 0
+
+    last_contest = int(latest_data['concurso'])
+    start = max(1, since if since is not None else (get_min_contest(lottery_type) or 1))
+    stored = get_stored_contests(lottery_type, start, last_contest)
+
+    # O último concurso já foi obtido, não precisa ser buscado novamente
+    missing = [
+        contest for contest in range(start, last_contest)
+        if contest not in stored and (lottery_type, contest) not in not_found_contests
+    ]
+    new_results = []
+    for first, last in _contiguous_ranges(missing):
+        new_results.extend(fetch_contest_range(lottery_type, first, last))
+    if last_contest not in stored:
+        new_results.append(latest_data)
+
+    if not new_results:
+        return 0
+    return store_draws(lottery_type, new_results)
+
+def sync_window(lottery_type, n):
+    """
+    Garante que os últimos N concursos estejam no arquivo local, completando as lacunas
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        n (int): Tamanho da janela
+
+    Returns:
+        int: Quantidade de concursos novos gravados
+    """
+    latest_data = fetch_results(lottery_type)
+    if not latest_data or 'concurso' not in latest_data:
+        return 0
+    return sync_draws(lottery_type, since=int(latest_data['concurso']) - n + 1)
+
+def _row_to_result(row):
+    """Converte uma linha da tabela draws para o formato de resultado da API."""
+    result = {
+        'concurso': row['concurso'],
+        'data': row['data'],
+        'dezenas': [f"{n:02d}" for n in json.loads(row['dezenas'])]
+    }
+    if row['trevos']:
+        result['trevos'] = [str(t) for t in json.loads(row['trevos'])]
+    if row['time_coracao']:
+        result['timeCoracao'] = row['time_coracao']
+    return result
+
+def load_draws(lottery_type, last_n=None, from_contest=None, to_contest=None):
+    """
+    Lê resultados do arquivo local em ordem crescente de concurso
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        last_n (int): Limita aos últimos N concursos do intervalo
+        from_contest (int): Concurso inicial (inclusive)
+        to_contest (int): Concurso final (inclusive)
+
+    Returns:
+        list: Resultados no formato da API (concurso, data, dezenas, trevos, timeCoracao)
+    """
+    query = "SELECT concurso, data, dezenas, trevos, time_coracao FROM draws WHERE lottery_type = ?"
+    params = [lottery_type]
+    if from_contest is not None:
+        query += " AND concurso >= ?"
+        params.append(from_contest)
+    if to_contest is not None:
+        query += " AND concurso <= ?"
+        params.append(to_contest)
+
+    if last_n is not None:
+        query = f"SELECT * FROM ({query} ORDER BY concurso DESC LIMIT ?) ORDER BY concurso"
+        params.append(last_n)
+    else:
+        query += " ORDER BY concurso"
+
+    conn = sqlite3.connect(get_db_path())
+    conn.row_factory = sqlite3.Row
+    cursor = conn.cursor()
+    cursor.execute(query, params)
+    rows = cursor.fetchall()
+    conn.close()
+
+    return [_row_to_result(row) for row in rows]
+
+def get_last_n_results(lottery_type, n=10):
+    """
+    Retorna os últimos N resultados a partir do arquivo local, sincronizando antes
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        n (int): Quantidade de resultados
+
+    Returns:
+        list: Resultados em ordem crescente de concurso
+    """
+    # Busca apenas o que falta na janela pedida (incluindo concursos mais antigos que o menor armazenado)
+    sync_window(lottery_type, n)
+    return load_draws(lottery_type, last_n=n)
+
+# Inicializar a tabela ao carregar o módulo
+init_draws_table()
@@ -0,0 +1,310 @@
+"""
+Módulo de matriz de incidência dos sorteios
+Representa o histórico de cada loteria como uma matriz concursos × números (uint8)
+e calcula as estatísticas como reduções vetorizadas sobre ela
+"""
+
+import json
+import sqlite3
+import threading
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_archive import add_draws_listener, get_db_path, get_max_contest
+
+class DrawMatrix:
+    """
+    Histórico de sorteios em forma de matriz de incidência
+
+    Attributes:
+        contests (np.ndarray): Números dos concursos, em ordem crescente (int64)
+        incidence (np.ndarray): Matriz (concursos × números) com 1 onde o número foi sorteado (uint8)
+        numbers (np.ndarray): Números correspondentes a cada coluna
+        trevos (np.ndarray): Matriz de incidência dos trevos (+Milionária) ou None
+        times (np.ndarray): Time do Coração de cada concurso (Timemania) ou None
+    """
+
+    def __init__(self, contests, incidence, number_range, trevos=None, trevos_range=None, times=None):
+        self.contests = np.asarray(contests, dtype=np.int64)
+        self.incidence = np.asarray(incidence, dtype=np.uint8)
+        self.min_num, self.max_num = number_range
+        self.numbers = np.arange(self.min_num, self.max_num + 1)
+        self.trevos = trevos
+        self.trevos_range = trevos_range
+        self.times = times
+        self._prefix_counts = None
+        self._prefix_last_seen = None
+
+    @classmethod
+    def from_numbers(cls, drawn_numbers, number_range=None, contests=None):
+        """
+        Constrói a matriz a partir de listas de números sorteados
+
+        Args:
+            drawn_numbers (list): Lista de listas com números sorteados (mais antigo primeiro)
+            number_range (tuple): Faixa de números (padrão: 1 até o maior número observado)
+            contests (list): Números dos concursos (padrão: 1..N)
+
+        Returns:
+            DrawMatrix: Matriz construída
+        """
+        if number_range is None:
+            max_seen = max((max(game) for game in drawn_numbers if game), default=1)
+            number_range = (1, max_seen)
+        min_num, max_num = number_range
+
+        incidence = np.zeros((len(drawn_numbers), max_num - min_num + 1), dtype=np.uint8)
+        rows = [i for i, game in enumerate(drawn_numbers) for _ in game]
+        cols = [num - min_num for game in drawn_numbers for num in game]
+        incidence[rows, cols] = 1
+
+        if contests is None:
+            contests = np.arange(1, len(drawn_numbers) + 1)
+        return cls(contests, incidence, number_range)
+
+    @classmethod
+    def from_results(cls, results, lottery_type=None):
+        """
+        Constrói a matriz a partir de resultados no formato da API
+
+        Args:
+            results (list): Resultados com 'concurso' e 'dezenas' (mais antigo primeiro)
+            lottery_type (str): Tipo de loteria, usado para definir a faixa de números
+
+        Returns:
+            DrawMatrix: Matriz construída
+        """
+        results = [r for r in results if r.get('dezenas')]
+        game_info = SUPPORTED_GAMES.get(lottery_type, {})
+        drawn_numbers = [[int(n) for n in r['dezenas']] for r in results]
+        contests = [int(r['concurso']) for r in results]
+        matrix = cls.from_numbers(drawn_numbers, game_info.get('range'), contests)
+
+        if 'trevos_range' in game_info:
+            matrix.trevos_range = game_info['trevos_range']
+            matrix.trevos = _trevo_incidence([r.get('trevos') or [] for r in results], game_info['trevos_range'])
+        if game_info.get('time_coracao'):
+            matrix.times = np.array([r.get('timeCoracao') or "" for r in results], dtype=object)
+        return matrix
+
+    def __len__(self):
+        return len(self.contests)
+
+    @property
+    def last_contest(self):
+        """Último concurso da matriz (0 se estiver vazia)."""
+        return int(self.contests[-1]) if len(self.contests) else 0
+
+    def last(self, n):
+        """Retorna uma visão com os últimos N concursos."""
+        return self.slice(max(0, len(self) - n), len(self))
+
+    def slice(self, start, stop):
+        """Retorna uma visão com as linhas [start, stop) da matriz."""
+        return DrawMatrix(
+            self.contests[start:stop],
+            self.incidence[start:stop],
+            (self.min_num, self.max_num),
+            trevos=self.trevos[start:stop] if self.trevos is not None else None,
+            trevos_range=self.trevos_range,
+            times=self.times[start:stop] if self.times is not None else None
+        )
+
+    def draws(self):
+        """Retorna os números sorteados como lista de listas (mais antigo primeiro)."""
+        rows, cols = np.nonzero(self.incidence)
+        splits = np.searchsorted(rows, np.arange(1, len(self)))
+        return [(chunk + self.min_num).tolist() for chunk in np.split(cols, splits)] if len(self) else []
+
+    def frequency(self):
+        """Quantidade de sorteios de cada número (vetor alinhado a self.numbers)."""
+        return self.incidence.sum(axis=0, dtype=np.int64)
+
+    def delay(self):
+        """
+        Atraso de cada número: concursos desde a última ocorrência
+        (números que nunca saíram recebem a quantidade de concursos da matriz)
+        """
+        if not len(self):
+            return np.zeros(len(self.numbers), dtype=np.int64)
+        drawn = self.incidence.any(axis=0)
+        # Índice da última linha em que cada número aparece
+        last_idx = len(self) - 1 - np.argmax(self.incidence[::-1], axis=0)
+        delay = self.last_contest - self.contests[last_idx]
+        return np.where(drawn, delay, len(self))
+
+    def even_counts(self):
+        """Quantidade de números pares em cada sorteio."""
+        return self.incidence[:, self.numbers % 2 == 0].sum(axis=1, dtype=np.int64)
+
+    def odd_counts(self):
+        """Quantidade de números ímpares em cada sorteio."""
+        return self.incidence[:, self.numbers % 2 != 0].sum(axis=1, dtype=np.int64)
+
+    def sums(self):
+        """Soma dos números de cada sorteio."""
+        return self.incidence @ self.numbers
+
+    def sequences(self):
+        """Quantidade de pares consecutivos (n, n+1) em cada sorteio."""
+        return (self.incidence[:, :-1] & self.incidence[:, 1:]).sum(axis=1, dtype=np.int64)
+
+    def repetitions(self):
+        """Números repetidos entre cada sorteio e o seguinte."""
+        return (self.incidence[:-1] & self.incidence[1:]).sum(axis=1, dtype=np.int64)
+
+    def decade_labels(self):
+        """Rótulos das dezenas do volante ("1-10", "11-20", ...)."""
+        return [f"{start}-{min(start + 9, self.max_num)}" for start in range(self.min_num, self.max_num + 1, 10)]
+
+    def decade_counts(self):
+        """Matriz (concursos × dezenas) com a quantidade de números em cada dezena."""
+        return _group_columns(self.incidence, (self.numbers - self.min_num) // 10)
+
+    def zone_bounds(self, num_zones=4):
+        """Limites [início, fim] de cada zona do volante (a última zona absorve o resto)."""
+        zone_size = len(self.numbers) // num_zones
+        bounds = []
+        for i in range(num_zones):
+            start = self.min_num + i * zone_size
+            end = self.max_num if i == num_zones - 1 else start + zone_size - 1
+            bounds.append([start, end])
+        return bounds
+
+    def zone_counts(self, num_zones=4):
+        """Matriz (concursos × zonas) com a quantidade de números em cada zona."""
+        zone_size = len(self.numbers) // num_zones
+        zone_of = np.minimum((self.numbers - self.min_num) // zone_size, num_zones - 1)
+        return _group_columns(self.incidence, zone_of)
+
+    @property
+    def prefix_counts(self):
+        """
+        Contagens acumuladas (concursos + 1 × números): a linha i tem as frequências das i primeiras linhas
+        """
+        if self._prefix_counts is None:
+            prefix = np.zeros((len(self) + 1, len(self.numbers)), dtype=np.int32)
+            np.cumsum(self.incidence, axis=0, dtype=np.int32, out=prefix[1:])
+            self._prefix_counts = prefix
+        return self._prefix_counts
+
+    @property
+    def prefix_last_seen(self):
+        """Para cada linha i e número, o índice da última linha <= i em que o número saiu (-1 se nenhuma)."""
+        if self._prefix_last_seen is None:
+            rows = np.arange(len(self), dtype=np.int32)[:, None]
+            seen = np.where(self.incidence.astype(bool), rows, np.int32(-1))
+            self._prefix_last_seen = np.maximum.accumulate(seen, axis=0) if len(self) else seen
+        return self._prefix_last_seen
+
+    def window_bounds(self, from_contest=None, to_contest=None, last_n=None):
+        """
+        Converte uma janela de concursos em índices de linha [start, stop)
+
+        Args:
+            from_contest (int): Concurso inicial (inclusive)
+            to_contest (int): Concurso final (inclusive)
+            last_n (int): Limita aos últimos N concursos da janela
+
+        Returns:
+            tuple: (start, stop)
+        """
+        start = int(np.searchsorted(self.contests, from_contest, side='left')) if from_contest is not None else 0
+        stop = int(np.searchsorted(self.contests, to_contest, side='right')) if to_contest is not None else len(self)
+        if last_n is not None:
+            start = max(start, stop - int(last_n))
+        return start, max(start, stop)
+
+    def window_frequency(self, start, stop):
+        """Frequência de cada número nas linhas [start, stop), em O(números) via somas de prefixo."""
+        return (self.prefix_counts[stop] - self.prefix_counts[start]).astype(np.int64)
+
+    def window_delay(self, start, stop):
+        """Atraso de cada número ao final da janela [start, stop) (tamanho da janela se não saiu nela)."""
+        if stop <= start:
+            return np.zeros(len(self.numbers), dtype=np.int64)
+        last_idx = self.prefix_last_seen[stop - 1]
+        delay = self.contests[stop - 1] - self.contests[np.maximum(last_idx, 0)]
+        return np.where(last_idx >= start, delay, stop - start)
+
+    def frequency_map(self):
+        """Frequência dos números sorteados ao menos uma vez, com chaves em texto."""
+        frequency = self.frequency()
+        return {str(num): int(count) for num, count in zip(self.numbers, frequency) if count}
+
+def _group_columns(incidence, groups):
+    """Soma as colunas da matriz por grupo (groups[i] é o grupo da coluna i)."""
+    num_groups = int(groups.max()) + 1 if len(groups) else 0
+    membership = np.zeros((len(groups), num_groups), dtype=np.int64)
+    membership[np.arange(len(groups)), groups] = 1
+    return incidence @ membership
+
+def _trevo_incidence(trevos_per_draw, trevos_range):
+    """Matriz de incidência dos trevos (concursos × trevos)."""
+    min_trevo, max_trevo = trevos_range
+    incidence = np.zeros((len(trevos_per_draw), max_trevo - min_trevo + 1), dtype=np.uint8)
+    for i, trevos in enumerate(trevos_per_draw):
+        for trevo in trevos:
+            incidence[i, int(trevo) - min_trevo] = 1
+    return incidence
+
+def load_draw_matrix(lottery_type):
+    """
+    Constrói a matriz de incidência de uma loteria a partir do arquivo local de sorteios
+
+    Args:
+        lottery_type (str): Tipo de loteria
+
+    Returns:
+        DrawMatrix: Matriz com todo o histórico armazenado
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        raise ValueError(f"Loteria {lottery_type} não suportada")
+
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT concurso, dezenas, trevos, time_coracao FROM draws WHERE lottery_type = ? ORDER BY concurso",
+        (lottery_type,)
+    )
+    rows = cursor.fetchall()
+    conn.close()
+
+    contests = [row[0] for row in rows]
+    matrix = DrawMatrix.from_numbers([json.loads(row[1]) for row in rows], game_info['range'], contests)
+
+    if 'trevos_range' in game_info:
+        matrix.trevos_range = game_info['trevos_range']
+        matrix.trevos = _trevo_incidence([json.loads(row[2]) if row[2] else [] for row in rows], game_info['trevos_range'])
+    if game_info.get('time_coracao'):
+        matrix.times = np.array([row[3] or "" for row in rows], dtype=object)
+    return matrix
+
+# Matrizes já construídas, reconstruídas quando o arquivo da loteria é alterado
+_matrix_cache = {}
+_matrix_lock = threading.Lock()
+
+def get_draw_matrix(lottery_type):
+    """
+    Retorna a matriz de incidência da loteria, reconstruindo-a se o arquivo recebeu concursos novos
+
+    Args:
+        lottery_type (str): Tipo de loteria
+
+    Returns:
+        DrawMatrix: Matriz com todo o histórico armazenado
+    """
+    stored_max = get_max_contest(lottery_type)
+    with _matrix_lock:
+        matrix = _matrix_cache.get(lottery_type)
+        if matrix is None or matrix.last_contest != stored_max:
+            matrix = load_draw_matrix(lottery_type)
+            _matrix_cache[lottery_type] = matrix
+        return matrix
+
+def _on_draws_stored(lottery_type, results):
+    """Listener do arquivo de sorteios: descarta a matriz da loteria (concursos antigos ou corrigidos também contam)."""
+    with _matrix_lock:
+        _matrix_cache.pop(lottery_type, None)
+
+add_draws_listener(_on_draws_stored)
@@ -0,0 +1,257 @@
+"""
+Módulo de simulação Monte Carlo de prêmios e retorno esperado
+Gera milhões de sorteios sintéticos em lotes NumPy (fluxos Generator com semente), confere
+um conjunto de jogos contra eles com popcount sobre máscaras de bits e distribui o trabalho
+entre processos, reportando as faixas de prêmio com intervalos de confiança
+"""
+
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+import numpy as np
+from src.services import bitmask
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.prize_odds import PRIZE_RULES, tier_lookup, validate_ticket
+
+# Quantidade de times da Timemania
+TIMEMANIA_TEAMS = 80
+
+# Limite de pares (sorteio, jogo) conferidos de uma vez, para limitar a memória de cada lote
+MAX_PAIRS_PER_CHUNK = 1 << 22
+
+def sample_draw_masks(rng, count, population, drawn, offset, words):
+    """
+    Sorteia 'count' subconjuntos uniformes de 'drawn' números entre 'population', já como máscaras
+
+    Usa o algoritmo de Floyd vetorizado: são apenas 'drawn' passos, sem ordenação e sem rejeição.
+
+    Args:
+        rng (np.random.Generator): Gerador aleatório
+        count (int): Quantidade de sorteios
+        population (int): Quantidade de números do volante
+        drawn (int): Números sorteados
+        offset (int): Bit do primeiro número (o número n ocupa o bit n, como em bitmask.encode)
+        words (int): Palavras uint64 por máscara
+
+    Returns:
+        np.ndarray: Máscaras (count × words) uint64
+    """
+    masks = np.zeros((words, count), dtype=np.uint64)
+    one = np.uint64(1)
+    for j in range(population - drawn, population):
+        candidate = rng.integers(0, j + 1, count, dtype=np.int64) + offset
+        fallback = j + offset
+
+        # Se o número sorteado já está no conjunto, entra o número j (Floyd)
+        if words == 1:
+            already = (masks[0] >> candidate.astype(np.uint64)) & one
+            chosen = np.where(already.astype(bool), fallback, candidate).astype(np.uint64)
+            masks[0] |= one << chosen
+        else:
+            word = candidate >> 6
+            already = (masks[word, np.arange(count)] >> (candidate & 63).astype(np.uint64)) & one
+            chosen = np.where(already.astype(bool), fallback, candidate)
+            masks[chosen >> 6, np.arange(count)] |= one << (chosen & 63).astype(np.uint64)
+    return np.ascontiguousarray(masks.T)
+
+def _simulate_shard(args):
+    """
+    Simula um fragmento de sorteios (função de nível de módulo para o pool de processos)
+
+    Args:
+        args (tuple): (lottery_type, ticket_masks, trevo_masks, team_ids, num_draws, seed, batch_size, prize_values)
+
+    Returns:
+        dict: Somas por faixa (vitórias, quadrados, sorteios com vitória) e do retorno
+    """
+    lottery_type, ticket_masks, trevo_masks, team_ids, num_draws, seed, batch_size, prize_values = args
+    rng = np.random.default_rng(seed)
+    game_info = SUPPORTED_GAMES[lottery_type]
+    rules = PRIZE_RULES[lottery_type]
+
+    min_num, max_num = game_info["range"]
+    population = max_num - min_num + 1
+    words = ticket_masks.shape[1]
+    lookup = tier_lookup(rules)
+    num_tiers = len(rules["tiers"]) + (1 if team_ids is not None else 0)
+
+    wins = np.zeros(num_tiers, dtype=np.float64)
+    wins_sq = np.zeros(num_tiers, dtype=np.float64)
+    draws_with_win = np.zeros(num_tiers, dtype=np.int64)
+    return_sum = 0.0
+    return_sq = 0.0
+    num_tickets = len(ticket_masks)
+    chunk = max(1, min(batch_size, MAX_PAIRS_PER_CHUNK // max(num_tickets, 1)))
+
+    remaining = num_draws
+    while remaining > 0:
+        count = min(chunk, remaining)
+        remaining -= count
+
+        draws = sample_draw_masks(rng, count, population, rules["drawn"], min_num, words)
+        hits = bitmask.hits(draws[:, None, :], ticket_masks[None, :, :])
+
+        if trevo_masks is not None:
+            min_trevo, max_trevo = game_info["trevos_range"]
+            trevo_draws = sample_draw_masks(rng, count, max_trevo - min_trevo + 1, rules["trevos_drawn"], min_trevo, 1)
+            trevo_hits = bitmask.hits(trevo_draws[:, None, :], trevo_masks[None, :, :])
+            tiers = lookup[hits, trevo_hits]
+        else:
+            tiers = lookup[hits, 0]
+
+        per_draw = [(tiers == index).sum(axis=1) for index in range(len(rules["tiers"]))]
+        if team_ids is not None:
+            # Time do Coração: um time sorteado entre todos; jogos sem time não concorrem
+            team_draws = rng.integers(0, TIMEMANIA_TEAMS, count)
+            per_draw.append((team_draws[:, None] == team_ids[None, :]).sum(axis=1))
+
+        per_draw = np.stack(per_draw).astype(np.float64)
+        wins += per_draw.sum(axis=1)
+        wins_sq += (per_draw ** 2).sum(axis=1)
+        draws_with_win += (per_draw > 0).sum(axis=1)
+
+        if prize_values is not None:
+            returns = prize_values @ per_draw
+            return_sum += float(returns.sum())
+            return_sq += float((returns ** 2).sum())
+
+    return {
+        "wins": wins,
+        "wins_sq": wins_sq,
+        "draws_with_win": draws_with_win,
+        "return_sum": return_sum,
+        "return_sq": return_sq
+    }
+
+def _mean_interval(total, total_sq, n, z):
+    """Média e intervalo de confiança (aproximação normal) a partir de soma e soma dos quadrados."""
+    mean = total / n
+    variance = max(total_sq / n - mean ** 2, 0.0) * n / max(n - 1, 1)
+    margin = z * (variance / n) ** 0.5
+    return mean, mean - margin, mean + margin
+
+def _wilson_interval(successes, n, z):
+    """Intervalo de Wilson para uma proporção."""
+    p = successes / n
+    denominator = 1 + z ** 2 / n
+    center = (p + z ** 2 / (2 * n)) / denominator
+    margin = z * ((p * (1 - p) + z ** 2 / (4 * n)) / n) ** 0.5 / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+def simulate(lottery_type, tickets, num_draws=1_000_000, seed=None, processes=None,
+             batch_size=1 << 18, prize_values=None, ticket_cost=None, confidence=0.95):
+    """
+    Simula sorteios e confere um conjunto de jogos contra cada um deles
+
+    Na +Milionária os trevos são obrigatórios (validate_ticket); o Time do Coração segue a mesma
+    regra de check_hits e só é conferido nos jogos que o informam.
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        tickets (list): Jogos (dicionários com 'numbers', 'trevos' na +Milionária e, opcionalmente, 'time_coracao')
+        num_draws (int): Quantidade de sorteios simulados
+        seed (int): Semente (cada processo recebe um fluxo derivado)
+        processes (int): Processos do pool (padrão: todas as CPUs)
+        batch_size (int): Sorteios gerados por lote
+        prize_values (list): Valor do prêmio de cada faixa (na ordem de PRIZE_RULES), para o retorno
+        ticket_cost (float): Custo de cada jogo, para o retorno líquido
+        confidence (float): Nível de confiança dos intervalos
+
+    Returns:
+        dict: Vitórias por sorteio e probabilidade de ao menos uma vitória em cada faixa,
+            com intervalos de confiança, e o retorno esperado quando os prêmios são informados
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        return {"error": f"Loteria {lottery_type} não suportada"}
+    if not tickets:
+        return {"error": "Nenhum jogo informado"}
+
+    rules = PRIZE_RULES[lottery_type]
+    numbers, trevos = [], []
+    for index, ticket in enumerate(tickets):
+        try:
+            ticket_numbers, ticket_trevos = validate_ticket(lottery_type, ticket)
+        except ValueError as e:
+            return {"error": f"Jogo {index + 1}: {e}"}
+        numbers.append(ticket_numbers)
+        trevos.append(ticket_trevos)
+
+    ticket_masks = bitmask.encode_many(numbers, game_info["range"][1])
+
+    trevo_masks = None
+    if "trevos" in game_info:
+        trevo_masks = bitmask.encode_many(trevos, game_info["trevos_range"][1])
+
+    # Times distintos recebem índices distintos (todos os times têm a mesma chance)
+    team_ids = None
+    tier_names = [tier["name"] for tier in rules["tiers"]]
+    if game_info.get("time_coracao"):
+        teams = {}
+        for ticket in tickets:
+            if ticket.get("time_coracao"):
+                teams.setdefault(ticket["time_coracao"], len(teams))
+        team_ids = np.array([teams.get(ticket.get("time_coracao"), -1) for ticket in tickets], dtype=np.int64)
+        tier_names.append("Time do Coração")
+
+    if prize_values is not None:
+        prize_values = np.asarray(prize_values, dtype=np.float64)
+        if len(prize_values) != len(tier_names):
+            return {"error": f"Informe {len(tier_names)} valores de prêmio (um por faixa)"}
+
+    processes = max(1, min(processes or os.cpu_count() or 1, num_draws))
+    shard_sizes = [num_draws // processes + (1 if i < num_draws % processes else 0) for i in range(processes)]
+    seeds = np.random.SeedSequence(seed).spawn(processes)
+    tasks = [
+        (lottery_type, ticket_masks, trevo_masks, team_ids, size, s, batch_size, prize_values)
+        for size, s in zip(shard_sizes, seeds)
+    ]
+
+    started = time.perf_counter()
+    if processes > 1:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            shards = list(pool.map(_simulate_shard, tasks))
+    else:
+        shards = [_simulate_shard(task) for task in tasks]
+    elapsed = time.perf_counter() - started
+
+    wins = sum(shard["wins"] for shard in shards)
+    wins_sq = sum(shard["wins_sq"] for shard in shards)
+    draws_with_win = sum(shard["draws_with_win"] for shard in shards)
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+
+    tiers = []
+    for index, name in enumerate(tier_names):
+        mean, low, high = _mean_interval(float(wins[index]), float(wins_sq[index]), num_draws, z)
+        p_low, p_high = _wilson_interval(int(draws_with_win[index]), num_draws, z)
+        tiers.append({
+            "name": name,
+            "wins": int(wins[index]),
+            "wins_per_draw": {"mean": mean, "low": low, "high": high},
+            "draws_with_win": int(draws_with_win[index]),
+            "probability": {"mean": float(draws_with_win[index] / num_draws), "low": p_low, "high": p_high}
+        })
+
+    result = {
+        "lottery_type": lottery_type,
+        "num_tickets": len(tickets),
+        "num_draws": num_draws,
+        "seed": seed,
+        "processes": processes,
+        "confidence": confidence,
+        "draws_per_second": round(num_draws / elapsed) if elapsed else None,
+        "tiers": tiers
+    }
+
+    if prize_values is not None:
+        return_sum = sum(shard["return_sum"] for shard in shards)
+        return_sq = sum(shard["return_sq"] for shard in shards)
+        mean, low, high = _mean_interval(return_sum, return_sq, num_draws, z)
+        result["return_per_draw"] = {"mean": mean, "low": low, "high": high}
+        if ticket_cost:
+            cost = ticket_cost * len(tickets)
+            result["cost_per_draw"] = cost
+            result["expected_net"] = {"mean": mean - cost, "low": low - cost, "high": high - cost}
+
+    return result
@@ -0,0 +1,255 @@
+"""
+Módulo de geração de jogos em lote
+Gera N jogos de uma estratégia em uma única passada vetorizada, com os conjuntos de números
+de cada loteria calculados uma única vez e semente opcional para resultados reproduzíveis
+"""
+
+import threading
+from functools import lru_cache
+import numpy as np
+from src.services.advanced_analyzer import analyze_last_5_games
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.candidate_scoring import sample_group_games
+from src.services.combinadic import rank_many
+from src.services.constraint_sampler import get_constraint_sampler
+from src.services.draw_matrix import get_draw_matrix
+from src.services.gap_analysis import overdue_ranking
+from src.services.probability_optimizer import get_optimizer
+
+STRATEGIES = ("random", "hot_numbers", "cold_numbers", "last_5_avg", "custom_even_odd", "optimized", "constrained")
+
+# Jogos gerados por lote no fluxo contínuo (iter_games)
+STREAM_CHUNK_SIZE = 500
+
+# Lotes seguidos sem nenhum jogo novo antes de encerrar a deduplicação (conjunto viável esgotado)
+MAX_EMPTY_CHUNKS = 3
+
+# Passos da busca de um único jogo otimizado quando há semente: com a busca limitada por
+# passos (e não por tempo) a mesma semente gera sempre o mesmo jogo
+SEEDED_SEARCH_STEPS = 500
+
+@lru_cache(maxsize=None)
+def _number_pools(lottery_type):
+    """Máscaras fixas da loteria (todos os números, pares e ímpares), calculadas uma única vez."""
+    min_num, max_num = SUPPORTED_GAMES[lottery_type]['range']
+    numbers = np.arange(min_num, max_num + 1)
+    pools = {
+        "numbers": numbers,
+        "all": np.ones(len(numbers), dtype=bool),
+        "even": numbers % 2 == 0,
+        "odd": numbers % 2 != 0
+    }
+    for pool in pools.values():
+        pool.setflags(write=False)
+    return pools
+
+_history_pools = {}
+_history_pools_lock = threading.Lock()
+
+def _history_pools_for(lottery_type):
+    """
+    Grupos quente e frio (k × 1,5 números) da loteria, calculados uma vez por matriz de sorteios
+
+    A matriz é reconstruída sempre que o arquivo muda, então o cache é conferido pelo objeto
+    (como em combinadic e no índice de combinações); lotes seguidos e fluxos contínuos não
+    recalculam os intervalos de todo o histórico.
+
+    Returns:
+        dict: Máscaras 'hot' e 'cold' (None quando ainda não há histórico)
+    """
+    matrix = get_draw_matrix(lottery_type)
+    with _history_pools_lock:
+        cached = _history_pools.get(lottery_type)
+        if cached is not None and cached[0] is matrix:
+            return cached[1]
+
+    game_info = SUPPORTED_GAMES[lottery_type]
+    min_num = game_info['range'][0]
+    count = int(game_info['numbers'] * 1.5)
+    numbers = _number_pools(lottery_type)["numbers"]
+
+    history = {"hot": None, "cold": None}
+    frequency = matrix.frequency()
+    if np.any(frequency):
+        # Os mais frequentes em todo o histórico
+        order = np.argsort(-np.asarray(frequency), kind="stable")
+        history["hot"] = _mask(numbers[order[:count]], min_num, len(numbers))
+    overdue = overdue_ranking(lottery_type)
+    if overdue:
+        # Os mais "vencidos" em relação aos próprios intervalos históricos
+        history["cold"] = _mask([item['number'] for item in overdue[:count]], min_num, len(numbers))
+    for pool in history.values():
+        if pool is not None:
+            pool.setflags(write=False)
+
+    with _history_pools_lock:
+        _history_pools[lottery_type] = (matrix, history)
+    return history
+
+def _mask(numbers, min_num, size):
+    """Máscara booleana de um conjunto de números."""
+    mask = np.zeros(size, dtype=bool)
+    indices = [int(num) - min_num for num in numbers if 0 <= int(num) - min_num < size]
+    mask[indices] = True
+    return mask
+
+def _strategy_groups(lottery_type, strategy, params):
+    """
+    Grupos de números e quantidades sorteadas de cada grupo para uma estratégia
+
+    Returns:
+        tuple: (máscaras dos grupos, quantidades)
+    """
+    game_info = SUPPORTED_GAMES[lottery_type]
+    min_num = game_info['range'][0]
+    k = game_info['numbers']
+    pools = _number_pools(lottery_type)
+    size = len(pools["numbers"])
+
+    if strategy == 'random':
+        return [pools["all"]], [k]
+
+    if strategy in ('hot_numbers', 'cold_numbers'):
+        # Os k × 1,5 números mais frequentes (hot) ou mais "vencidos" (cold) do histórico
+        pool = _history_pools_for(lottery_type)["hot" if strategy == 'hot_numbers' else "cold"]
+        return [pools["all"] if pool is None else pool], [k]
+
+    if strategy == 'last_5_avg':
+        stats = analyze_last_5_games(lottery_type)
+        if "error" in stats:
+            return [pools["all"]], [k]
+        pool = stats["suggested_numbers_pool"]
+        hot_count = max(1, int(k * 0.5))
+        warm_count = max(1, int(k * 0.3))
+        groups = [_mask(pool[name], min_num, size) for name in ("hot_numbers", "warm_numbers", "cold_numbers")]
+        return groups, [hot_count, warm_count, k - hot_count - warm_count]
+
+    if strategy == 'custom_even_odd':
+        try:
+            even_count = int(params.get('even_count', k // 2))
+            odd_count = int(params.get('odd_count', k - even_count))
+        except (TypeError, ValueError):
+            raise ValueError('As quantidades de números pares e ímpares devem ser inteiras')
+        if even_count + odd_count != k:
+            raise ValueError(f'A soma de números pares e ímpares deve ser igual a {k}')
+        # Cada grupo precisa de números suficientes no volante (a Lotofácil tem só 12 pares)
+        for name, count, pool in (('pares', even_count, pools["even"]), ('ímpares', odd_count, pools["odd"])):
+            available = int(pool.sum())
+            if not 0 <= count <= available:
+                raise ValueError(f'A quantidade de números {name} deve estar entre 0 e {available}')
+        return [pools["even"], pools["odd"]], [even_count, odd_count]
+
+    raise ValueError(f'Estratégia não suportada: {strategy}')
+
+def generate_batch(lottery_type, strategy, n, seed=None, params=None):
+    """
+    Gera N jogos de uma estratégia de uma só vez
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        strategy (str): Estratégia (random, hot_numbers, cold_numbers, last_5_avg, custom_even_odd, optimized, constrained)
+        n (int): Quantidade de jogos
+        seed (int): Semente do gerador aleatório (mesma semente, mesmos jogos)
+        params (dict): Parâmetros da estratégia (ex.: even_count e odd_count; na estratégia constrained,
+            as restrições aceitas por get_constraint_sampler)
+
+    Returns:
+        list: Jogos (dicionários com numbers, strategy e, conforme a loteria, trevos e time_coracao)
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        raise ValueError(f'Loteria não suportada: {lottery_type}')
+
+    params = params or {}
+    rng = np.random.default_rng(seed)
+    min_num = game_info['range'][0]
+
+    if strategy == 'optimized':
+        optimizer = get_optimizer(lottery_type)
+        if n == 1:
+            # Um único jogo recebe a busca completa (simulated annealing)
+            game = optimizer.generate_optimized_game(
+                seed=int(rng.integers(2**32)),
+                max_steps=SEEDED_SEARCH_STEPS if seed is not None else None
+            )
+            if "error" in game:
+                raise ValueError(game["error"])
+            numbers = [sorted(game["numbers"])]
+        else:
+            numbers = optimizer.generate_optimized_batch(n, rng)
+        if len(numbers) < n:
+            extra = sample_group_games([_number_pools(lottery_type)["all"]], [game_info['numbers']], n - len(numbers), rng)
+            numbers += np.sort(extra + min_num, axis=1).tolist()
+    elif strategy == 'constrained':
+        # Amostragem uniforme entre todos os jogos que atendem às restrições
+        numbers = (get_constraint_sampler(lottery_type, params).sample(n, rng) + min_num).tolist()
+    else:
+        groups, counts = _strategy_groups(lottery_type, strategy, params)
+        numbers = np.sort(sample_group_games(groups, counts, n, rng) + min_num, axis=1).tolist()
+
+    games = [{'numbers': game, 'strategy': strategy} for game in numbers]
+
+    # Trevos da +Milionária
+    if 'trevos' in game_info:
+        min_trevo, max_trevo = game_info['trevos_range']
+        trevo_pool = np.ones(max_trevo - min_trevo + 1, dtype=bool)
+        trevos = np.sort(sample_group_games([trevo_pool], [game_info['trevos']], n, rng) + min_trevo, axis=1)
+        for game, game_trevos in zip(games, trevos.tolist()):
+            game['trevos'] = game_trevos
+
+    # Time do Coração da Timemania, entre os times já sorteados
+    if game_info.get('time_coracao'):
+        times = get_draw_matrix(lottery_type).times
+        teams = sorted(set(times[times != ""])) if times is not None else []
+        if teams:
+            for game, index in zip(games, rng.integers(0, len(teams), n)):
+                game['time_coracao'] = teams[index]
+
+    return games
+
+def iter_games(lottery_type, strategy, n, seed=None, params=None, chunk_size=STREAM_CHUNK_SIZE, dedup=False):
+    """
+    Gera N jogos em lotes, sem montar a lista completa
+
+    Cada lote recebe uma semente derivada da semente principal, então a mesma semente (com o
+    mesmo tamanho de lote) reproduz o mesmo fluxo. Com deduplicação, os postos combinatórios dos jogos já
+    entregues ficam em um conjunto e os repetidos são descartados.
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        strategy (str): Estratégia
+        n (int): Quantidade de jogos
+        seed (int): Semente do fluxo
+        params (dict): Parâmetros da estratégia
+        chunk_size (int): Jogos por lote
+        dedup (bool): Descartar jogos com números repetidos
+
+    Yields:
+        list: Lotes de jogos (o último pode ser menor; com deduplicação o fluxo termina antes
+            de N jogos se não houver jogos distintos suficientes)
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        raise ValueError(f'Loteria não suportada: {lottery_type}')
+
+    seeds = np.random.SeedSequence(seed)
+    seen = set()
+    remaining = n
+    empty_chunks = 0
+    while remaining > 0 and empty_chunks < MAX_EMPTY_CHUNKS:
+        games = generate_batch(lottery_type, strategy, min(chunk_size, remaining), seeds.spawn(1)[0], params)
+
+        if dedup:
+            min_num = game_info['range'][0]
+            ranks = rank_many(np.array([game['numbers'] for game in games]) - min_num, game_info['range']).tolist()
+            unique = []
+            for game, rank in zip(games, ranks):
+                if rank not in seen:
+                    seen.add(rank)
+                    unique.append(game)
+            games = unique
+            empty_chunks = 0 if games else empty_chunks + 1
+
+        if games:
+            remaining -= len(games)
+            yield games
@@ -0,0 +1,127 @@
+"""
+Módulo de análise de intervalos (gaps) entre ocorrências de cada número
+Calcula, em uma única passada vetorizada sobre o histórico, o atraso atual, o histograma
+de intervalos, média/máximo e o percentil do atraso atual em relação ao próprio histórico
+"""
+
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_matrix import get_draw_matrix
+
+def compute_gaps(incidence):
+    """
+    Calcula os intervalos entre ocorrências consecutivas de cada número
+
+    O intervalo é medido em sorteios: 1 significa que o número saiu em dois sorteios seguidos.
+
+    Args:
+        incidence (np.ndarray): Matriz de incidência (concursos × números), mais antigo primeiro
+
+    Returns:
+        dict: Arrays alinhados às colunas: current_delay, gap_histogram (números × maior intervalo + 1),
+            gap_count, mean_gap, max_gap e delay_percentile
+    """
+    num_draws, size = incidence.shape
+
+    # Ocorrências ordenadas por número e, dentro de cada número, por sorteio
+    cols, rows = np.nonzero(incidence.T)
+    same_number = cols[1:] == cols[:-1]
+    gaps = (rows[1:] - rows[:-1])[same_number]
+    gap_cols = cols[1:][same_number]
+
+    # Atraso atual: sorteios desde a última ocorrência (tamanho do histórico se nunca saiu)
+    drawn = incidence.any(axis=0)
+    last_row = num_draws - 1 - np.argmax(incidence[::-1], axis=0) if num_draws else np.zeros(size, dtype=np.int64)
+    current_delay = np.where(drawn, num_draws - 1 - last_row, num_draws)
+
+    max_bin = int(max(gaps.max() if len(gaps) else 0, current_delay.max() if size else 0))
+    histogram = np.bincount(gap_cols * (max_bin + 1) + gaps, minlength=size * (max_bin + 1)).reshape(size, max_bin + 1)
+
+    gap_count = histogram.sum(axis=1)
+    gap_total = np.bincount(gap_cols, weights=gaps, minlength=size)
+    mean_gap = np.divide(gap_total, gap_count, out=np.zeros(size), where=gap_count > 0)
+    max_gap = np.zeros(size, dtype=np.int64)
+    np.maximum.at(max_gap, gap_cols, gaps)
+
+    # Percentil: fração dos intervalos históricos já superados pelo atraso atual
+    cumulative = histogram.cumsum(axis=1)
+    exceeded = cumulative[np.arange(size), current_delay]
+    delay_percentile = np.divide(exceeded, gap_count, out=np.zeros(size), where=gap_count > 0) * 100
+
+    return {
+        "current_delay": current_delay,
+        "gap_histogram": histogram,
+        "gap_count": gap_count,
+        "mean_gap": mean_gap,
+        "max_gap": max_gap,
+        "delay_percentile": delay_percentile
+    }
+
+def get_gap_analysis(lottery_type, window=None, include_histogram=False):
+    """
+    Análise de intervalos de cada número no histórico armazenado
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        window (int): Últimos N concursos (None para todo o histórico)
+        include_histogram (bool): Incluir o histograma completo de intervalos de cada número
+
+    Returns:
+        dict: Métricas de intervalo por número (chaves inteiras)
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        return {"error": f"Loteria {lottery_type} não suportada"}
+
+    matrix = get_draw_matrix(lottery_type)
+    if window:
+        matrix = matrix.last(window)
+    gaps = compute_gaps(matrix.incidence)
+
+    numbers = {}
+    for i, num in enumerate(matrix.numbers.tolist()):
+        numbers[num] = {
+            "current_delay": int(gaps["current_delay"][i]),
+            "mean_gap": round(float(gaps["mean_gap"][i]), 2),
+            "max_gap": int(gaps["max_gap"][i]),
+            "delay_percentile": round(float(gaps["delay_percentile"][i]), 1)
+        }
+        if include_histogram:
+            numbers[num]["gap_histogram"] = gaps["gap_histogram"][i].tolist()
+
+    return {
+        "lottery_type": lottery_type,
+        "last_contest": matrix.last_contest,
+        "num_draws": len(matrix),
+        "numbers": numbers
+    }
+
+def overdue_ranking(lottery_type, window=None):
+    """
+    Ordena os números do mais "vencido" para o menos: percentil do atraso em relação ao
+    próprio histórico e, em caso de empate, atraso atual
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        window (int): Últimos N concursos (None para todo o histórico)
+
+    Returns:
+        list: Dicionários com number, current_delay, mean_gap e delay_percentile
+    """
+    matrix = get_draw_matrix(lottery_type)
+    if window:
+        matrix = matrix.last(window)
+    if not len(matrix):
+        return []
+
+    gaps = compute_gaps(matrix.incidence)
+    order = np.lexsort((-gaps["current_delay"], -gaps["delay_percentile"]))
+
+    return [
+        {
+            "number": int(matrix.numbers[i]),
+            "current_delay": int(gaps["current_delay"][i]),
+            "mean_gap": round(float(gaps["mean_gap"][i]), 2),
+            "delay_percentile": round(float(gaps["delay_percentile"][i]), 1)
+        }
+        for i in order
+    ]
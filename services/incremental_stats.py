@@ -0,0 +1,252 @@
+"""
+Módulo de estatísticas incrementais por loteria
+Mantém contadores de frequência e último concurso de cada número, atualizados a cada
+novo sorteio em O(números por sorteio) e persistidos no SQLite
+"""
+
+import json
+import sqlite3
+import threading
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_archive import add_draws_listener, get_db_path, normalize_result
+from src.services.draw_matrix import load_draw_matrix
+
+def init_stats_tables():
+    """Cria as tabelas de estado das estatísticas incrementais se não existirem."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS number_stats (
+            lottery_type TEXT NOT NULL,
+            number INTEGER NOT NULL,
+            frequency INTEGER NOT NULL DEFAULT 0,
+            last_contest INTEGER,
+            PRIMARY KEY (lottery_type, number)
+        )
+    """)
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS stats_state (
+            lottery_type TEXT PRIMARY KEY,
+            draws_applied INTEGER NOT NULL,
+            last_contest INTEGER NOT NULL
+        )
+    """)
+    conn.commit()
+    conn.close()
+
+class IncrementalStats:
+    """
+    Contadores de frequência e última ocorrência de cada número de uma loteria
+    """
+
+    def __init__(self, lottery_type):
+        """
+        Inicializa contadores zerados
+
+        Args:
+            lottery_type (str): Tipo de loteria
+        """
+        self.lottery_type = lottery_type
+        self.min_num, self.max_num = SUPPORTED_GAMES[lottery_type]['range']
+        size = self.max_num - self.min_num + 1
+        self.frequency = np.zeros(size, dtype=np.int64)
+        # 0 indica que o número ainda não foi sorteado
+        self.last_seen = np.zeros(size, dtype=np.int64)
+        self.draws_applied = 0
+        self.last_contest = 0
+
+    def apply_draw(self, contest, numbers):
+        """
+        Aplica um novo sorteio aos contadores
+
+        Args:
+            contest (int): Número do concurso (deve ser maior que o último aplicado)
+            numbers (list): Números sorteados
+
+        Returns:
+            np.ndarray: Índices dos números alterados
+        """
+        idx = np.asarray(numbers, dtype=np.int64) - self.min_num
+        self.frequency[idx] += 1
+        self.last_seen[idx] = contest
+        self.draws_applied += 1
+        self.last_contest = contest
+        return idx
+
+    def delay(self):
+        """Atraso de cada número (concursos desde a última ocorrência; total de sorteios se nunca saiu)."""
+        return np.where(self.last_seen > 0, self.last_contest - self.last_seen, self.draws_applied)
+
+    def frequency_dict(self):
+        """Frequência por número (chaves inteiras)."""
+        return {self.min_num + i: int(count) for i, count in enumerate(self.frequency)}
+
+    def delay_dict(self):
+        """Atraso por número (chaves inteiras)."""
+        return {self.min_num + i: int(value) for i, value in enumerate(self.delay())}
+
+def _persist(stats, idx=None):
+    """Grava o estado no SQLite (apenas os números em idx, ou todos)."""
+    if idx is None:
+        idx = range(len(stats.frequency))
+
+    rows = [
+        (stats.lottery_type, stats.min_num + int(i), int(stats.frequency[i]), int(stats.last_seen[i]) or None)
+        for i in idx
+    ]
+
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.executemany("""
+        INSERT OR REPLACE INTO number_stats (lottery_type, number, frequency, last_contest)
+        VALUES (?, ?, ?, ?)
+    """, rows)
+    cursor.execute("""
+        INSERT OR REPLACE INTO stats_state (lottery_type, draws_applied, last_contest)
+        VALUES (?, ?, ?)
+    """, (stats.lottery_type, stats.draws_applied, stats.last_contest))
+    conn.commit()
+    conn.close()
+
+def _load(lottery_type):
+    """Carrega o estado persistido (None se ainda não houver)."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute("SELECT draws_applied, last_contest FROM stats_state WHERE lottery_type = ?", (lottery_type,))
+    state = cursor.fetchone()
+    if not state:
+        conn.close()
+        return None
+
+    cursor.execute("SELECT number, frequency, last_contest FROM number_stats WHERE lottery_type = ?", (lottery_type,))
+    rows = cursor.fetchall()
+    conn.close()
+
+    stats = IncrementalStats(lottery_type)
+    stats.draws_applied, stats.last_contest = state
+    for number, frequency, last_contest in rows:
+        if stats.min_num <= number <= stats.max_num:
+            stats.frequency[number - stats.min_num] = frequency
+            stats.last_seen[number - stats.min_num] = last_contest or 0
+    return stats
+
+def _rebuild(lottery_type):
+    """Recalcula o estado completo a partir do arquivo de sorteios e o persiste."""
+    matrix = load_draw_matrix(lottery_type)
+    stats = IncrementalStats(lottery_type)
+    stats.frequency = matrix.frequency()
+    if len(matrix):
+        drawn = matrix.incidence.any(axis=0)
+        last_idx = len(matrix) - 1 - np.argmax(matrix.incidence[::-1], axis=0)
+        stats.last_seen = np.where(drawn, matrix.contests[last_idx], 0)
+    stats.draws_applied = len(matrix)
+    stats.last_contest = matrix.last_contest
+    _persist(stats)
+    return stats
+
+def _archive_state(lottery_type):
+    """Quantidade de concursos e último concurso do arquivo (uma consulta pela chave primária)."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*), MAX(concurso) FROM draws WHERE lottery_type = ?", (lottery_type,))
+    total, last_contest = cursor.fetchone()
+    conn.close()
+    return total, last_contest or 0
+
+def _newer_draws(lottery_type, after_contest):
+    """Concursos do arquivo posteriores a after_contest, em ordem."""
+    conn = sqlite3.connect(get_db_path())
+    cursor = conn.cursor()
+    cursor.execute(
+        "SELECT concurso, dezenas FROM draws WHERE lottery_type = ? AND concurso > ? ORDER BY concurso",
+        (lottery_type, after_contest)
+    )
+    newer = [(contest, json.loads(dezenas)) for contest, dezenas in cursor.fetchall()]
+    conn.close()
+    return newer
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+def _current_stats(lottery_type):
+    """
+    Estado da loteria conferido com o arquivo de sorteios
+
+    Outras instâncias da aplicação gravam concursos no mesmo arquivo sem passar pelo listener
+    deste processo; por isso, a cada leitura, a quantidade e o último concurso do arquivo são
+    comparados com o estado. Concursos novos são aplicados em ordem; qualquer outra diferença
+    (concursos antigos) reconstrói o estado. Chamado com _stats_lock adquirido.
+    """
+    stats = _stats.get(lottery_type)
+    if stats is None:
+        stats = _load(lottery_type) or _rebuild(lottery_type)
+
+    total, last_contest = _archive_state(lottery_type)
+    if total != stats.draws_applied or last_contest != stats.last_contest:
+        newer = _newer_draws(lottery_type, stats.last_contest)
+        if total != stats.draws_applied + len(newer):
+            stats = _rebuild(lottery_type)
+        else:
+            touched = set()
+            for contest, numbers in newer:
+                touched.update(stats.apply_draw(contest, numbers).tolist())
+            _persist(stats, sorted(touched))
+
+    _stats[lottery_type] = stats
+    return stats
+
+def get_incremental_stats(lottery_type):
+    """
+    Retorna as estatísticas incrementais da loteria, conferidas com o arquivo de sorteios
+
+    Args:
+        lottery_type (str): Tipo de loteria
+
+    Returns:
+        IncrementalStats: Contadores atualizados
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        raise ValueError(f"Loteria {lottery_type} não suportada")
+
+    with _stats_lock:
+        return _current_stats(lottery_type)
+
+def get_frequency(lottery_type):
+    """Frequência de cada número em todo o histórico armazenado."""
+    return get_incremental_stats(lottery_type).frequency_dict()
+
+def get_delay(lottery_type):
+    """Atraso atual de cada número em todo o histórico armazenado."""
+    return get_incremental_stats(lottery_type).delay_dict()
+
+def _on_draws_stored(lottery_type, results):
+    """
+    Listener do arquivo de sorteios: atualiza os contadores assim que um concurso é gravado
+
+    Concursos novos entram pela conferência com o arquivo; concursos corrigidos neste processo
+    (mesmo número de concurso, sem mudar a quantidade) e importações em lote (results None)
+    reconstroem o estado.
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        return
+
+    with _stats_lock:
+        stats = _stats.get(lottery_type) or _load(lottery_type)
+        if stats is None:
+            # Sem estado ainda: a primeira leitura reconstrói a partir do arquivo
+            return
+        _stats[lottery_type] = stats
+
+        rebuild = results is None
+        if results is not None:
+            contests = [normalized[0] for normalized in map(normalize_result, results) if normalized]
+            rebuild = any(contest <= stats.last_contest for contest in contests)
+        if rebuild:
+            _stats[lottery_type] = _rebuild(lottery_type)
+        else:
+            _current_stats(lottery_type)
+
+# Inicializar as tabelas e registrar o listener ao carregar o módulo
+init_stats_tables()
+add_draws_listener(_on_draws_stored)
@@ -0,0 +1,218 @@
+"""
+Módulo de carteira de jogos (bolão) com objetivo de cobertura
+Gera N jogos em conjunto, escolhendo de forma gulosa o jogo que mais cobre pares e triplas
+ainda não cobertos pela carteira, somado à pontuação estrutural de cada jogo
+"""
+
+from itertools import combinations
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.candidate_scoring import ideal_parameters, score_candidates
+from src.services.draw_matrix import get_draw_matrix
+
+# Quantidade de candidatos reavaliados por rodada da seleção gulosa preguiçosa
+LAZY_BATCH = 256
+
+class CoverageTracker:
+    """
+    Pares e triplas de números já cobertos pela carteira
+
+    Mantém um vetor booleano de pares (números²) e de triplas (números³); o ganho de um lote
+    de candidatos é calculado com uma única indexação vetorizada e a inclusão de um jogo
+    atualiza apenas as combinações dele.
+    """
+
+    def __init__(self, size, numbers_per_game, track_triples=True):
+        """
+        Inicializa a cobertura vazia
+
+        Args:
+            size (int): Quantidade de números do volante
+            numbers_per_game (int): Números por jogo
+            track_triples (bool): Considerar também a cobertura de triplas
+        """
+        self.size = size
+        self.track_triples = track_triples and numbers_per_game >= 3
+        self.pair_positions = np.array(list(combinations(range(numbers_per_game), 2)), dtype=np.int64)
+        self.pairs = np.zeros(size * size, dtype=bool)
+        self.pairs_total = size * (size - 1) // 2
+
+        if self.track_triples:
+            self.triple_positions = np.array(list(combinations(range(numbers_per_game), 3)), dtype=np.int64)
+            self.triples = np.zeros(size ** 3, dtype=bool)
+            self.triples_total = size * (size - 1) * (size - 2) // 6
+
+    def _pair_ids(self, games):
+        """Identificadores dos pares de cada jogo (índices ordenados, N × k)."""
+        pos = self.pair_positions
+        return games[:, pos[:, 0]] * self.size + games[:, pos[:, 1]]
+
+    def _triple_ids(self, games):
+        """Identificadores das triplas de cada jogo (índices ordenados, N × k)."""
+        pos = self.triple_positions
+        return (games[:, pos[:, 0]] * self.size + games[:, pos[:, 1]]) * self.size + games[:, pos[:, 2]]
+
+    def gains(self, games):
+        """
+        Fração de pares (e triplas) de cada jogo que ainda não está coberta
+
+        Args:
+            games (np.ndarray): Jogos como índices ordenados (N × k)
+
+        Returns:
+            np.ndarray: Ganho de cobertura de cada jogo, entre 0 e 1
+        """
+        pair_ids = self._pair_ids(games)
+        gain = (~self.pairs[pair_ids]).mean(axis=1)
+        if self.track_triples:
+            gain = (gain + (~self.triples[self._triple_ids(games)]).mean(axis=1)) / 2
+        return gain
+
+    def add(self, game):
+        """Marca como cobertos os pares (e triplas) de um jogo (índices ordenados)."""
+        game = np.asarray(game, dtype=np.int64)[None, :]
+        self.pairs[self._pair_ids(game)] = True
+        if self.track_triples:
+            self.triples[self._triple_ids(game)] = True
+
+    def summary(self):
+        """Cobertura atingida pela carteira."""
+        summary = {
+            "pairs_covered": int(self.pairs.sum()),
+            "pairs_total": self.pairs_total
+        }
+        if self.track_triples:
+            summary["triples_covered"] = int(self.triples.sum())
+            summary["triples_total"] = self.triples_total
+        return summary
+
+def expand_pool(seeds, size, numbers_per_game, pool_size, rng):
+    """
+    Amplia os jogos-semente com variações (troca de 1 a 3 números) e jogos aleatórios
+
+    Args:
+        seeds (np.ndarray): Jogos-semente como índices (S × k)
+        size (int): Quantidade de números do volante
+        numbers_per_game (int): Números por jogo
+        pool_size (int): Quantidade aproximada de candidatos
+        rng (np.random.Generator): Gerador aleatório
+
+    Returns:
+        np.ndarray: Candidatos distintos como índices ordenados
+    """
+    k = numbers_per_game
+    parts = [np.sort(seeds, axis=1)]
+
+    # Variações das sementes: cada uma troca alguns números por números fora do jogo
+    num_mutants = pool_size * 3 // 4
+    if len(seeds) and num_mutants:
+        base = seeds[rng.integers(0, len(seeds), num_mutants)]
+        member = np.zeros((num_mutants, size), dtype=bool)
+        member[np.arange(num_mutants)[:, None], base] = True
+        # Ordem aleatória dos números de fora e das posições trocadas em cada linha
+        outside_keys = np.where(member, np.inf, rng.random((num_mutants, size)))
+        outside = np.argsort(outside_keys, axis=1)[:, :max(1, size - k)]
+        positions = np.argsort(rng.random((num_mutants, k)), axis=1)
+        num_swaps = rng.integers(1, min(3, size - k) + 1, num_mutants) if size > k else np.zeros(num_mutants, dtype=np.int64)
+
+        mutants = base.copy()
+        rows = np.arange(num_mutants)
+        for swap in range(int(num_swaps.max(initial=0))):
+            active = num_swaps > swap
+            mutants[rows[active], positions[active, swap]] = outside[active, swap]
+        parts.append(np.sort(mutants, axis=1))
+
+    # Jogos aleatórios para diversificar a cobertura
+    num_random = pool_size - sum(len(part) for part in parts)
+    if num_random > 0:
+        parts.append(np.sort(np.argsort(rng.random((num_random, size)), axis=1)[:, :k], axis=1))
+
+    return np.unique(np.vstack(parts), axis=0)
+
+def build_portfolio(lottery_type, seed_games, num_tickets, coverage_weight=0.7,
+                    track_triples=True, pool_size=None, seed=None):
+    """
+    Monta uma carteira de jogos maximizando a cobertura de pares/triplas e a pontuação de cada jogo
+
+    A seleção é gulosa: a cada passo entra o candidato com maior
+    coverage_weight × 100 × ganho de cobertura + (1 - coverage_weight) × pontuação.
+    Como o ganho de cobertura só diminui à medida que a carteira cresce, os valores antigos
+    servem de limite superior e apenas os melhores candidatos são reavaliados a cada passo.
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        seed_games (list): Jogos-semente (dicionários com 'numbers', como os das estratégias)
+        num_tickets (int): Quantidade de jogos da carteira
+        coverage_weight (float): Peso da cobertura (0 a 1) em relação à pontuação do jogo
+        track_triples (bool): Considerar a cobertura de triplas além de pares
+        pool_size (int): Quantidade de candidatos (padrão: proporcional ao tamanho da carteira)
+        seed (int): Semente do gerador aleatório
+
+    Returns:
+        dict: Jogos da carteira e cobertura de pares/triplas atingida
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        return {"error": f"Loteria {lottery_type} não suportada"}
+
+    min_num, max_num = game_info['range']
+    k = game_info['numbers']
+    size = max_num - min_num + 1
+    rng = np.random.default_rng(seed)
+
+    seeds = np.array([sorted(game['numbers']) for game in seed_games if len(game.get('numbers', [])) == k],
+                     dtype=np.int64).reshape(-1, k) - min_num
+    pool_size = pool_size or min(20000, max(2000, 20 * num_tickets))
+    pool = expand_pool(seeds, size, k, pool_size, rng)
+    num_tickets = min(num_tickets, len(pool))
+
+    matrix = get_draw_matrix(lottery_type).last(100)
+    ideal_even, ideal_sum, ideal_sequences = ideal_parameters(matrix, k, game_info['range'])
+    ticket_scores, _ = score_candidates(pool + min_num, game_info['range'], ideal_even, ideal_sum, ideal_sequences)
+    ticket_part = (1 - coverage_weight) * ticket_scores
+
+    coverage = CoverageTracker(size, k, track_triples)
+    bounds = coverage_weight * 100 * coverage.gains(pool) + ticket_part
+
+    selected = []
+    while len(selected) < num_tickets:
+        # Reavalia os candidatos com maior limite até que o melhor valor seja atual
+        batch = min(LAZY_BATCH, len(pool) - len(selected))
+        top = np.argpartition(-bounds, batch - 1)[:batch]
+        bounds[top] = coverage_weight * 100 * coverage.gains(pool[top]) + ticket_part[top]
+
+        best = int(np.argmax(bounds))
+        if best not in top:
+            continue
+
+        selected.append(best)
+        coverage.add(pool[best])
+        bounds[best] = -np.inf
+
+    games = []
+    seed_teams = [game['time_coracao'] for game in seed_games if game.get('time_coracao')] if 'time_coracao' in game_info else []
+    trevo_pairs = []
+    if 'trevos' in game_info:
+        min_trevo, max_trevo = game_info['trevos_range']
+        trevo_pairs = list(combinations(range(min_trevo, max_trevo + 1), game_info['trevos']))
+
+    for i, idx in enumerate(selected):
+        game = {
+            "numbers": (pool[idx] + min_num).tolist(),
+            "strategy": "portfolio",
+            "ticket_score": round(float(ticket_scores[idx]), 2)
+        }
+        # Trevos alternados para cobrir todas as combinações ao longo da carteira
+        if trevo_pairs:
+            game["trevos"] = list(trevo_pairs[i % len(trevo_pairs)])
+        if seed_teams:
+            game["time_coracao"] = seed_teams[i % len(seed_teams)]
+        games.append(game)
+
+    return {
+        "lottery_type": lottery_type,
+        "num_tickets": len(games),
+        "pool_size": len(pool),
+        "coverage": coverage.summary(),
+        "games": games
+    }
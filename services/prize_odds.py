@@ -0,0 +1,277 @@
+"""
+Módulo de probabilidades exatas por faixa de prêmio
+Calcula, por combinatória (distribuição hipergeométrica), a chance de cada faixa de prêmio
+das loterias, incluindo apostas com mais números, trevos da +Milionária e o Time do Coração
+"""
+
+from fractions import Fraction
+from functools import lru_cache
+import numpy as np
+from src.services.analyzer import SUPPORTED_GAMES
+
+# Maior volante suportado (Quina e Timemania: 80 números)
+MAX_POPULATION = 80
+
+def _binomial_table(max_n):
+    """Triângulo de Pascal com inteiros exatos: table[n][k] = C(n, k)."""
+    table = [[1]]
+    for n in range(1, max_n + 1):
+        previous = table[-1]
+        table.append([1] + [previous[k - 1] + previous[k] for k in range(1, n)] + [1])
+    return table
+
+BINOMIAL = _binomial_table(MAX_POPULATION)
+
+# Regras de premiação: números sorteados, tamanhos de aposta permitidos e faixas.
+# Em cada faixa, 'hits' é a quantidade de acertos de números e 'trevos' os acertos de trevos aceitos.
+PRIZE_RULES = {
+    "megasena": {
+        "drawn": 6,
+        "bet_sizes": (6, 20),
+        "tiers": [
+            {"name": "Sena", "hits": 6},
+            {"name": "Quina", "hits": 5},
+            {"name": "Quadra", "hits": 4}
+        ]
+    },
+    "quina": {
+        "drawn": 5,
+        "bet_sizes": (5, 15),
+        "tiers": [
+            {"name": "Quina", "hits": 5},
+            {"name": "Quadra", "hits": 4},
+            {"name": "Terno", "hits": 3},
+            {"name": "Duque", "hits": 2}
+        ]
+    },
+    "lotofacil": {
+        "drawn": 15,
+        "bet_sizes": (15, 20),
+        "tiers": [{"name": f"{hits} acertos", "hits": hits} for hits in range(15, 10, -1)]
+    },
+    "timemania": {
+        "drawn": 7,
+        "bet_sizes": (10, 10),
+        "teams": 80,
+        "tiers": [{"name": f"{hits} acertos", "hits": hits} for hits in range(7, 2, -1)]
+    },
+    "maismilionaria": {
+        "drawn": 6,
+        "bet_sizes": (6, 12),
+        "trevos_drawn": 2,
+        "trevo_bet_sizes": (2, 6),
+        "tiers": [
+            {"name": "1ª faixa (6 + 2 trevos)", "hits": 6, "trevos": (2,)},
+            {"name": "2ª faixa (6 + 1 ou 0 trevo)", "hits": 6, "trevos": (0, 1)},
+            {"name": "3ª faixa (5 + 2 trevos)", "hits": 5, "trevos": (2,)},
+            {"name": "4ª faixa (5 + 1 ou 0 trevo)", "hits": 5, "trevos": (0, 1)},
+            {"name": "5ª faixa (4 + 2 trevos)", "hits": 4, "trevos": (2,)},
+            {"name": "6ª faixa (4 + 1 ou 0 trevo)", "hits": 4, "trevos": (0, 1)},
+            {"name": "7ª faixa (3 + 2 trevos)", "hits": 3, "trevos": (2,)},
+            {"name": "8ª faixa (3 + 1 trevo)", "hits": 3, "trevos": (1,)},
+            {"name": "9ª faixa (2 + 2 trevos)", "hits": 2, "trevos": (2,)},
+            {"name": "10ª faixa (2 + 1 trevo)", "hits": 2, "trevos": (1,)}
+        ]
+    }
+}
+
+def tier_lookup(rules):
+    """
+    Tabela (acertos × acertos de trevos) → índice da faixa de prêmio (-1 se não premia)
+
+    Args:
+        rules (dict): Regras da loteria (PRIZE_RULES)
+
+    Returns:
+        np.ndarray: Tabela (sorteados + 1) × (trevos sorteados + 1)
+    """
+    drawn = rules["drawn"]
+    trevos_drawn = rules.get("trevos_drawn", 0)
+    lookup = np.full((drawn + 1, trevos_drawn + 1), -1, dtype=np.int64)
+    for index, tier in enumerate(rules["tiers"]):
+        for trevo_hits in tier.get("trevos", range(trevos_drawn + 1)):
+            lookup[tier["hits"], trevo_hits] = index
+    return lookup
+
+def binomial(n, k):
+    """C(n, k) exato, pela tabela pré-calculada."""
+    if k < 0 or k > n:
+        return 0
+    return BINOMIAL[n][k]
+
+def hypergeometric(population, marked, drawn, hits):
+    """
+    Probabilidade exata de acertar exatamente 'hits' números
+
+    Args:
+        population (int): Quantidade de números do volante
+        marked (int): Quantidade de números marcados na aposta
+        drawn (int): Quantidade de números sorteados
+        hits (int): Acertos desejados
+
+    Returns:
+        Fraction: P(acertos = hits)
+    """
+    return Fraction(binomial(marked, hits) * binomial(population - marked, drawn - hits), binomial(population, drawn))
+
+@lru_cache(maxsize=None)
+def prize_table(lottery_type, bet_size=None, trevos_count=None):
+    """
+    Probabilidades exatas de cada faixa para um tamanho de aposta (memorizadas)
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        bet_size (int): Números marcados (padrão: aposta simples)
+        trevos_count (int): Trevos marcados na +Milionária (padrão: 2)
+
+    Returns:
+        tuple: (combinações simples equivalentes, tupla de (nome, acertos, probabilidade))
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    rules = PRIZE_RULES.get(lottery_type)
+    if not game_info or not rules:
+        raise ValueError(f"Loteria {lottery_type} não suportada")
+
+    min_num, max_num = game_info["range"]
+    population = max_num - min_num + 1
+    bet_size = bet_size or game_info["numbers"]
+    min_bet, max_bet = rules["bet_sizes"]
+    if not min_bet <= bet_size <= max_bet:
+        raise ValueError(f"A aposta deve ter entre {min_bet} e {max_bet} números")
+
+    drawn = rules["drawn"]
+    number_odds = {hits: hypergeometric(population, bet_size, drawn, hits) for hits in range(drawn + 1)}
+    combinations = binomial(bet_size, game_info["numbers"])
+
+    if "trevos_drawn" not in rules:
+        tiers = tuple((tier["name"], tier["hits"], number_odds[tier["hits"]]) for tier in rules["tiers"])
+        return combinations, tiers
+
+    # +Milionária: números e trevos são sorteados de forma independente
+    trevos_count = trevos_count or game_info["trevos"]
+    min_trevos, max_trevos = rules["trevo_bet_sizes"]
+    if not min_trevos <= trevos_count <= max_trevos:
+        raise ValueError(f"A aposta deve ter entre {min_trevos} e {max_trevos} trevos")
+
+    min_trevo, max_trevo = game_info["trevos_range"]
+    trevos_drawn = rules["trevos_drawn"]
+    trevo_odds = {
+        hits: hypergeometric(max_trevo - min_trevo + 1, trevos_count, trevos_drawn, hits)
+        for hits in range(trevos_drawn + 1)
+    }
+    tiers = tuple(
+        (tier["name"], tier["hits"], number_odds[tier["hits"]] * sum(trevo_odds[t] for t in tier["trevos"]))
+        for tier in rules["tiers"]
+    )
+    return combinations * binomial(trevos_count, game_info["trevos"]), tiers
+
+def validate_ticket(lottery_type, ticket):
+    """
+    Confere os números e trevos de um jogo contra as regras de aposta da loteria
+
+    Na +Milionária os trevos são obrigatórios: um jogo sem trevos não concorre às faixas
+    que dependem deles.
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        ticket (dict): Jogo com 'numbers' e, na +Milionária, 'trevos'
+
+    Returns:
+        tuple: (números, trevos) convertidos para inteiros
+
+    Raises:
+        ValueError: Se o jogo não atende às regras da loteria
+    """
+    game_info = SUPPORTED_GAMES[lottery_type]
+    rules = PRIZE_RULES[lottery_type]
+    if not isinstance(ticket, dict):
+        raise ValueError("o jogo deve ser um objeto com 'numbers'")
+    try:
+        numbers = [int(n) for n in ticket.get("numbers") or []]
+        trevos = [int(t) for t in ticket.get("trevos") or []]
+    except (TypeError, ValueError):
+        raise ValueError("os números e trevos devem ser inteiros")
+
+    min_num, max_num = game_info["range"]
+    if len(set(numbers)) != len(numbers) or any(not min_num <= n <= max_num for n in numbers):
+        raise ValueError(f"os números devem ser distintos e estar entre {min_num} e {max_num}")
+    min_bet, max_bet = rules["bet_sizes"]
+    if not min_bet <= len(numbers) <= max_bet:
+        raise ValueError(f"a aposta deve ter entre {min_bet} e {max_bet} números")
+
+    if "trevo_bet_sizes" in rules:
+        min_trevo, max_trevo = game_info["trevos_range"]
+        if len(set(trevos)) != len(trevos) or any(not min_trevo <= t <= max_trevo for t in trevos):
+            raise ValueError(f"os trevos devem ser distintos e estar entre {min_trevo} e {max_trevo}")
+        min_trevos, max_trevos = rules["trevo_bet_sizes"]
+        if not min_trevos <= len(trevos) <= max_trevos:
+            raise ValueError(f"a aposta deve ter entre {min_trevos} e {max_trevos} trevos")
+    return numbers, trevos
+
+def _odds(probability):
+    """Chance no formato '1 em N' (N arredondado), ou None se a probabilidade for zero."""
+    return round(1 / probability) if probability else None
+
+@lru_cache(maxsize=None)
+def _probability_summary(lottery_type, bet_size, trevos_count):
+    """Resumo das probabilidades de um tamanho de aposta, já convertido para números de ponto flutuante."""
+    game_info = SUPPORTED_GAMES[lottery_type]
+    combinations, tiers = prize_table(lottery_type, bet_size, trevos_count)
+    any_prize = sum(probability for _, _, probability in tiers)
+
+    summary = {
+        "lottery_type": lottery_type,
+        "bet_size": bet_size,
+        "combinations": combinations,
+        "tiers": [
+            {"name": name, "hits": hits, "probability": float(probability), "odds": _odds(probability)}
+            for name, hits, probability in tiers
+        ],
+        "jackpot": {"probability": float(tiers[0][2]), "odds": _odds(tiers[0][2])},
+        "any_prize": {"probability": float(any_prize), "odds": _odds(any_prize)}
+    }
+
+    if "trevos" in game_info:
+        summary["trevos"] = trevos_count or game_info["trevos"]
+
+    if "teams" in PRIZE_RULES[lottery_type]:
+        teams = PRIZE_RULES[lottery_type]["teams"]
+        summary["time_coracao"] = {"team": None, "probability": 1 / teams, "odds": teams}
+
+    return summary
+
+def calculate_probability(lottery_type, numbers, trevos=None, time_coracao=None):
+    """
+    Calcula as probabilidades exatas de prêmio de uma aposta
+
+    Todas as apostas com a mesma quantidade de números (e trevos) têm exatamente as mesmas
+    chances; por isso o cálculo depende apenas do tamanho da aposta e é memorizado.
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        numbers (list): Números marcados
+        trevos (list): Trevos marcados (obrigatórios na +Milionária)
+        time_coracao (str): Time do Coração (Timemania)
+
+    Returns:
+        dict: Probabilidade e chance ('1 em N') de cada faixa, de qualquer prêmio e do Time do Coração
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        raise ValueError(f"Loteria {lottery_type} não suportada")
+
+    # Mesmas regras da conferência e da simulação (trevos obrigatórios na +Milionária)
+    numbers, trevos = validate_ticket(lottery_type, {"numbers": numbers, "trevos": trevos})
+
+    summary = _probability_summary(lottery_type, len(numbers), len(trevos) if trevos else None)
+
+    # Cópia rasa: o resumo memorizado é compartilhado entre chamadas
+    result = dict(
+        summary,
+        tiers=[dict(tier) for tier in summary["tiers"]],
+        jackpot=dict(summary["jackpot"]),
+        any_prize=dict(summary["any_prize"])
+    )
+    if "time_coracao" in summary:
+        result["time_coracao"] = dict(summary["time_coracao"], team=time_coracao)
+    return result
@@ -3,16 +3,32 @@ Módulo de otimização de probabilidade para loterias
 Implementa algoritmos para maximizar a probabilidade de prêmio total
 """
 
-import random
+import threading
+from types import MappingProxyType
 import numpy as np
-from collections import Counter
 from src.services.analyzer import fetch_last_n_results, SUPPORTED_GAMES
+from src.services.candidate_scoring import candidate_features, sample_weighted_games, score_candidates
+from src.services.draw_archive import add_draws_listener, get_max_contest
+from src.services.draw_matrix import DrawMatrix
+from src.services.resilience import SingleFlight
+from src.services.ticket_search import TicketObjective, search
+from src.services.gap_analysis import overdue_ranking
+from src.services.stats_cache import cached_by_contest
 
 class ProbabilityOptimizer:
     """
     Classe para otimização de probabilidade de jogos de loteria
+    
+    A instância é um snapshot somente leitura das métricas do último concurso carregado;
+    a geração de jogos não altera o estado, então a mesma instância pode ser usada por várias threads.
     """
     
+    # Quantidade de jogos candidatos avaliados em lote por jogo gerado
+    num_candidates = 20000
+    
+    # Orçamento de tempo (ms) da busca por simulated annealing a partir dos melhores candidatos
+    search_budget_ms = 50
+    
     def __init__(self, lottery_type):
         """
         Inicializa o otimizador para um tipo específico de loteria
@@ -28,9 +44,10 @@ class ProbabilityOptimizer:
         
         # Carregar dados históricos
         self.historical_data = self._load_historical_data()
+        self.last_contest = self.matrix.last_contest
         
-        # Inicializar métricas
-        self.metrics = self._calculate_metrics()
+        # Inicializar métricas (somente leitura)
+        self.metrics = MappingProxyType(self._calculate_metrics())
     
     def _load_historical_data(self, num_results=100):
         """
@@ -44,13 +61,11 @@ class ProbabilityOptimizer:
         """
         results = fetch_last_n_results(self.lottery_type, num_results)
         
-        # Extrair números sorteados
-        drawn_numbers = []
-        for result in results:
-            if 'dezenas' in result:
-                drawn_numbers.append([int(n) for n in result['dezenas']])
+        # Matriz de incidência usada no cálculo vetorizado das métricas
+        self.matrix = DrawMatrix.from_results(results, self.lottery_type)
+        self.matrix.incidence.setflags(write=False)
         
-        return drawn_numbers
+        return self.matrix.draws()
     
     def _calculate_metrics(self):
         """
@@ -62,81 +77,43 @@ class ProbabilityOptimizer:
         if not self.historical_data:
             return {}
         
+        matrix = self.matrix
+        numbers = matrix.numbers.tolist()
+        
         # Frequência de cada número
-        all_numbers = [num for game in self.historical_data for num in game]
-        frequency = Counter(all_numbers)
+        frequency = {num: count for num, count in zip(numbers, matrix.frequency().tolist()) if count}
         
-        # Calcular atraso de cada número
-        delay = {}
-        min_num, max_num = self.game_info['range']
-        for num in range(min_num, max_num + 1):
-            delay[num] = 0
-            
-        for i, game in enumerate(self.historical_data):
-            for num in range(min_num, max_num + 1):
-                if num in game:
-                    break
-                delay[num] += 1
-        
-        # Calcular distribuição de pares/ímpares
-        even_odd_distribution = []
-        for game in self.historical_data:
-            even_count = len([n for n in game if n % 2 == 0])
-            odd_count = len(game) - even_count
-            even_odd_distribution.append((even_count, odd_count))
-        
-        # Calcular distribuição por dezenas
-        decade_distribution = []
-        for game in self.historical_data:
-            decades = {}
-            for n in range(min_num, max_num + 1, 10):
-                decade = f"{n}-{min(n+9, max_num)}"
-                decades[decade] = 0
-            
-            for num in game:
-                decade_start = (num // 10) * 10
-                if decade_start == 0:
-                    decade_start = 1
-                decade_end = min(decade_start + 9, max_num)
-                decade = f"{decade_start}-{decade_end}"
-                decades[decade] = decades.get(decade, 0) + 1
-            
-            decade_distribution.append(decades)
-        
-        # Calcular somas e médias
-        sums = [sum(game) for game in self.historical_data]
-        
-        # Calcular sequências
-        sequences = []
-        for game in self.historical_data:
-            sorted_game = sorted(game)
-            seq_count = 0
-            for i in range(len(sorted_game) - 1):
-                if sorted_game[i + 1] - sorted_game[i] == 1:
-                    seq_count += 1
-            sequences.append(seq_count)
-        
-        # Calcular repetições entre jogos consecutivos
-        repetitions = []
-        for i in range(len(self.historical_data) - 1):
-            current = set(self.historical_data[i])
-            next_game = set(self.historical_data[i + 1])
-            repetitions.append(len(current.intersection(next_game)))
+        # Atraso de cada número (concursos desde a última ocorrência)
+        delay = dict(zip(numbers, matrix.delay().tolist()))
+        
+        # Distribuição de pares/ímpares
+        even_odd_distribution = tuple(zip(matrix.even_counts().tolist(), matrix.odd_counts().tolist()))
+        
+        # Distribuição por dezenas
+        decade_labels = matrix.decade_labels()
+        decade_distribution = tuple(MappingProxyType(dict(zip(decade_labels, row))) for row in matrix.decade_counts().tolist())
         
         return {
-            'frequency': frequency,
-            'delay': delay,
+            'frequency': MappingProxyType(frequency),
+            'delay': MappingProxyType(delay),
             'even_odd_distribution': even_odd_distribution,
             'decade_distribution': decade_distribution,
-            'sums': sums,
-            'sequences': sequences,
-            'repetitions': repetitions
+            'sums': tuple(matrix.sums().tolist()),
+            'sequences': tuple(matrix.sequences().tolist()),
+            'repetitions': tuple(matrix.repetitions().tolist())
         }
     
-    def generate_optimized_game(self):
+    def generate_optimized_game(self, seed=None, budget_ms=None, restarts=1, processes=None, max_steps=None):
         """
         Gera um jogo otimizado para maximizar a probabilidade de prêmio total
         
+        Args:
+            seed (int): Semente do gerador aleatório
+            budget_ms (float): Orçamento de tempo da busca (padrão: search_budget_ms)
+            restarts (int): Buscas independentes (a melhor é usada)
+            processes (int): Processos para distribuir os reinícios
+            max_steps (int): Limite de passos da busca; com seed, torna o resultado reproduzível
+        
         Returns:
             dict: Jogo otimizado
         """
@@ -147,46 +124,34 @@ class ProbabilityOptimizer:
         min_num, max_num = self.game_info['range']
         num_to_pick = self.game_info['numbers']
         
-        # Calcular pontuação para cada número
-        scores = {}
-        for num in range(min_num, max_num + 1):
-            # Pontuação baseada em frequência (normalizada)
-            freq_score = self.metrics['frequency'].get(num, 0) / max(self.metrics['frequency'].values()) if self.metrics['frequency'] else 0
-            
-            # Pontuação baseada em atraso (normalizada)
-            delay_score = self.metrics['delay'].get(num, 0) / max(self.metrics['delay'].values()) if self.metrics['delay'] else 0
-            
-            # Combinar pontuações (pesos ajustáveis)
-            # Frequência tem peso maior para números que aparecem mais
-            # Atraso tem peso maior para números que estão atrasados
-            scores[num] = freq_score * 0.6 + delay_score * 0.4
-        
-        # Determinar distribuição ideal de pares/ímpares
-        even_odd_counts = [count for count, _ in self.metrics['even_odd_distribution']]
-        ideal_even = int(np.median([count for count in even_odd_counts]))
-        ideal_odd = num_to_pick - ideal_even
-        
-        # Determinar soma ideal
-        ideal_sum = int(np.median(self.metrics['sums']))
-        
-        # Determinar número ideal de sequências
-        ideal_sequences = int(np.median(self.metrics['sequences']))
-        
-        # Gerar múltiplos jogos candidatos
-        num_candidates = 100
-        candidates = []
-        
-        for _ in range(num_candidates):
-            # Gerar jogo candidato
-            candidate = self._generate_candidate(scores, ideal_even, ideal_odd, ideal_sum, ideal_sequences)
-            
-            # Calcular pontuação do candidato
-            score = self._score_candidate(candidate, ideal_even, ideal_odd, ideal_sum, ideal_sequences)
-            
-            candidates.append((candidate, score))
-        
-        # Selecionar o melhor candidato
-        best_candidate, best_score = max(candidates, key=lambda x: x[1])
+        scores = self._number_scores()
+        ideal_even, ideal_odd, ideal_sum, ideal_sequences = self._ideal_targets()
+        
+        # Gerar jogos candidatos em lote: sorteio ponderado pelas pontuações dos números,
+        # mais o candidato determinístico (melhores pares e ímpares) como referência
+        rng = np.random.default_rng(seed)
+        weights = np.array([scores[num] for num in range(min_num, max_num + 1)])
+        candidates = sample_weighted_games(weights, num_to_pick, self.num_candidates, rng)
+        baseline = self._generate_candidate(scores, ideal_even, ideal_odd, ideal_sum, ideal_sequences, rng)
+        candidates = np.vstack([np.sort(np.asarray(baseline) - min_num), candidates])
+        
+        # Pontuar todos os candidatos de uma vez; os melhores iniciam a busca por simulated annealing
+        objective = TicketObjective(self.game_info['range'], num_to_pick, ideal_even, ideal_sum, ideal_sequences, weights)
+        candidate_values = objective(candidates)
+        chains = 64
+        initial = candidates[np.argsort(candidate_values)[-chains:]]
+        
+        best_candidate, _ = search(
+            objective,
+            budget_ms=self.search_budget_ms if budget_ms is None else budget_ms,
+            seed=int(rng.integers(2**32)),
+            restarts=restarts,
+            processes=processes,
+            chains=chains,
+            initial=initial,
+            max_steps=max_steps
+        )
+        best_score = self._score_candidate(best_candidate, ideal_even, ideal_odd, ideal_sum, ideal_sequences)
         
         # Criar o jogo
         game = {
@@ -208,17 +173,95 @@ class ProbabilityOptimizer:
         if self.lottery_type == "maismilionaria" and "trevos" in self.game_info:
             trevos_to_pick = self.game_info["trevos"]
             min_trevo, max_trevo = self.game_info["trevos_range"]
-            game["trevos"] = sorted(random.sample(range(min_trevo, max_trevo + 1), trevos_to_pick))
+            game["trevos"] = sorted(int(t) for t in rng.choice(np.arange(min_trevo, max_trevo + 1), trevos_to_pick, replace=False))
         
         # Adicionar Time do Coração para Timemania
         if self.lottery_type == "timemania" and "time_coracao" in self.game_info:
             times = ["FLAMENGO", "CORINTHIANS", "PALMEIRAS", "SÃO PAULO", "SANTOS", 
                     "VASCO", "FLUMINENSE", "BOTAFOGO", "GRÊMIO", "INTERNACIONAL"]
-            game["time_coracao"] = random.choice(times)
+            game["time_coracao"] = times[int(rng.integers(len(times)))]
         
         return game
     
-    def _generate_candidate(self, scores, ideal_even, ideal_odd, ideal_sum, ideal_sequences):
+    def _number_scores(self):
+        """
+        Calcula a pontuação (0 a 1) de cada número: frequência × 0,6 + atraso × 0,4
+        
+        Returns:
+            dict: Pontuação por número
+        """
+        min_num, max_num = self.game_info['range']
+        
+        scores = {}
+        for num in range(min_num, max_num + 1):
+            # Pontuação baseada em frequência (normalizada)
+            freq_score = self.metrics['frequency'].get(num, 0) / max(self.metrics['frequency'].values()) if self.metrics['frequency'] else 0
+            
+            # Pontuação baseada em atraso (normalizada)
+            delay_score = self.metrics['delay'].get(num, 0) / max(self.metrics['delay'].values()) if self.metrics['delay'] else 0
+            
+            # Combinar pontuações (pesos ajustáveis)
+            # Frequência tem peso maior para números que aparecem mais
+            # Atraso tem peso maior para números que estão atrasados
+            scores[num] = freq_score * 0.6 + delay_score * 0.4
+        
+        return scores
+    
+    def _ideal_targets(self):
+        """
+        Determina as características ideais de um jogo (medianas do histórico carregado)
+        
+        Returns:
+            tuple: (ideal_even, ideal_odd, ideal_sum, ideal_sequences)
+        """
+        num_to_pick = self.game_info['numbers']
+        
+        # Determinar distribuição ideal de pares/ímpares
+        even_odd_counts = [count for count, _ in self.metrics['even_odd_distribution']]
+        ideal_even = int(np.median([count for count in even_odd_counts]))
+        ideal_odd = num_to_pick - ideal_even
+        
+        # Determinar soma ideal
+        ideal_sum = int(np.median(self.metrics['sums']))
+        
+        # Determinar número ideal de sequências
+        ideal_sequences = int(np.median(self.metrics['sequences']))
+        
+        return ideal_even, ideal_odd, ideal_sum, ideal_sequences
+    
+    def generate_optimized_batch(self, n, rng=None, candidates_per_game=20):
+        """
+        Gera N jogos otimizados distintos em uma única passada vetorizada: sorteio ponderado
+        (Gumbel top-k) de candidatos e seleção dos N melhores pela função objetivo, sem a busca local
+        
+        Args:
+            n (int): Quantidade de jogos
+            rng (np.random.Generator): Gerador aleatório
+            candidates_per_game (int): Candidatos sorteados por jogo pedido
+            
+        Returns:
+            list: Listas de números dos jogos (ordenadas)
+        """
+        if not self.metrics:
+            return []
+        
+        rng = rng or np.random.default_rng()
+        min_num, max_num = self.game_info['range']
+        num_to_pick = self.game_info['numbers']
+        scores = self._number_scores()
+        ideal_even, _, ideal_sum, ideal_sequences = self._ideal_targets()
+        
+        weights = np.array([scores[num] for num in range(min_num, max_num + 1)])
+        objective = TicketObjective(self.game_info['range'], num_to_pick, ideal_even, ideal_sum, ideal_sequences, weights)
+        candidates = sample_weighted_games(weights, num_to_pick, max(n * candidates_per_game, self.num_candidates // 10), rng)
+        
+        # Melhores candidatos distintos, na ordem da função objetivo
+        ranked = candidates[np.argsort(-objective(candidates), kind="stable")]
+        _, first = np.unique(ranked, axis=0, return_index=True)
+        best = ranked[np.sort(first)[:n]]
+        return (best + min_num).tolist()
+    
+    def _generate_candidate(self, scores, ideal_even, ideal_odd, ideal_sum, ideal_sequences, rng):
         """
         Gera um jogo candidato com base nas pontuações e métricas ideais
         
@@ -228,6 +271,7 @@ class ProbabilityOptimizer:
             ideal_odd (int): Quantidade ideal de números ímpares
             ideal_sum (int): Soma ideal dos números
             ideal_sequences (int): Quantidade ideal de sequências
+            rng (np.random.Generator): Gerador aleatório (o mesmo da busca, para respeitar a semente)
             
         Returns:
             list: Jogo candidato
@@ -254,11 +298,11 @@ class ProbabilityOptimizer:
         if len(candidate) < num_to_pick:
             remaining = num_to_pick - len(candidate)
             available = [num for num in range(min_num, max_num + 1) if num not in candidate]
-            candidate.extend(random.sample(available, remaining))
+            candidate.extend(int(num) for num in rng.choice(available, remaining, replace=False))
         
         # Se tivermos números demais, remover alguns
         if len(candidate) > num_to_pick:
-            candidate = random.sample(candidate, num_to_pick)
+            candidate = [int(num) for num in rng.choice(candidate, num_to_pick, replace=False)]
         
         return candidate
     
@@ -276,35 +320,8 @@ class ProbabilityOptimizer:
         Returns:
             float: Pontuação do candidato
         """
-        # Contar números pares e ímpares
-        even_count = len([n for n in candidate if n % 2 == 0])
-        odd_count = len(candidate) - even_count
-        
-        # Calcular diferença em relação ao ideal
-        even_diff = abs(even_count - ideal_even)
-        odd_diff = abs(odd_count - ideal_odd)
-        
-        # Calcular soma
-        sum_value = sum(candidate)
-        sum_diff = abs(sum_value - ideal_sum)
-        
-        # Calcular sequências
-        sequences = self._count_sequences(candidate)
-        seq_diff = abs(sequences - ideal_sequences)
-        
-        # Calcular distribuição por dezenas
-        decade_dist = self._get_decade_distribution(candidate)
-        decades_used = len([d for d in decade_dist.values() if d > 0])
-        
-        # Calcular pontuação final (quanto menor a diferença, melhor)
-        score = (
-            (1 / (even_diff + 1)) * 25 +  # 25% para distribuição par/ímpar
-            (1 / (sum_diff + 1)) * 25 +   # 25% para soma
-            (1 / (seq_diff + 1)) * 25 +   # 25% para sequências
-            (decades_used / len(decade_dist)) * 25  # 25% para distribuição por dezenas
-        )
-        
-        return score
+        scores, _ = score_candidates([candidate], self.game_info['range'], ideal_even, ideal_sum, ideal_sequences)
+        return float(scores[0])
     
     def _count_sequences(self, numbers):
         """
@@ -316,14 +333,7 @@ class ProbabilityOptimizer:
         Returns:
             int: Número de sequências
         """
-        sorted_numbers = sorted(numbers)
-        sequences = 0
-        
-        for i in range(len(sorted_numbers) - 1):
-            if sorted_numbers[i + 1] - sorted_numbers[i] == 1:
-                sequences += 1
-        
-        return sequences
+        return int(candidate_features([numbers], self.game_info['range'])['sequences'][0])
     
     def _get_decade_distribution(self, numbers):
         """
@@ -336,19 +346,11 @@ class ProbabilityOptimizer:
             dict: Distribuição por dezenas
         """
         min_num, max_num = self.game_info['range']
-        decades = {}
-        
-        for n in range(min_num, max_num + 1, 10):
-            decade = f"{n}-{min(n+9, max_num)}"
-            decades[decade] = 0
+        decades = {f"{start}-{min(start + 9, max_num)}": 0 for start in range(min_num, max_num + 1, 10)}
+        labels = list(decades)
         
         for num in numbers:
-            decade_start = (num // 10) * 10
-            if decade_start == 0:
-                decade_start = 1
-            decade_end = min(decade_start + 9, max_num)
-            decade = f"{decade_start}-{decade_end}"
-            decades[decade] = decades.get(decade, 0) + 1
+            decades[labels[(num - min_num) // 10]] += 1
         
         return decades
     
@@ -381,6 +383,9 @@ class ProbabilityOptimizer:
         # Top 10 números mais atrasados
         most_delayed = sorted_delay[:10]
         
+        # Top 10 números mais "vencidos" em relação aos próprios intervalos históricos
+        overdue_numbers = overdue_ranking(self.lottery_type)[:10]
+        
         # Análise de distribuição par/ímpar
         even_odd_dist = self.metrics['even_odd_distribution']
         even_counts = [count for count, _ in even_odd_dist]
@@ -451,6 +456,7 @@ class ProbabilityOptimizer:
             "hot_numbers": hot_numbers,
             "cold_numbers": cold_numbers,
             "most_delayed": most_delayed,
+            "overdue_numbers": overdue_numbers,
             "even_odd_distribution": {
                 "common_even": common_even,
                 "common_odd": common_odd,
@@ -477,6 +483,115 @@ class ProbabilityOptimizer:
             "recommendations": recommendations
         }
 
+class OptimizerRegistry:
+    """
+    Registro de otimizadores por loteria, compartilhados entre threads
+    
+    Cada loteria tem uma única instância aquecida. Quando um concurso novo é sincronizado,
+    a substituta é construída em segundo plano e trocada atomicamente; enquanto isso,
+    as requisições continuam usando o snapshot anterior.
+    """
+    
+    def __init__(self, factory=ProbabilityOptimizer):
+        """
+        Inicializa o registro
+        
+        Args:
+            factory (callable): Construtor do otimizador a partir do tipo de loteria
+        """
+        self._factory = factory
+        self._optimizers = {}
+        self._lock = threading.Lock()
+        self._builds = SingleFlight()
+        self._refreshing = set()
+    
+    def get(self, lottery_type):
+        """
+        Retorna o otimizador da loteria, construindo-o na primeira chamada
+        
+        Args:
+            lottery_type (str): Tipo de loteria
+            
+        Returns:
+            ProbabilityOptimizer: Otimizador compartilhado
+        """
+        optimizer = self._optimizers.get(lottery_type)
+        if optimizer is not None:
+            return optimizer
+        
+        # Chamadas concorrentes aguardam a mesma construção
+        return self._builds.do(lottery_type, lambda: self._build(lottery_type))
+    
+    def _build(self, lottery_type):
+        """Constrói um otimizador e o publica, a menos que já exista um snapshot mais novo."""
+        optimizer = self._factory(lottery_type)
+        with self._lock:
+            current = self._optimizers.get(lottery_type)
+            if current is None or optimizer.last_contest >= current.last_contest:
+                self._optimizers[lottery_type] = optimizer
+            return self._optimizers[lottery_type]
+    
+    def refresh(self, lottery_type):
+        """
+        Reconstrói em segundo plano o otimizador de uma loteria já aquecida, se o arquivo
+        de sorteios tiver um concurso mais novo que o do snapshot
+        
+        Args:
+            lottery_type (str): Tipo de loteria
+            
+        Returns:
+            bool: True se uma reconstrução foi iniciada
+        """
+        current = self._optimizers.get(lottery_type)
+        if current is None or get_max_contest(lottery_type) <= current.last_contest:
+            return False
+        
+        with self._lock:
+            if lottery_type in self._refreshing:
+                return False
+            self._refreshing.add(lottery_type)
+        
+        def worker():
+            try:
+                self._builds.do(lottery_type, lambda: self._build(lottery_type))
+            except Exception as e:
+                # Mantém o snapshot anterior
+                print(f"Erro ao reconstruir otimizador de {lottery_type}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(lottery_type)
+        
+        threading.Thread(target=worker, daemon=True).start()
+        return True
+    
+    def invalidate(self, lottery_type=None):
+        """Descarta o otimizador de uma loteria (ou todos)."""
+        with self._lock:
+            if lottery_type is None:
+                self._optimizers.clear()
+            else:
+                self._optimizers.pop(lottery_type, None)
+
+optimizer_registry = OptimizerRegistry()
+
+def get_optimizer(lottery_type):
+    """
+    Retorna o otimizador compartilhado da loteria
+    
+    Args:
+        lottery_type (str): Tipo de loteria
+        
+    Returns:
+        ProbabilityOptimizer: Otimizador com o snapshot mais recente
+    """
+    return optimizer_registry.get(lottery_type)
+
+def _on_draws_stored(lottery_type, results):
+    """Listener do arquivo de sorteios: reconstrói o otimizador quando chega um concurso novo."""
+    optimizer_registry.refresh(lottery_type)
+
+add_draws_listener(_on_draws_stored)
+
 def generate_optimized_games(lottery_type, num_games=1):
     """
     Gera jogos otimizados para maximizar a probabilidade de prêmio total
@@ -489,7 +604,7 @@ def generate_optimized_games(lottery_type, num_games=1):
         list: Lista de jogos otimizados
     """
     try:
-        optimizer = ProbabilityOptimizer(lottery_type)
+        optimizer = get_optimizer(lottery_type)
         games = []
         
         for _ in range(num_games):
@@ -500,6 +615,7 @@ def generate_optimized_games(lottery_type, num_games=1):
     except Exception as e:
         return [{"error": str(e)}]
 
+@cached_by_contest("detailed_analysis", window=100)
 def get_detailed_lottery_analysis(lottery_type):
     """
     Retorna uma análise detalhada para determinar melhores estratégias
@@ -511,7 +627,7 @@ def get_detailed_lottery_analysis(lottery_type):
         dict: Análise detalhada
     """
     try:
-        optimizer = ProbabilityOptimizer(lottery_type)
+        optimizer = get_optimizer(lottery_type)
         return optimizer.get_detailed_analysis()
     except Exception as e:
         return {"error": str(e)}
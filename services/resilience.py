@@ -0,0 +1,100 @@
+"""
+Módulo de resiliência para chamadas à API de resultados
+Implementa coalescência de requisições (single-flight) e circuit breaker
+"""
+
+import threading
+import time
+
+class SingleFlight:
+    """
+    Garante uma única execução em andamento por chave; chamadas concorrentes compartilham o resultado
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn):
+        """
+        Executa fn para a chave, ou aguarda a execução já em andamento
+
+        Args:
+            key: Chave que identifica a chamada (ex.: (loteria, concurso))
+            fn (callable): Função sem argumentos a executar
+
+        Returns:
+            Resultado de fn (compartilhado entre todas as chamadas concorrentes)
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if is_leader:
+                call = {"event": threading.Event(), "result": None, "error": None}
+                self._calls[key] = call
+
+        if not is_leader:
+            call["event"].wait()
+            if call["error"] is not None:
+                raise call["error"]
+            return call["result"]
+
+        try:
+            call["result"] = fn()
+            return call["result"]
+        except Exception as e:
+            call["error"] = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call["event"].set()
+
+class CircuitBreaker:
+    """
+    Circuit breaker simples: abre após falhas consecutivas e libera uma tentativa após o tempo de espera
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        """
+        Inicializa o circuit breaker
+
+        Args:
+            failure_threshold (int): Falhas consecutivas para abrir o circuito
+            reset_timeout (int): Segundos com o circuito aberto antes de uma nova tentativa
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Indica se uma chamada pode ser feita agora."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Libera uma única chamada de teste
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self):
+        """Registra uma chamada bem-sucedida e fecha o circuito."""
+        with self._lock:
+            self._failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self):
+        """Registra uma falha; abre o circuito ao atingir o limite ou se a tentativa de teste falhar."""
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
@@ -0,0 +1,133 @@
+"""
+Módulo de cache em memória para resultados da API
+Implementa TTL com stale-while-revalidate e requisições condicionais (ETag/Last-Modified)
+"""
+
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+
+# Horário de Brasília (sem horário de verão desde 2019)
+BRT = timezone(timedelta(hours=-3))
+
+# Janela em que os resultados costumam ser divulgados nos dias de sorteio
+DRAW_WINDOW_START_HOUR = 19
+
+# Sentinela retornada pelo loader quando o servidor responde 304 Not Modified
+NOT_MODIFIED = object()
+
+def schedule_ttl(draw_days, now=None, draw_night_ttl=60, default_ttl=900):
+    """
+    Calcula o TTL do último resultado de acordo com o calendário de sorteios
+
+    Args:
+        draw_days (tuple): Dias da semana com sorteio (segunda = 0)
+        now (datetime): Momento de referência (padrão: agora, no horário de Brasília)
+        draw_night_ttl (int): TTL em segundos durante a noite de sorteio
+        default_ttl (int): TTL em segundos fora da janela de sorteio
+
+    Returns:
+        int: TTL em segundos
+    """
+    now = now or datetime.now(BRT)
+    if now.weekday() in draw_days and now.hour >= DRAW_WINDOW_START_HOUR:
+        return draw_night_ttl
+
+    # Fora da janela, o resultado não muda até o próximo sorteio: não expira antes dele
+    next_window = now.replace(hour=DRAW_WINDOW_START_HOUR, minute=0, second=0, microsecond=0)
+    if next_window <= now:
+        next_window += timedelta(days=1)
+    seconds_to_window = (next_window - now).total_seconds()
+    return max(draw_night_ttl, min(default_ttl, int(seconds_to_window)))
+
+class StaleWhileRevalidateCache:
+    """
+    Cache com TTL por chave que serve dados vencidos enquanto revalida em segundo plano
+    """
+
+    def __init__(self, ttl, max_stale=3600):
+        """
+        Inicializa o cache
+
+        Args:
+            ttl (callable): Função que recebe a chave e retorna o TTL em segundos
+            max_stale (int): Tempo máximo (segundos) em que um valor vencido ainda pode ser servido
+        """
+        self.ttl = ttl
+        self.max_stale = max_stale
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def get(self, key, loader):
+        """
+        Retorna o valor em cache, revalidando quando necessário
+
+        Args:
+            key: Chave do cache
+            loader (callable): Recebe os validadores anteriores (dict) e retorna
+                (valor, validadores), NOT_MODIFIED ou None em caso de erro
+
+        Returns:
+            Valor em cache ou None se não foi possível obtê-lo
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+
+        if entry and now < entry['expires_at']:
+            return entry['value']
+
+        if entry and now < entry['expires_at'] + self.max_stale:
+            self._refresh_in_background(key, loader)
+            return entry['value']
+
+        return self._refresh(key, loader)
+
+    def invalidate(self, key=None):
+        """Remove uma chave (ou todas) do cache."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _refresh(self, key, loader):
+        """Executa o loader e atualiza a entrada; mantém o valor anterior em caso de erro."""
+        with self._lock:
+            entry = self._entries.get(key)
+        validators = entry['validators'] if entry else {}
+
+        loaded = loader(validators)
+        expires_at = time.monotonic() + self.ttl(key)
+
+        with self._lock:
+            if loaded is NOT_MODIFIED and entry:
+                entry['expires_at'] = expires_at
+                return entry['value']
+            if loaded is None or loaded is NOT_MODIFIED:
+                return entry['value'] if entry else None
+
+            value, validators = loaded
+            self._entries[key] = {
+                'value': value,
+                'validators': validators or {},
+                'expires_at': expires_at
+            }
+            return value
+
+    def _refresh_in_background(self, key, loader):
+        """Dispara uma única revalidação em segundo plano por chave."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def worker():
+            try:
+                self._refresh(key, loader)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=worker, daemon=True).start()
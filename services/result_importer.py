@@ -0,0 +1,302 @@
+"""
+Módulo de importação em lote de resultados oficiais
+Lê exportações completas (CSV ou JSON) em fluxo e grava no arquivo local de sorteios
+
+Uso:
+    python -m src.services.result_importer megasena resultados_megasena.json
+    python -m src.services.result_importer timemania timemania.csv --format csv
+"""
+
+import argparse
+import csv
+import json
+import re
+import sqlite3
+from itertools import chain
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_archive import INSERT_DRAW_SQL, build_draw_rows, get_db_path, notify_draws_changed
+from src.services.prize_odds import PRIZE_RULES
+
+BATCH_SIZE = 1000
+READ_CHUNK_SIZE = 64 * 1024
+
+_NUMBER_COLUMN = re.compile(r"^(bola|dezena)\s*\d+$")
+_TREVO_COLUMN = re.compile(r"^trevo\s*\d+$")
+_SEPARATORS = re.compile(r"[\s,;|-]+")
+
+def iter_json_results(file_obj):
+    """
+    Lê objetos de um array JSON (ou JSON por linha) sem carregar o arquivo inteiro na memória
+
+    Args:
+        file_obj: Arquivo texto aberto
+
+    Yields:
+        dict: Um resultado por concurso
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    eof = False
+
+    while True:
+        # Descarta separadores entre objetos: início/fim do array, vírgulas e espaços
+        buffer = buffer.lstrip(" \t\r\n[],")
+        if not buffer:
+            if eof:
+                return
+            chunk = file_obj.read(READ_CHUNK_SIZE)
+            if not chunk:
+                return
+            buffer = chunk
+            continue
+
+        try:
+            obj, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            chunk = file_obj.read(READ_CHUNK_SIZE)
+            if not chunk:
+                eof = True
+            buffer += chunk
+            continue
+
+        buffer = buffer[end:]
+        if isinstance(obj, dict):
+            yield obj
+
+def _split_numbers(value):
+    """Separa uma célula com vários números ("01 02 03", "01,02,03" ou "01-02-03")."""
+    return [part for part in _SEPARATORS.split(value.strip()) if part]
+
+def iter_csv_results(file_obj):
+    """
+    Lê uma exportação CSV (colunas Concurso, Data, Bola1..BolaN, Trevo1..TrevoN, Time de Coração)
+
+    Args:
+        file_obj: Arquivo texto aberto
+
+    Yields:
+        dict: Um resultado por concurso, no formato da API
+    """
+    sample = file_obj.read(READ_CHUNK_SIZE)
+    file_obj.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.reader(file_obj, dialect)
+    header = [column.strip().lower() for column in next(reader, [])]
+
+    contest_idx = next((i for i, c in enumerate(header) if c.startswith("concurso")), None)
+    if contest_idx is None:
+        raise ValueError("Coluna 'Concurso' não encontrada no CSV")
+
+    date_idx = next((i for i, c in enumerate(header) if c.startswith("data")), None)
+    number_idxs = [i for i, c in enumerate(header) if _NUMBER_COLUMN.match(c)]
+    numbers_list_idx = next((i for i, c in enumerate(header) if c in ("dezenas", "bolas")), None)
+    trevo_idxs = [i for i, c in enumerate(header) if _TREVO_COLUMN.match(c)]
+    trevos_list_idx = next((i for i, c in enumerate(header) if c == "trevos"), None)
+    time_idx = next((i for i, c in enumerate(header) if c.startswith("time")), None)
+
+    for row in reader:
+        if len(row) <= contest_idx or not row[contest_idx].strip().isdigit():
+            continue
+
+        if number_idxs:
+            dezenas = [row[i].strip() for i in number_idxs if i < len(row) and row[i].strip()]
+        elif numbers_list_idx is not None and numbers_list_idx < len(row):
+            dezenas = _split_numbers(row[numbers_list_idx])
+        else:
+            dezenas = []
+
+        result = {
+            "concurso": int(row[contest_idx]),
+            "data": row[date_idx].strip() if date_idx is not None and date_idx < len(row) else None,
+            "dezenas": dezenas
+        }
+
+        if trevo_idxs:
+            result["trevos"] = [row[i].strip() for i in trevo_idxs if i < len(row) and row[i].strip()]
+        elif trevos_list_idx is not None and trevos_list_idx < len(row):
+            result["trevos"] = _split_numbers(row[trevos_list_idx])
+
+        if time_idx is not None and time_idx < len(row) and row[time_idx].strip():
+            result["timeCoracao"] = row[time_idx].strip()
+
+        yield result
+
+def iter_csv_tickets(file_obj):
+    """
+    Lê jogos de um CSV (colunas Dezenas ou Bola1..BolaN, Trevos ou Trevo1..TrevoN e Time;
+    sem cabeçalho, cada linha contém apenas os números)
+
+    Args:
+        file_obj: Arquivo texto aberto
+
+    Yields:
+        dict: Um jogo por linha, com 'numbers' e, quando houver, 'trevos' e 'time_coracao'
+    """
+    sample = file_obj.read(READ_CHUNK_SIZE)
+    file_obj.seek(0)
+    try:
+        dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+    except csv.Error:
+        dialect = csv.excel
+
+    reader = csv.reader(file_obj, dialect)
+    first = next(reader, None)
+    if first is None:
+        return
+
+    header = [column.strip().lower() for column in first]
+    number_idxs = [i for i, c in enumerate(header) if _NUMBER_COLUMN.match(c)]
+    numbers_list_idx = next((i for i, c in enumerate(header) if c in ("dezenas", "bolas", "numeros", "números", "numbers")), None)
+    trevo_idxs = [i for i, c in enumerate(header) if _TREVO_COLUMN.match(c)]
+    trevos_list_idx = next((i for i, c in enumerate(header) if c == "trevos"), None)
+    time_idx = next((i for i, c in enumerate(header) if c.startswith("time")), None)
+
+    rows = reader
+    if not number_idxs and numbers_list_idx is None:
+        # Sem cabeçalho reconhecido: a primeira linha já é um jogo
+        number_idxs = None
+        rows = chain([first], reader)
+
+    for row in rows:
+        if number_idxs is None:
+            numbers = [part for cell in row for part in _split_numbers(cell)]
+        elif number_idxs:
+            numbers = [row[i].strip() for i in number_idxs if i < len(row) and row[i].strip()]
+        else:
+            numbers = _split_numbers(row[numbers_list_idx]) if numbers_list_idx < len(row) else []
+        if not numbers:
+            continue
+
+        ticket = {"numbers": [int(n) for n in numbers]}
+        if number_idxs is not None:
+            if trevo_idxs:
+                trevos = [row[i].strip() for i in trevo_idxs if i < len(row) and row[i].strip()]
+            elif trevos_list_idx is not None and trevos_list_idx < len(row):
+                trevos = _split_numbers(row[trevos_list_idx])
+            else:
+                trevos = []
+            if trevos:
+                ticket["trevos"] = [int(t) for t in trevos]
+            if time_idx is not None and time_idx < len(row) and row[time_idx].strip():
+                ticket["time_coracao"] = row[time_idx].strip()
+        yield ticket
+
+def _is_valid(result, game_info, rules):
+    """Confere quantidade e faixa das dezenas sorteadas (e dos trevos, na +Milionária)."""
+    try:
+        dezenas = [int(n) for n in result.get("dezenas") or []]
+        trevos = [int(t) for t in result.get("trevos") or []]
+    except (TypeError, ValueError):
+        return False
+
+    min_num, max_num = game_info["range"]
+    # Quantidade sorteada, não o tamanho da aposta (a Timemania sorteia 7 dos 10 números marcados)
+    if len(set(dezenas)) != rules["drawn"] or len(dezenas) != rules["drawn"]:
+        return False
+    if not all(min_num <= n <= max_num for n in dezenas):
+        return False
+
+    if "trevos_range" in game_info:
+        min_trevo, max_trevo = game_info["trevos_range"]
+        if len(set(trevos)) != rules["trevos_drawn"] or len(trevos) != rules["trevos_drawn"]:
+            return False
+        if not all(min_trevo <= t <= max_trevo for t in trevos):
+            return False
+
+    return True
+
+def import_results(lottery_type, file_obj, file_format="json", batch_size=BATCH_SIZE):
+    """
+    Importa uma exportação completa para o arquivo de sorteios em uma única transação
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        file_obj: Arquivo texto aberto com a exportação
+        file_format (str): "json" (array ou JSON por linha) ou "csv"
+        batch_size (int): Quantidade de linhas por executemany
+
+    Returns:
+        dict: Quantidade de concursos importados e ignorados
+    """
+    game_info = SUPPORTED_GAMES.get(lottery_type)
+    if not game_info:
+        raise ValueError(f"Loteria {lottery_type} não suportada")
+    rules = PRIZE_RULES[lottery_type]
+
+    if file_format == "json":
+        results = iter_json_results(file_obj)
+    elif file_format == "csv":
+        results = iter_csv_results(file_obj)
+    else:
+        raise ValueError(f"Formato não suportado: {file_format}")
+
+    imported = 0
+    skipped = 0
+    batch = []
+
+    conn = sqlite3.connect(get_db_path())
+    try:
+        cursor = conn.cursor()
+        for result in results:
+            if not _is_valid(result, game_info, rules):
+                skipped += 1
+                continue
+
+            batch.append(result)
+            if len(batch) >= batch_size:
+                imported += len(batch)
+                cursor.executemany(INSERT_DRAW_SQL, build_draw_rows(lottery_type, batch))
+                batch = []
+
+        if batch:
+            imported += len(batch)
+            cursor.executemany(INSERT_DRAW_SQL, build_draw_rows(lottery_type, batch))
+
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+    if imported:
+        notify_draws_changed(lottery_type)
+    return {"imported": imported, "skipped": skipped}
+
+def import_results_file(lottery_type, path, file_format=None):
+    """
+    Importa um arquivo de resultados, deduzindo o formato pela extensão quando não informado
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        path (str): Caminho do arquivo
+        file_format (str): "json" ou "csv"
+
+    Returns:
+        dict: Quantidade de concursos importados e ignorados
+    """
+    if file_format is None:
+        file_format = "csv" if path.lower().endswith(".csv") else "json"
+
+    # utf-8-sig remove o BOM das exportações geradas por planilhas
+    with open(path, encoding="utf-8-sig", newline="") as file_obj:
+        return import_results(lottery_type, file_obj, file_format)
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa resultados oficiais para o arquivo local de sorteios")
+    parser.add_argument("lottery", choices=sorted(SUPPORTED_GAMES))
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=("json", "csv"), default=None)
+    args = parser.parse_args()
+
+    summary = import_results_file(args.lottery, args.path, args.format)
+    print(f"{summary['imported']} concursos importados, {summary['skipped']} ignorados")
+
+if __name__ == "__main__":
+    main()
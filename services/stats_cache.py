@@ -0,0 +1,136 @@
+"""
+Módulo de cache versionado de estatísticas
+Memoriza resultados por (função, loteria, último concurso, janela) com despejo LRU,
+invalidação explícita quando o arquivo de sorteios recebe um concurso novo e contadores de acerto
+"""
+
+import functools
+import threading
+from collections import OrderedDict
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_archive import add_draws_listener, get_max_contest, sync_window
+
+# Concursos sincronizados antes da consulta quando a função não declara a própria janela
+DEFAULT_SYNC_WINDOW = 100
+
+class StatsCache:
+    """
+    Cache LRU limitado com contadores de acertos, falhas e despejos
+    """
+
+    def __init__(self, max_size=256):
+        """
+        Inicializa o cache
+
+        Args:
+            max_size (int): Quantidade máxima de entradas
+        """
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get_or_compute(self, key, compute, should_cache=None):
+        """
+        Retorna o valor da chave, calculando-o em caso de falha
+
+        Args:
+            key (tuple): Chave (função, loteria, último concurso, janela, ...)
+            compute (callable): Função sem argumentos que calcula o valor
+            should_cache (callable): Decide se o valor calculado deve ser guardado
+
+        Returns:
+            Valor em cache ou recém-calculado
+        """
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        value = compute()
+        if should_cache is not None and not should_cache(value):
+            return value
+
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return value
+
+    def invalidate(self, lottery_type=None):
+        """Remove as entradas de uma loteria (ou todas)."""
+        with self._lock:
+            if lottery_type is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            else:
+                keys = [key for key in self._entries if key[1] == lottery_type]
+                removed = len(keys)
+                for key in keys:
+                    del self._entries[key]
+            self.invalidations += removed
+        return removed
+
+    def stats(self):
+        """Contadores do cache."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations
+            }
+
+stats_cache = StatsCache()
+
+def _is_cacheable(value):
+    """Respostas de erro não são guardadas."""
+    return not (isinstance(value, dict) and "error" in value)
+
+def cached_by_contest(name, window=None):
+    """
+    Decorador que memoriza uma função de estatísticas cujo primeiro argumento é a loteria
+
+    Antes da consulta, os concursos da janela (ou os últimos DEFAULT_SYNC_WINDOW) são
+    sincronizados, sem percorrer o histórico inteiro; a chave inclui o último concurso
+    armazenado, então um concurso novo sempre gera uma nova entrada.
+
+    Args:
+        name (str): Nome da função na chave do cache
+        window (int): Janela de concursos usada pela função (parte da chave)
+
+    Returns:
+        callable: Decorador
+    """
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(lottery_type, *args, **kwargs):
+            if lottery_type not in SUPPORTED_GAMES:
+                return fn(lottery_type, *args, **kwargs)
+
+            sync_window(lottery_type, window or DEFAULT_SYNC_WINDOW)
+            key = (name, lottery_type, get_max_contest(lottery_type), window, args, tuple(sorted(kwargs.items())))
+            return stats_cache.get_or_compute(
+                key,
+                lambda: fn(lottery_type, *args, **kwargs),
+                should_cache=_is_cacheable
+            )
+        return wrapper
+    return decorator
+
+def _on_draws_stored(lottery_type, results):
+    """Listener do arquivo de sorteios: descarta as estatísticas da loteria que recebeu concursos."""
+    stats_cache.invalidate(lottery_type)
+
+add_draws_listener(_on_draws_stored)
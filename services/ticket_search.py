@@ -0,0 +1,192 @@
+"""
+Módulo de busca metaheurística de jogos (simulated annealing)
+Explora o espaço de jogos com várias cadeias em paralelo (vetorizadas em NumPy), dentro de
+um orçamento de tempo fixo, com semente configurável e reinícios independentes em processos
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.services.candidate_scoring import score_candidates
+
+class TicketObjective:
+    """
+    Função objetivo do otimizador: pontuação estrutural (par/ímpar, soma, sequências, dezenas)
+    somada à pontuação média dos números escolhidos (frequência/atraso)
+    """
+
+    def __init__(self, number_range, numbers_per_game, ideal_even, ideal_sum, ideal_sequences,
+                 number_weights=None, weight_factor=10.0):
+        """
+        Inicializa a função objetivo
+
+        Args:
+            number_range (tuple): Faixa de números da loteria
+            numbers_per_game (int): Números por jogo
+            ideal_even (int): Quantidade ideal de números pares
+            ideal_sum (int): Soma ideal dos números
+            ideal_sequences (int): Quantidade ideal de sequências
+            number_weights (np.ndarray): Pontuação (0 a 1) de cada número, índice 0 = menor número
+            weight_factor (float): Peso da pontuação dos números na objetivo
+        """
+        self.number_range = tuple(number_range)
+        self.numbers_per_game = numbers_per_game
+        self.ideal_even = ideal_even
+        self.ideal_sum = ideal_sum
+        self.ideal_sequences = ideal_sequences
+        size = number_range[1] - number_range[0] + 1
+        self.number_weights = np.zeros(size) if number_weights is None else np.asarray(number_weights, dtype=np.float64)
+        self.weight_factor = weight_factor
+
+    @property
+    def size(self):
+        """Quantidade de números do volante."""
+        return len(self.number_weights)
+
+    def structural_scores(self, indices):
+        """Pontuação estrutural (0 a 100) de jogos dados como índices (N × k)."""
+        scores, _ = score_candidates(indices + self.number_range[0], self.number_range,
+                                     self.ideal_even, self.ideal_sum, self.ideal_sequences)
+        return scores
+
+    def __call__(self, indices):
+        """Valor da objetivo para jogos dados como índices (N × k)."""
+        return self.structural_scores(indices) + self.weight_factor * self.number_weights[indices].mean(axis=1)
+
+def _random_states(size, k, chains, rng):
+    """Jogos aleatórios (chains × k) como índices ordenados."""
+    return np.sort(np.argsort(rng.random((chains, size)), axis=1)[:, :k], axis=1)
+
+def anneal(objective, budget_ms=50, seed=None, chains=64, t_start=5.0, t_end=0.05, initial=None, max_steps=None):
+    """
+    Simulated annealing com várias cadeias vetorizadas e orçamento de tempo
+
+    A cada passo, cada cadeia troca um número do jogo por um número fora dele; a troca é aceita
+    se melhorar a objetivo ou, caso contrário, com probabilidade exp(delta / T). A temperatura
+    cai geometricamente de t_start a t_end ao longo do orçamento.
+
+    Args:
+        objective (TicketObjective): Função objetivo
+        budget_ms (float): Tempo máximo de busca, em milissegundos
+        seed: Semente do gerador (int ou np.random.SeedSequence)
+        chains (int): Quantidade de cadeias simultâneas
+        t_start (float): Temperatura inicial
+        t_end (float): Temperatura final
+        initial (np.ndarray): Jogos iniciais como índices (até chains linhas)
+        max_steps (int): Limite de passos; com uma semente fixa, torna o resultado reproduzível
+
+    Returns:
+        tuple: (melhor jogo como lista de números, valor da objetivo)
+    """
+    rng = np.random.default_rng(seed)
+    size, k = objective.size, objective.numbers_per_game
+    rows = np.arange(chains)
+
+    states = _random_states(size, k, chains, rng)
+    if initial is not None and len(initial):
+        initial = np.sort(np.asarray(initial)[:chains], axis=1)
+        states[:len(initial)] = initial
+
+    member = np.zeros((chains, size), dtype=bool)
+    member[rows[:, None], states] = True
+    values = objective(states)
+
+    best_idx = int(np.argmax(values))
+    best_state, best_value = states[best_idx].copy(), float(values[best_idx])
+
+    start = time.perf_counter()
+    deadline = start + budget_ms / 1000.0
+    step = 0
+    while True:
+        now = time.perf_counter()
+        if max_steps is not None:
+            if step >= max_steps:
+                break
+            progress = step / max_steps
+        elif now >= deadline:
+            break
+        else:
+            progress = (now - start) / (deadline - start)
+        step += 1
+        temperature = t_start * (t_end / t_start) ** progress
+
+        # Troca: posição aleatória do jogo por um número aleatório fora do jogo
+        position = rng.integers(0, k, chains)
+        outside = np.argsort(member, axis=1, kind="stable")[:, :size - k]
+        incoming = outside[rows, rng.integers(0, size - k, chains)]
+
+        proposals = states.copy()
+        proposals[rows, position] = incoming
+        proposals.sort(axis=1)
+        proposal_values = objective(proposals)
+
+        delta = proposal_values - values
+        accept = (delta >= 0) | (rng.random(chains) < np.exp(np.minimum(delta, 0) / temperature))
+        if accept.any():
+            outgoing = states[rows, position]
+            member[rows[accept], outgoing[accept]] = False
+            member[rows[accept], incoming[accept]] = True
+            states[accept] = proposals[accept]
+            values[accept] = proposal_values[accept]
+
+            idx = int(np.argmax(values))
+            if values[idx] > best_value:
+                best_state, best_value = states[idx].copy(), float(values[idx])
+
+    return (best_state + objective.number_range[0]).tolist(), best_value
+
+def _anneal_worker(args):
+    """Executa uma busca independente (usado pelo pool de processos)."""
+    objective, budget_ms, seed, chains, initial, max_steps = args
+    return anneal(objective, budget_ms=budget_ms, seed=seed, chains=chains, initial=initial, max_steps=max_steps)
+
+_pool = None
+_pool_size = None
+_pool_lock = threading.Lock()
+
+def _get_pool(processes):
+    """
+    Pool de processos reaproveitado entre chamadas (criar processos custa mais que o orçamento)
+
+    Chamado com _pool_lock adquirido: requisições simultâneas não criam pools duplicados nem
+    encerram o pool que outra requisição está usando antes de enviar suas tarefas.
+    """
+    global _pool, _pool_size
+    if _pool is None or _pool_size != processes:
+        if _pool is not None:
+            _pool.shutdown(wait=False)
+        _pool = ProcessPoolExecutor(max_workers=processes)
+        _pool_size = processes
+    return _pool
+
+def search(objective, budget_ms=50, seed=None, restarts=1, processes=None, chains=64, initial=None, max_steps=None):
+    """
+    Busca o melhor jogo com reinícios independentes, opcionalmente distribuídos em processos
+
+    Args:
+        objective (TicketObjective): Função objetivo
+        budget_ms (float): Orçamento de tempo de cada reinício, em milissegundos
+        seed (int): Semente base (cada reinício recebe uma semente derivada)
+        restarts (int): Quantidade de buscas independentes
+        processes (int): Processos do pool (None ou 1 executa no processo atual)
+        chains (int): Cadeias por busca
+        initial (np.ndarray): Jogos iniciais como índices
+        max_steps (int): Limite de passos de cada reinício (em vez do orçamento de tempo)
+
+    Returns:
+        tuple: (melhor jogo como lista de números, valor da objetivo)
+    """
+    seeds = np.random.SeedSequence(seed).spawn(max(1, restarts))
+    tasks = [(objective, budget_ms, s, chains, initial, max_steps) for s in seeds]
+
+    if processes and processes > 1 and len(tasks) > 1:
+        # As tarefas são enviadas sob o lock; um pool substituído depois ainda conclui as já enviadas
+        with _pool_lock:
+            pending = _get_pool(min(processes, os.cpu_count() or 1)).map(_anneal_worker, tasks)
+        results = list(pending)
+    else:
+        results = [_anneal_worker(task) for task in tasks]
+
+    return max(results, key=lambda result: result[1])
@@ -0,0 +1,36 @@
+"""
+Módulo de estatísticas por janela de concursos
+Usa as somas de prefixo da matriz de incidência para responder qualquer janela em O(números)
+"""
+
+from src.services.analyzer import SUPPORTED_GAMES
+from src.services.draw_matrix import get_draw_matrix
+
+def window_stats(lottery_type, from_contest=None, to_contest=None, last_n=None):
+    """
+    Calcula frequência e atraso de cada número em uma janela arbitrária de concursos
+
+    Args:
+        lottery_type (str): Tipo de loteria
+        from_contest (int): Concurso inicial (inclusive)
+        to_contest (int): Concurso final (inclusive)
+        last_n (int): Limita aos últimos N concursos da janela
+
+    Returns:
+        dict: Limites da janela, quantidade de sorteios, frequência e atraso por número
+    """
+    if lottery_type not in SUPPORTED_GAMES:
+        return {"error": f"Loteria {lottery_type} não suportada"}
+
+    matrix = get_draw_matrix(lottery_type)
+    start, stop = matrix.window_bounds(from_contest, to_contest, last_n)
+    numbers = matrix.numbers.tolist()
+
+    return {
+        "lottery_type": lottery_type,
+        "from_contest": int(matrix.contests[start]) if stop > start else None,
+        "to_contest": int(matrix.contests[stop - 1]) if stop > start else None,
+        "num_draws": stop - start,
+        "frequency": dict(zip(numbers, matrix.window_frequency(start, stop).tolist())),
+        "delay": dict(zip(numbers, matrix.window_delay(start, stop).tolist()))
+    }